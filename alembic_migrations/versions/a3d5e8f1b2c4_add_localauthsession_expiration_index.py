@@ -0,0 +1,30 @@
+"""Index localauthsession.expiration for the session reaper
+
+Revision ID: a3d5e8f1b2c4
+Revises: f1c7a9d2b4e6
+Create Date: 2026-10-18 17:12:05.604417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3d5e8f1b2c4'
+down_revision: Union[str, Sequence[str], None] = 'f1c7a9d2b4e6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('localauthsession', schema=None) as batch_op:
+        batch_op.create_index('ix_localauthsession_expiration', ['expiration'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('localauthsession', schema=None) as batch_op:
+        batch_op.drop_index('ix_localauthsession_expiration')
@@ -0,0 +1,55 @@
+"""Add media catalog table
+
+Revision ID: b4d9e2a7c1f3
+Revises: f7a2b3c91ce8
+Create Date: 2026-10-18 10:02:11.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4d9e2a7c1f3'
+down_revision: Union[str, Sequence[str], None] = 'f7a2b3c91ce8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+DEFAULT_MEDIA = [
+    ("Panama Rose", "https://mir-s3-cdn-cf.behance.net/project_modules/1400_webp/230b6e209581411.6778b1b7b0b77.jpeg", "image"),
+    ("~OM~", "https://mir-s3-cdn-cf.behance.net/project_modules/1400_webp/09397a148430145.62d5a256db3d1.jpg", "image"),
+    ("Swirls", "https://player.vimeo.com/video/1127068081?", "video"),
+    ("Test_Audio", "https://on.soundcloud.com/LSgMc7ip5ZocgIF431", "audio"),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    media = op.create_table('media',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('title', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('url', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('type', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('media', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_media_type'), ['type'], unique=False)
+        batch_op.create_index('ix_media_position_id', ['position', 'id'], unique=False)
+
+    op.bulk_insert(media, [
+        {"title": title, "url": url, "type": media_type, "position": position}
+        for position, (title, url, media_type) in enumerate(DEFAULT_MEDIA, 1)
+    ])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('media', schema=None) as batch_op:
+        batch_op.drop_index('ix_media_position_id')
+        batch_op.drop_index(batch_op.f('ix_media_type'))
+
+    op.drop_table('media')
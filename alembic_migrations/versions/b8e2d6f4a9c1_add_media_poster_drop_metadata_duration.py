@@ -0,0 +1,37 @@
+"""Add media poster to the render descriptor, drop unused metadata duration
+
+Revision ID: b8e2d6f4a9c1
+Revises: a3d5e8f1b2c4
+Create Date: 2026-10-18 18:05:41.227306
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8e2d6f4a9c1'
+down_revision: Union[str, Sequence[str], None] = 'a3d5e8f1b2c4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('media', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('poster', sqlmodel.sql.sqltypes.AutoString(), nullable=False, server_default=''))
+
+    with op.batch_alter_table('mediametadata', schema=None) as batch_op:
+        batch_op.drop_column('duration')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('mediametadata', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('duration', sa.Float(), nullable=True))
+
+    with op.batch_alter_table('media', schema=None) as batch_op:
+        batch_op.drop_column('poster')
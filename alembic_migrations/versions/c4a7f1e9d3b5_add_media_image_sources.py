@@ -0,0 +1,33 @@
+"""Add generated image variant srcsets to the media render descriptor
+
+Revision ID: c4a7f1e9d3b5
+Revises: b8e2d6f4a9c1
+Create Date: 2026-10-18 18:42:17.803512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a7f1e9d3b5'
+down_revision: Union[str, Sequence[str], None] = 'b8e2d6f4a9c1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('media', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('avif', sqlmodel.sql.sqltypes.AutoString(), nullable=False, server_default=''))
+        batch_op.add_column(sa.Column('webp', sqlmodel.sql.sqltypes.AutoString(), nullable=False, server_default=''))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('media', schema=None) as batch_op:
+        batch_op.drop_column('webp')
+        batch_op.drop_column('avif')
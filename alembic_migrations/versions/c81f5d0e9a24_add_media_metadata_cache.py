@@ -0,0 +1,50 @@
+"""Add media metadata cache table
+
+Revision ID: c81f5d0e9a24
+Revises: b4d9e2a7c1f3
+Create Date: 2026-10-18 11:37:52.918340
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c81f5d0e9a24'
+down_revision: Union[str, Sequence[str], None] = 'b4d9e2a7c1f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('mediametadata',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('url', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('canonical_url', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('content_type', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('content_length', sa.Integer(), nullable=True),
+    sa.Column('width', sa.Integer(), nullable=True),
+    sa.Column('height', sa.Integer(), nullable=True),
+    sa.Column('duration', sa.Float(), nullable=True),
+    sa.Column('thumbnail_url', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('provider', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('fetched_at', sa.Float(), nullable=False),
+    sa.Column('expires_at', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('mediametadata', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_mediametadata_url'), ['url'], unique=True)
+        batch_op.create_index(batch_op.f('ix_mediametadata_expires_at'), ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('mediametadata', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_mediametadata_expires_at'))
+        batch_op.drop_index(batch_op.f('ix_mediametadata_url'))
+
+    op.drop_table('mediametadata')
@@ -0,0 +1,65 @@
+"""Add media full-text search index
+
+Revision ID: d3a6c8e15b70
+Revises: c81f5d0e9a24
+Create Date: 2026-10-18 13:05:40.611927
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3a6c8e15b70'
+down_revision: Union[str, Sequence[str], None] = 'c81f5d0e9a24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE media_fts USING fts5("
+            "title, content='media', content_rowid='id', prefix='2 3', "
+            "tokenize='unicode61 remove_diacritics 2')"
+        )
+        op.execute(
+            "CREATE TRIGGER media_fts_ai AFTER INSERT ON media BEGIN "
+            "INSERT INTO media_fts(rowid, title) VALUES (new.id, new.title); END"
+        )
+        op.execute(
+            "CREATE TRIGGER media_fts_ad AFTER DELETE ON media BEGIN "
+            "INSERT INTO media_fts(media_fts, rowid, title) "
+            "VALUES ('delete', old.id, old.title); END"
+        )
+        op.execute(
+            "CREATE TRIGGER media_fts_au AFTER UPDATE OF title ON media BEGIN "
+            "INSERT INTO media_fts(media_fts, rowid, title) "
+            "VALUES ('delete', old.id, old.title); "
+            "INSERT INTO media_fts(rowid, title) VALUES (new.id, new.title); END"
+        )
+        op.execute("INSERT INTO media_fts(media_fts) VALUES ('rebuild')")
+    elif dialect == 'postgresql':
+        op.execute(
+            "ALTER TABLE media ADD COLUMN search_vector tsvector "
+            "GENERATED ALWAYS AS (to_tsvector('simple', coalesce(title, ''))) STORED"
+        )
+        op.execute(
+            "CREATE INDEX ix_media_search_vector ON media USING GIN (search_vector)"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for trigger in ('media_fts_au', 'media_fts_ad', 'media_fts_ai'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS media_fts")
+    elif dialect == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_media_search_vector")
+        op.execute("ALTER TABLE media DROP COLUMN IF EXISTS search_vector")
@@ -0,0 +1,86 @@
+"""Add canonical media URL hash index
+
+Revision ID: e5b27f4d8c19
+Revises: d3a6c8e15b70
+Create Date: 2026-10-18 14:21:08.350177
+
+"""
+import hashlib
+import re
+from typing import Sequence, Union
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b27f4d8c19'
+down_revision: Union[str, Sequence[str], None] = 'd3a6c8e15b70'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Frozen copy of MediaService.canonicalize_url as of this revision, so later
+# changes to the app's canonical form do not rewrite what this migration does.
+TRACKING_PARAMS = ('fbclid', 'gclid', 'igshid', 'si', 'ref')
+
+
+def canonicalize_url(url: str) -> str:
+    url = url.strip()
+    if not url:
+        return ''
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and (scheme, parts.port) not in (('http', 80), ('https', 443)):
+        host = f'{host}:{parts.port}'
+    path = parts.path.rstrip('/') or ('/' if host else '')
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key not in TRACKING_PARAMS and not key.startswith('utm_')
+    )
+
+    if host in ('vimeo.com', 'www.vimeo.com') and re.fullmatch(r'/\d+', path):
+        host, path = 'player.vimeo.com', '/video' + path
+    elif host == 'youtu.be' and len(path) > 1:
+        host, query = 'www.youtube.com', sorted(query + [('v', path[1:])])
+        path = '/watch'
+    elif host == 'youtube.com':
+        host = 'www.youtube.com'
+
+    return urlunsplit((scheme, host, path, urlencode(query), ''))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('media', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('url_hash', sqlmodel.sql.sqltypes.AutoString(), nullable=False, server_default=''))
+
+    # Canonicalize existing URLs; later copies of the same media are dropped
+    connection = op.get_bind()
+    seen = set()
+    for media_id, url in connection.execute(sa.text('SELECT id, url FROM media ORDER BY position, id')).all():
+        canonical = canonicalize_url(url)
+        url_hash = hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+        if url_hash in seen:
+            print(f"Removing duplicate media {media_id}: {url}")
+            connection.execute(sa.text('DELETE FROM media WHERE id = :id'), {'id': media_id})
+            continue
+        seen.add(url_hash)
+        connection.execute(
+            sa.text('UPDATE media SET url = :url, url_hash = :url_hash WHERE id = :id'),
+            {'url': canonical, 'url_hash': url_hash, 'id': media_id},
+        )
+
+    with op.batch_alter_table('media', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_media_url_hash'), ['url_hash'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('media', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_media_url_hash'))
+        batch_op.drop_column('url_hash')
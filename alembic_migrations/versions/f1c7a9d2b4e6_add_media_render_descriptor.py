@@ -0,0 +1,70 @@
+"""Add precomputed media render descriptor
+
+Revision ID: f1c7a9d2b4e6
+Revises: e5b27f4d8c19
+Create Date: 2026-10-18 16:40:12.518093
+
+"""
+from typing import Sequence, Tuple, Union
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c7a9d2b4e6'
+down_revision: Union[str, Sequence[str], None] = 'e5b27f4d8c19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Frozen copy of the renderer registry as of this revision: media type ->
+# (player, embed_url, aspect_ratio) for an already canonical URL.
+def _render_video(url: str) -> Tuple[str, str, str]:
+    parts = urlsplit(url)
+    if parts.hostname == 'www.youtube.com' and parts.path == '/watch':
+        video_id = dict(parse_qsl(parts.query)).get('v', '')
+        url = f'https://www.youtube.com/embed/{video_id}'
+    return ('iframe', url, '16 / 9')
+
+
+def _render_audio(url: str) -> Tuple[str, str, str]:
+    host = urlsplit(url).hostname or ''
+    if host == 'soundcloud.com' or host.endswith('.soundcloud.com'):
+        widget = 'https://w.soundcloud.com/player/?' + urlencode({'url': url})
+        return ('iframe', widget, '3 / 1')
+    return ('audio', url, '')
+
+
+RENDERERS = {
+    'image': lambda url: ('image', url, ''),
+    'video': _render_video,
+    'audio': _render_audio,
+    'text': lambda url: ('text', url, ''),
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('media', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('player', sqlmodel.sql.sqltypes.AutoString(), nullable=False, server_default='image'))
+        batch_op.add_column(sa.Column('embed_url', sqlmodel.sql.sqltypes.AutoString(), nullable=False, server_default=''))
+        batch_op.add_column(sa.Column('aspect_ratio', sqlmodel.sql.sqltypes.AutoString(), nullable=False, server_default=''))
+
+    connection = op.get_bind()
+    for media_id, url, media_type in connection.execute(sa.text('SELECT id, url, type FROM media')).all():
+        player, embed_url, aspect_ratio = RENDERERS[media_type](url)
+        connection.execute(
+            sa.text('UPDATE media SET player = :player, embed_url = :embed_url, aspect_ratio = :aspect_ratio WHERE id = :id'),
+            {'player': player, 'embed_url': embed_url, 'aspect_ratio': aspect_ratio, 'id': media_id},
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('media', schema=None) as batch_op:
+        batch_op.drop_column('aspect_ratio')
+        batch_op.drop_column('embed_url')
+        batch_op.drop_column('player')
@@ -0,0 +1 @@
+# Initializes the benchmarks subpackage
@@ -0,0 +1,172 @@
+# lmrex/benchmarks/form_events.py
+"""
+Load test: server events per add-media form fill, controlled vs. uncontrolled.
+
+Run with:
+
+    python -m lmrex.benchmarks.form_events [fills]
+
+Each simulated fill types a type, title and URL with random keystroke gaps
+(GAP_MS) and a pause between fields. The controlled form sends one setter
+event per keystroke, as media_modal did before its inputs became
+uncontrolled; the uncontrolled form sends the debounced URL check whenever
+typing pauses for URL_CHECK_DEBOUNCE_MS, plus one submit. Every event is
+processed against a real state instance and its delta serialized, so the
+totals include handler time and bytes on the wire.
+"""
+
+import asyncio
+import json
+import random
+import sys
+import time
+
+import reflex as rx
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine
+
+from lmrex.components import media_modal
+from lmrex.components.media_modal import URL_CHECK_DEBOUNCE_MS, MediaFormState
+from lmrex.models.media_ingest import MediaIngestQueue
+from lmrex.models.media_model import Media, MediaCatalog, MediaService
+
+GAP_MS = (60, 250)
+FIELD_PAUSE_MS = 900
+
+
+class ControlledMediaForm(rx.State):
+    """The previous media form: every keystroke is a server event."""
+
+    media_type: str = ""
+    media_title: str = ""
+    media_url: str = ""
+
+    @rx.event
+    def set_field(self, field: str, value: str):
+        setattr(self, field, value)
+
+
+def _keystrokes(rng: random.Random, fill: int):
+    """Yield (field, value so far, ms since previous key) for one form fill."""
+    values = {
+        "media_type": "image",
+        "media_title": f"Sunset over the bay {fill}",
+        "media_url": f"https://cdn.example.com/photos/{fill}/sunset-over-the-bay.jpg",
+    }
+    for field, value in values.items():
+        for i in range(1, len(value) + 1):
+            gap = FIELD_PAUSE_MS if i == 1 else rng.randint(*GAP_MS)
+            # Occasional longer pause mid-word
+            if rng.random() < 0.03:
+                gap += rng.randint(400, 1500)
+            yield field, value[:i], gap
+
+
+def _process(state: rx.State, handler, *args) -> int:
+    """Run one event handler and return the serialized delta size."""
+    handler(*args)
+    size = len(json.dumps(state.get_delta(), default=str))
+    state._clean()
+    return size
+
+
+class _Locked:
+    """Stand-in for the StateProxy a background handler receives."""
+
+    def __init__(self, state: rx.State):
+        object.__setattr__(self, "_state", state)
+
+    def __getattr__(self, name):
+        return getattr(self._state, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._state, name, value)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return None
+
+
+async def _submit(state: rx.State, form_data: dict) -> int:
+    """Run the background submit handler and return the serialized delta size."""
+    await type(state).event_handlers["handle_submit"].fn(_Locked(state), form_data)
+    size = len(json.dumps(state.get_delta(), default=str))
+    state._clean()
+    return size
+
+
+async def _uncontrolled_fill(rng: random.Random, fill: int) -> tuple:
+    """Events and delta bytes for one fill of the uncontrolled form."""
+    events = bytes_sent = 0
+    state = MediaFormState(_reflex_internal_init=True)
+    pending = None
+    form_data = {}
+    for field, value, gap in _keystrokes(rng, fill):
+        # A debounced check fires when the next key comes too late
+        if pending is not None and gap >= URL_CHECK_DEBOUNCE_MS:
+            bytes_sent += _process(state, state.check_url, pending)
+            events += 1
+            pending = None
+        form_data[field] = value
+        if field == "media_url":
+            pending = value
+    if pending is not None:
+        bytes_sent += _process(state, state.check_url, pending)
+        events += 1
+    bytes_sent += await _submit(state, form_data)
+    return events + 1, bytes_sent
+
+
+def _setup_catalog() -> None:
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(engine, tables=[Media.__table__])
+    MediaService.session_factory = lambda: Session(engine)
+    MediaService.catalog = MediaCatalog(capacity=MediaService.CATALOG_CACHE_SIZE)
+    MediaService.seed_default_media()
+
+
+def run(fills: int = 200) -> dict:
+    _setup_catalog()
+    # Submissions go through the ingestion queue, minus network enrichment
+    media_modal.ingest_queue = MediaIngestQueue(enrich=False)
+    rng = random.Random(11)
+    results = {}
+    for mode in ("controlled", "uncontrolled"):
+        events = bytes_sent = 0
+        started = time.perf_counter()
+        for fill in range(fills):
+            if mode == "controlled":
+                state = ControlledMediaForm(_reflex_internal_init=True)
+                for field, value, _ in _keystrokes(rng, fill):
+                    bytes_sent += _process(state, state.set_field, field, value)
+                    events += 1
+                # Submit with the values already on the server
+                events += 1
+                continue
+
+            fill_events, fill_bytes = asyncio.run(_uncontrolled_fill(rng, fill))
+            events += fill_events
+            bytes_sent += fill_bytes
+        results[mode] = {
+            "events": events / fills,
+            "bytes": bytes_sent / fills,
+            "server_ms": (time.perf_counter() - started) * 1000 / fills,
+        }
+    return results
+
+
+if __name__ == "__main__":
+    fills = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    results = run(fills)
+    print(f"{fills:,} form fills (per fill)")
+    for mode, result in results.items():
+        print(
+            f"  {mode:<12} {result['events']:6.1f} events "
+            f"{result['bytes']:8.0f} delta bytes {result['server_ms']:7.2f} ms handler time"
+        )
+    ratio = results["controlled"]["events"] / results["uncontrolled"]["events"]
+    print(f"  event reduction: {ratio:.1f}x")
@@ -0,0 +1,89 @@
+# lmrex/benchmarks/hydrate_size.py
+"""
+Initial hydrate payload per route: full state tree vs. page-scoped hydration.
+
+Run with:
+
+    python -m lmrex.benchmarks.hydrate_size
+
+For each page the hydrate event is answered twice against the same session,
+once by Reflex's HydrateMiddleware (the whole tree, as every route was
+hydrated before PageHydrateMiddleware) and once by PageHydrateMiddleware,
+and the serialized StateUpdate is measured. Sessions are measured fresh and
+after the gallery carousel has loaded its window. The auth tables are created
+in the configured database if missing, since AuthState queries them while
+hydrating.
+"""
+
+import asyncio
+import types
+
+import reflex as rx
+import reflex.model
+from reflex.event import Event, get_hydrate_event
+from reflex.middleware.hydrate_middleware import HydrateMiddleware
+from reflex.state import RouterData
+from reflex.state import State as RootState
+from sqlmodel import SQLModel
+
+from lmrex.benchmarks.form_events import _setup_catalog
+from lmrex.middleware.page_hydrate import PageHydrateMiddleware
+from lmrex.state.state import CarouselState
+from lmrex.ui.about import about
+from lmrex.ui.account import account_page
+from lmrex.ui.contact import contact
+from lmrex.ui.gallery import gallery
+from lmrex.ui.index import index
+from lmrex.ui.login import login
+from lmrex.ui.user_gallery import user_gallery
+
+PAGES = {
+    "Home": index,
+    "About": about,
+    "Gallery": gallery,
+    "Contact": contact,
+    "Login": login,
+    "Account": account_page,
+    "Account/Gallery": user_gallery,
+}
+
+
+async def _hydrate_size(middleware, app, root: rx.State) -> int:
+    event = Event(token="token", name=get_hydrate_event(root), payload={})
+    update = await middleware.preprocess(app, root, event)
+    return len(update.json())
+
+
+async def _measure(app, route: str, carousel_loaded: bool) -> tuple:
+    root = RootState(_reflex_internal_init=True)
+    if carousel_loaded:
+        (await root.get_state(CarouselState)).load_media()
+    root.router_data = {"pathname": "/" + route, "query": {}}
+    root.router = RouterData.from_router_data(root.router_data)
+    full = await _hydrate_size(HydrateMiddleware(), app, root)
+    scoped = await _hydrate_size(PageHydrateMiddleware(), app, root)
+    return full, scoped
+
+
+def run() -> dict:
+    _setup_catalog()
+    SQLModel.metadata.create_all(reflex.model.get_engine())
+    app = types.SimpleNamespace(
+        _unevaluated_pages={route: types.SimpleNamespace(component=page) for route, page in PAGES.items()},
+        overlay_component=None,
+    )
+    return {
+        (route, loaded): asyncio.run(_measure(app, route, loaded))
+        for loaded in (False, True)
+        for route in PAGES
+    }
+
+
+if __name__ == "__main__":
+    results = run()
+    print("Initial hydrate payload (bytes)")
+    for loaded in (False, True):
+        print("  after the carousel loaded" if loaded else "  fresh session")
+        for (route, was_loaded), (full, scoped) in results.items():
+            if was_loaded == loaded:
+                print(f"    /{route:<16} full tree {full:6,}  page-scoped {scoped:6,}  ({scoped / full:.0%})")
@@ -0,0 +1,77 @@
+# lmrex/benchmarks/login_storm.py
+"""
+Event-loop latency during a login storm: inline bcrypt vs. the hashing pool.
+
+Run with:
+
+    python -m lmrex.benchmarks.login_storm [logins] [rounds]
+
+A probe task asks to wake up every PROBE_MS and records how late it actually
+ran; that lag is what every other websocket session on the worker waits for.
+The storm then checks ``logins`` passwords concurrently, once by calling
+bcrypt inline as reflex-local-auth's LoginState.on_submit did, and once
+through verify_password's thread pool.
+"""
+
+import asyncio
+import sys
+import time
+
+import bcrypt
+
+from lmrex.middleware.auth_logic import PasswordHasher
+from lmrex.middleware.profiling import HdrHistogram
+
+PROBE_MS = 5
+
+
+async def _probe(lag_us: HdrHistogram) -> None:
+    while True:
+        expected = time.perf_counter() + PROBE_MS / 1000
+        await asyncio.sleep(PROBE_MS / 1000)
+        lag_us.record(max(0, int((time.perf_counter() - expected) * 1e6)))
+
+
+async def _inline_login(password: bytes, hashed: bytes) -> bool:
+    return bcrypt.checkpw(password, hashed)
+
+
+async def _storm(logins: int, check) -> dict:
+    lag_us = HdrHistogram()
+    probe = asyncio.create_task(_probe(lag_us))
+    await asyncio.sleep(0.05)
+    started = time.perf_counter()
+    results = await asyncio.gather(*(check() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+    # Let the probe record the stall it may have been stuck behind
+    await asyncio.sleep(2 * PROBE_MS / 1000)
+    probe.cancel()
+    assert all(results)
+    return {
+        "lag_p50_ms": lag_us.quantile(0.5) / 1000,
+        "lag_p99_ms": lag_us.quantile(0.99) / 1000,
+        "lag_max_ms": lag_us.max / 1000,
+        "logins_per_s": logins / elapsed,
+    }
+
+
+def run(logins: int = 16, rounds: int = 12) -> dict:
+    hasher = PasswordHasher(rounds=rounds)
+    password = "correct horse battery staple"
+    hashed = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds))
+    return {
+        "inline": asyncio.run(_storm(logins, lambda: _inline_login(password.encode("utf-8"), hashed))),
+        "pooled": asyncio.run(_storm(logins, lambda: hasher.verify(password, hashed))),
+    }
+
+
+if __name__ == "__main__":
+    logins = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 12
+    results = run(logins, rounds)
+    print(f"{logins} concurrent logins, bcrypt cost {rounds}, loop probed every {PROBE_MS} ms")
+    for mode, result in results.items():
+        print(
+            f"  {mode:<7} loop lag p50 {result['lag_p50_ms']:7.1f} ms  p99 {result['lag_p99_ms']:7.1f} ms"
+            f"  max {result['lag_max_ms']:7.1f} ms  {result['logins_per_s']:6.1f} logins/s"
+        )
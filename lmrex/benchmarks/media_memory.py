@@ -0,0 +1,58 @@
+# lmrex/benchmarks/media_memory.py
+"""
+Memory benchmark: MediaItem records vs. the legacy Dict[str, str] items.
+
+Run with:
+
+    python -m lmrex.benchmarks.media_memory [count]
+
+Titles and URLs are generated up front and shared by both representations,
+so the numbers compare container overhead only.
+"""
+
+import gc
+import sys
+import tracemalloc
+
+from lmrex.models.media_model import MediaItem, MediaType
+
+TYPES = [media_type.value for media_type in MediaType]
+
+
+def _measure(build) -> int:
+    """Return the bytes still allocated after calling build()."""
+    gc.collect()
+    tracemalloc.start()
+    items = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del items
+    return current
+
+
+def run(count: int = 100_000) -> dict:
+    titles = [f"Item {i}" for i in range(count)]
+    urls = [f"https://example.com/media/{i}.jpg" for i in range(count)]
+
+    dict_bytes = _measure(
+        lambda: [
+            {"title": titles[i], "url": urls[i], "type": TYPES[i % len(TYPES)]}
+            for i in range(count)
+        ]
+    )
+    slotted_bytes = _measure(
+        lambda: [
+            MediaItem(titles[i], urls[i], MediaType(TYPES[i % len(TYPES)]))
+            for i in range(count)
+        ]
+    )
+    return {"count": count, "dict": dict_bytes, "media_item": slotted_bytes}
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    result = run(count)
+    print(f"{result['count']:,} items")
+    print(f"  dict:       {result['dict'] / 1024 / 1024:8.2f} MiB")
+    print(f"  MediaItem:  {result['media_item'] / 1024 / 1024:8.2f} MiB")
+    print(f"  ratio:      {result['media_item'] / result['dict']:8.2f}x")
@@ -0,0 +1,102 @@
+# lmrex/benchmarks/media_search.py
+"""
+Query latency benchmark for MediaService.search on a large SQLite catalog.
+
+Run with:
+
+    python -m lmrex.benchmarks.media_search [rows] [queries]
+
+Builds a throwaway database file with ``rows`` generated titles (FTS index
+maintained by the insert trigger), then times ``queries`` searches. Titles
+draw three words from a Zipf-weighted vocabulary of VOCABULARY_SIZE
+synthetic words, so common words match far more rows than rare ones; each
+query is a whole word followed by a 3-letter prefix.
+"""
+
+import itertools
+import os
+import random
+import sys
+import tempfile
+import time
+
+from sqlmodel import Session, SQLModel, create_engine
+
+from lmrex.models.media_model import Media, MediaCatalog, MediaService
+
+VOCABULARY_SIZE = 5_000
+SYLLABLES = "ka lo mi ra su te vi no da ze pe qu ri sa to be".split()
+
+
+def _vocabulary(size: int = VOCABULARY_SIZE) -> list:
+    rng = random.Random(3)
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choices(SYLLABLES, k=rng.randint(2, 4))))
+    return sorted(words)
+
+
+WORDS = _vocabulary()
+CUM_WEIGHTS = list(itertools.accumulate(1 / rank for rank in range(1, len(WORDS) + 1)))
+
+
+def _populate(engine, rows: int, batch: int = 50_000) -> None:
+    rng = random.Random(7)
+    with engine.begin() as connection:
+        for start in range(0, rows, batch):
+            connection.exec_driver_sql(
+                "INSERT INTO media (title, url, url_hash, type, position, player, embed_url, "
+                "aspect_ratio, poster, avif, webp) VALUES (?, ?, ?, ?, ?, 'image', ?, '', '', '', '')",
+                [
+                    (
+                        " ".join(rng.choices(WORDS, cum_weights=CUM_WEIGHTS, k=3)) + f" {i}",
+                        f"https://example.com/media/{i}",
+                        MediaService.url_hash(f"https://example.com/media/{i}"),
+                        "image",
+                        i,
+                        f"https://example.com/media/{i}",
+                    )
+                    for i in range(start, min(start + batch, rows))
+                ],
+            )
+
+
+def run(rows: int = 1_000_000, queries: int = 200) -> dict:
+    path = os.path.join(tempfile.mkdtemp(), "search.db")
+    engine = create_engine(f"sqlite:///{path}")
+    SQLModel.metadata.create_all(engine, tables=[Media.__table__])
+    MediaService.create_search_index(engine)
+
+    started = time.perf_counter()
+    _populate(engine, rows)
+    load_seconds = time.perf_counter() - started
+
+    MediaService.session_factory = lambda: Session(engine)
+    MediaService.catalog = MediaCatalog()
+    rng = random.Random(11)
+    samples = []
+    for _ in range(queries):
+        words = rng.sample(WORDS, 2)
+        query = f"{words[0]} {words[1][:3]}"
+        started = time.perf_counter()
+        MediaService.search(query, limit=20)
+        samples.append((time.perf_counter() - started) * 1000)
+
+    samples.sort()
+    engine.dispose()
+    os.remove(path)
+    return {
+        "rows": rows,
+        "load_seconds": load_seconds,
+        "p50_ms": samples[len(samples) // 2],
+        "p99_ms": samples[min(int(len(samples) * 0.99), len(samples) - 1)],
+    }
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    result = run(rows, queries)
+    print(f"{result['rows']:,} rows loaded in {result['load_seconds']:.1f}s")
+    print(f"  search p50: {result['p50_ms']:.2f} ms")
+    print(f"  search p99: {result['p99_ms']:.2f} ms")
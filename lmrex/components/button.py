@@ -1,10 +1,11 @@
 # ./lmrex/components/button.py
 import reflex as rx
+from ..state.state import LabelState
 
 def button() -> rx.Component:
 	rx.button(
     "Button",
-    on_click=State.change_label,
+    on_click=LabelState.change_label,
     spacing="5",
     justify_self="none",
     min_height="85vh",
@@ -1,11 +1,11 @@
 # lmrex/components/heading.py
 import reflex as rx
-from lmrex.state.state import State
+from lmrex.state.state import LabelState
 
 def header() -> rx.Component:
     return rx.vstack(
         rx.heading(
-            State.label,
+            LabelState.label,
             size="9",
             style={
                 "background": "linear-gradient(45deg, #667eea, #764ba2)",
@@ -1,11 +1,11 @@
 # lmrex/components/input.py
 import reflex as rx
-from ..state.state import State
+from ..state.state import LabelState
 
 def input(self) -> rx.Component:
     return rx.input(
         placeholder="type some shit",
-        on_change=State.handle_input_change,
+        on_change=LabelState.handle_input_change,
         style = {"resize": "both",
         						"max-width": "75%",
               				"max-height": "75%",
@@ -1,60 +1,216 @@
 import reflex as rx
-from ..state.state import State
+from ..models.media_derivatives import CAROUSEL_SIZES
+from ..state.state import CarouselState, carousel_position, shift_client_position
 from ..ui.responsive_utils import apply_responsive_styles
 
-def media_carousel(current_media_item):
+
+def image_player(item):
+    # Browsers pick the smallest AVIF/WebP variant that fits
+    return rx.el.picture(
+        rx.el.source(
+            type="image/avif",
+            src_set=item["avif"],
+            sizes=CAROUSEL_SIZES,
+        ),
+        rx.el.source(
+            type="image/webp",
+            src_set=item["webp"],
+            sizes=CAROUSEL_SIZES,
+        ),
+        rx.image(
+            src=item["embed_url"],
+            width="100%",
+            height="100%",
+            object_fit="contain",
+            style={
+                "border_radius": "8px",
+            },
+        ),
+        style={
+            "width": "100%",
+            "height": "100%",
+        },
+    )
+
+
+def iframe_player(item):
+    return rx.el.iframe(
+        src=item["embed_url"],
+        title=item["title"],
+        width="100%",
+        frameborder="0",
+        allow="accelerometer; autoplay; clipboard-write; encrypted-media; gyroscope; picture-in-picture",
+        allowfullscreen=True,
+        style={
+            "aspect_ratio": item["aspect_ratio"],
+            "max_height": "100%",
+            "border_radius": "8px",
+            # Enrichment's thumbnail fills the box until the embed paints
+            "background": rx.cond(
+                item["poster"] != "", f"center / cover no-repeat url({item['poster']})", "none"
+            ),
+        },
+    )
+
+
+def audio_player(item):
+    return rx.el.audio(
+        src=item["embed_url"],
+        controls=True,
+        preload="metadata",
+        style={"width": "100%"},
+    )
+
+
+def text_player(item):
+    return rx.link(
+        item["title"],
+        href=item["embed_url"],
+        is_external=True,
+        size="5",
+    )
+
+
+# Client-side navigation reports its position once clicks settle
+SYNC_DEBOUNCE_MS = 800
+
+# Hosts most catalog media is served from. Connecting while the page loads
+# takes DNS, TCP and TLS off the first switch to one of their items.
+PRECONNECT_ORIGINS = (
+    "https://mir-s3-cdn-cf.behance.net",
+    "https://player.vimeo.com",
+    "https://w.soundcloud.com",
+)
+
+# Render descriptor player kind -> component (see media_model.RENDERERS)
+PLAYERS = {
+    "iframe": iframe_player,
+    "audio": audio_player,
+    "text": text_player,
+}
+
+
+def preconnect_hints():
+    # dns-prefetch covers browsers without preconnect
+    return rx.fragment(
+        *(
+            rx.el.link(rel=rel, href=origin)
+            for origin in PRECONNECT_ORIGINS
+            for rel in ("preconnect", "dns-prefetch")
+        )
+    )
+
+
+def preload_player(item):
+    """
+    Warm the browser cache for an item one step away. Images render hidden
+    through the same <picture> as the visible player, so the browser picks and
+    caches the variant it will show; iframe documents are prefetched.
+    """
+    return rx.match(
+        item["player"],
+        ("iframe", rx.el.link(rel="prefetch", href=item["embed_url"])),
+        ("image", rx.box(image_player(item), display="none")),
+        rx.fragment(),
+    )
+
+
+def _nav_button(label, on_click):
+    return rx.button(
+        label,
+        on_click=on_click,
+        variant="outline",
+        size="3",
+        disabled=CarouselState.media_count == 0,
+        style={
+            "min_width": "100px",
+        },
+    )
+
+
+def _client_navigation():
+    """
+    Item, catalog index, nav buttons and hidden parts (sync beacon, neighbour
+    preloads) for a carousel that steps through CarouselState.window_items in the
+    browser. Steps inside the window never reach the server; the settled
+    position is reported once, debounced, and steps past either edge go
+    through CarouselState.sync_index.
+    """
+    last = CarouselState.window_items.length() - 1
+    position = rx.cond(carousel_position.value > last, last, carousel_position.value)
+    item = CarouselState.window_items[position]
+
+    def step(label, offset, in_window):
+        return rx.cond(
+            in_window,
+            _nav_button(label, shift_client_position(offset)),
+            _nav_button(label, CarouselState.sync_index(position + offset)),
+        )
+
+    # Remounted whenever the position changes (it is keyed on it), so its
+    # debounced on_mount reports the position after clicks settle
+    beacon = rx.box(
+        key=position,
+        on_mount=CarouselState.sync_index(position).debounce(SYNC_DEBOUNCE_MS),
+        display="none",
+    )
+    def preload(offset, in_window):
+        neighbour = CarouselState.window_items[position + offset]
+        return rx.cond(in_window, preload_player(neighbour))
+
+    previous_button = step("← Previous", -1, position > 0)
+    next_button = step("Next →", 1, position < last)
+    # Neighbours are already in the browser, so they preload without a round trip
+    preloads = rx.fragment(preload(-1, position > 0), preload(1, position < last))
+    return (
+        item,
+        CarouselState.window_offset + position,
+        previous_button,
+        next_button,
+        rx.fragment(beacon, preloads),
+    )
+
+
+def media_carousel(current_media_item, client_navigation: bool = False):
+    if client_navigation:
+        item, index, previous_button, next_button, hidden = _client_navigation()
+        on_mount = CarouselState.load_media(True)
+        # Keep the server's index current when leaving the page
+        on_unmount = CarouselState.sync_index(carousel_position.value)
+    else:
+        item = CarouselState.current_media_item
+        index = CarouselState.catalog_index
+        previous_button = _nav_button("← Previous", CarouselState.previous_item)
+        next_button = _nav_button("Next →", CarouselState.next_item)
+        hidden = rx.foreach(
+            CarouselState.adjacent_media_items, preload_player
+        )
+        on_mount, on_unmount = CarouselState.load_media, None
     return rx.vstack(
             # Title and type indicator
             rx.vstack(
                 rx.heading(
-                    State.current_media_item["title"], size="9", text_align="center"
+                    item["title"], size="9", text_align="center"
                 ),
                 rx.badge(
-                    State.current_media_item["type"].upper(),
+                    item["type"].upper(),
                     color_scheme=rx.cond(
-                        State.current_media_item["type"] == "red", "purple", "blue"
+                        item["type"] == "red", "purple", "blue"
                     ),
                     size="2",
                 ),
                 spacing="2",
                 align="center",
             ),
+            preconnect_hints(),
             # Main media container with consistent sizing
             rx.box(
-                rx.cond(
-                    State.current_media_item["type"] == "video",
-                    # Video container with fixed dimensions
-                    rx.box(
-                        rx.el.iframe(
-                            src=State.current_media_item["url"],
-                            title=State.current_media_item["title"],
-                            width="100%",
-                            height="100%",
-                            frameborder="0",
-                            allow="accelerometer; autoplay; clipboard-write; encrypted-media; gyroscope; picture-in-picture",
-                            allowfullscreen=True,
-                            style={
-                                "border_radius": "8px",
-                            },
-                        ),
-                        style={
-                            "width": "100%",
-                            "height": "100%",
-                            "display": "flex",
-                            "align_items": "center",
-                            "justify_content": "center",
-                        },
-                    ),
-                    # Image container with fixed dimensions and object-fit
-                    rx.image(
-                        src=State.current_media_item["url"],
-                        width="100%",
-                        height="100%",
-                        object_fit="contain",
-                        style={
-                            "border_radius": "8px",
-                        },
-                    ),
+                # One lightweight player per descriptor kind; the descriptor is
+                # computed when the item is stored, so rendering only switches
+                rx.match(
+                    item["player"],
+                    *((player, build(item)) for player, build in PLAYERS.items()),
+                    image_player(item),
                 ),
                 # Container styles - fixed dimensions for consistency
                 style={
@@ -91,15 +247,15 @@ def media_carousel(current_media_item):
             rx.hstack(
                 rx.text(
                     "Type: ",
-                    State.current_media_item["type"].capitalize(),
+                    item["type"].capitalize(),
                     size="3",
                     color="gray",
                 ),
                 rx.text(
                     "Item ",
-                    State.current_index + 1,
+                    index + 1,
                     " of ",
-                    State.media_count,
+                    CarouselState.media_count,
                     size="3",
                     color="gray",
                 ),
@@ -109,21 +265,13 @@ def media_carousel(current_media_item):
             ),
             # Navigation controls
             rx.hstack(
-                rx.button(
-                    "← Previous",
-                    on_click=State.previous_item,
-                    variant="outline",
-                    size="3",
-                    disabled=State.media_count == 0,
-                    style={
-                        "min_width": "100px",
-                    },
-                ),
+                hidden,
+                previous_button,
                 rx.box(
                     rx.text(
-                        State.current_index + 1,
+                        index + 1,
                         " / ",
-                        State.media_count,
+                        CarouselState.media_count,
                         size="3",
                         weight="medium",
                         text_align="center",
@@ -133,16 +281,7 @@ def media_carousel(current_media_item):
                         "padding": "0 20px",
                     },
                 ),
-                rx.button(
-                    "Next →",
-                    on_click=State.next_item,
-                    variant="outline",
-                    size="3",
-                    disabled=State.media_count == 0,
-                    style={
-                        "min_width": "100px",
-                    },
-                ),
+                next_button,
                 spacing="4",
                 justify="center",
                 align="center",
@@ -154,6 +293,8 @@ def media_carousel(current_media_item):
             max_width="800px",
             margin="0 auto",
             padding="20px",
+            on_mount=on_mount,
+            on_unmount=on_unmount,
             style={
                 **apply_responsive_styles(),
                 "background_color": "white",
@@ -1,80 +1,107 @@
 # lmrex/components/media_modal.py
 from ..imports import rx
-from ..state.state import State
+from ..state.state import CarouselState, ModalState
+from ..models.media_ingest import IngestQueueFull, ingest_queue
 from ..models.media_model import MediaService
 
-class MediaFormState(rx.State):
-    """Local state for the media modal form."""
-    media_type: str = ""
-    media_title: str = ""
-    media_url: str = ""
+# Inputs are uncontrolled: the browser owns their values and the server only
+# sees them in the submit payload (plus a debounced URL check), instead of one
+# event and state delta per keystroke.
+MEDIA_FORM_FIELDS = ("media_type", "media_title", "media_url")
+URL_CHECK_DEBOUNCE_MS = 400
 
-    @rx.event
-    def set_media_type(self, value: str):
-        self.media_type = value
 
-    @rx.event
-    def set_media_title(self, value: str):
-        self.media_title = value
+def clear_media_form():
+    """Events emptying the uncontrolled form inputs after a successful submit."""
+    return [rx.set_value(field, "") for field in MEDIA_FORM_FIELDS]
 
-    @rx.event
-    def set_media_url(self, value: str):
-        self.media_url = value
+
+class MediaFormState(rx.State):
+    """Local state for the media modal form."""
+    form_error: str = ""
+    url_error: str = ""
+    submitting: bool = False
 
     @rx.event
-    def handle_submit(self):
-        """Create a media item, add it to the global State, reset the form, and close the modal."""
+    def check_url(self, value: str):
+        """Debounced as-you-type check that the URL is new to the catalog."""
+        value = value.strip()
+        if value and MediaService.find_by_url(value) is not None:
+            self.url_error = "This media is already in the catalog"
+        else:
+            self.url_error = ""
+
+    @rx.event(background=True)
+    async def handle_submit(self, form_data: dict):
+        """
+        Queue the item for persistence and enrichment without holding the state
+        lock, then reset the form and close the modal and hand the item to the carousel.
+        """
+        async with self:
+            self.submitting = True
+            self.form_error = ""
         try:
-            media_type = self.media_type or "image"
+            media_type = form_data.get("media_type") or "image"
             if not MediaService.is_valid_media_type(media_type):
                 raise ValueError(f"Invalid media type: {media_type}")
-            new_item = MediaService.create_media_item(
-                self.media_title, self.media_url, media_type
+            new_item = await ingest_queue.submit(
+                form_data.get("media_title", ""), form_data.get("media_url", ""), media_type
             )
-            State.media = State.media + [new_item]
-            State.add_media_item = new_item,
             print("Media added:", new_item)
-        except ValueError as e:
+        except (ValueError, IngestQueueFull) as e:
             print(f"Failed to add media: {e}")
+            async with self:
+                self.submitting = False
+                self.form_error = str(e)
             return
 
-        # Reset form fields
-        self.media_type = ""
-        self.media_title = ""
-        self.media_url = ""
-
-        # Close the modal that is controlled by global State
-        State.show_modal = False
+        async with self:
+            self.submitting = False
+            self.url_error = ""
+        # Reset form fields, close the modal and let the carousel pick up the new item
+        return [*clear_media_form(), ModalState.close_modal, CarouselState.media_added(new_item["id"])]
 
 def media_modal() -> rx.Component:
     return rx.dialog.root(
         # Use a trigger that toggles the global state so external "Add Media" buttons can also control it
-        rx.dialog.trigger(rx.button("Add", id="Add_Media", on_click=State.toggle_modal, justify_self="center")),
+        rx.dialog.trigger(rx.button("Add", id="Add_Media", on_click=ModalState.toggle_modal, justify_self="center")),
         rx.dialog.content(
             rx.heading("Add Media", size="6"),
             rx.text("What media would you like to add?"),
             rx.form(
                 rx.input(
                     placeholder="Type of",
-                    value=MediaFormState.media_type,
-                    on_change=MediaFormState.set_media_type,
+                    id="media_type",
+                    name="media_type",
                 ),
                 rx.input(
                     placeholder="Title",
-                    value=MediaFormState.media_title,
-                    on_change=MediaFormState.set_media_title,
+                    id="media_title",
+                    name="media_title",
                 ),
                 rx.input(
                     placeholder="URL",
-                    value=MediaFormState.media_url,
-                    on_change=MediaFormState.set_media_url,
+                    id="media_url",
+                    name="media_url",
+                    on_change=MediaFormState.check_url.debounce(URL_CHECK_DEBOUNCE_MS),
+                ),
+                rx.cond(
+                    MediaFormState.url_error != "",
+                    rx.text(MediaFormState.url_error, color="red", size="2"),
+                ),
+                rx.cond(
+                    MediaFormState.form_error != "",
+                    rx.text(MediaFormState.form_error, color="red", size="2"),
                 ),
                 rx.button(
                     "Submit",
-                    on_click=MediaFormState.handle_submit,
+                    type="submit",
+                    loading=MediaFormState.submitting,
                 ),
+                on_submit=MediaFormState.handle_submit,
+                reset_on_submit=False,
             ),
             rx.spacer(column=1),
         ),
-        is_open=State.show_modal,
+        is_open=ModalState.show_modal,
     )
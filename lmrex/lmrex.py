@@ -25,8 +25,8 @@ def init_database():
         inspector = inspect(engine)
         existing_tables = inspector.get_table_names()
 
-        # Check for required auth tables
-        required_tables = {'localuser', 'localauthsession'}
+        # Check for required auth and media catalog tables
+        required_tables = {'localuser', 'localauthsession', 'media'}
         missing_tables = required_tables - set(existing_tables)
 
         if missing_tables:
@@ -49,6 +49,12 @@ def init_database():
         else:
             print("Database tables exist")
 
+        # Seed the media catalog on first run
+        from lmrex.models.media_model import MediaService
+        seeded = MediaService.seed_default_media()
+        if seeded:
+            print(f"Seeded {seeded} default media items")
+
     except Exception as e:
         print(f"Database initialization warning: {e}")
         print("Continuing - tables will be created on first use")
@@ -4,25 +4,50 @@ Authentication middleware and logic
 Uses reflex-local-auth for secure token-based authentication
 """
 
+import asyncio
+import dataclasses
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+import bcrypt
 import reflex as rx
 import reflex_local_auth
-from typing import Optional
+from sqlmodel import select
+
+from lmrex.middleware.rate_limit import RateLimited, login_limiter, registration_limiter
+from rxconfig import PASSWORD_HASH_ROUNDS, PASSWORD_HASH_WORKERS
 
 
-def require_login(page_function):
+def require_login(app: rx.App, page_function, route: str, **page_kwargs) -> None:
     """
-    Decorator to protect pages - redirects to login if not authenticated
-    
+    Add a page that only logged-in users may see.
+
+    ProtectedState.on_load is registered as the route's first on_load, so the
+    session check runs with the page's initial load events instead of after
+    the page has rendered and mounted, and redirects to the login page when
+    the session has no user. The user is read through the session cache, so
+    the check costs no query for a known token. Until the check has passed,
+    the page body is not rendered.
+
     Usage:
-        @require_login
-        def protected_page():
-            return rx.text("This is protected")
+        require_login(app, account_page, route="/Account")
     """
-    def wrapper(*args, **kwargs):
-        # This would need to check auth state
-        # For now, pages handle their own auth checks
-        return page_function(*args, **kwargs)
-    return wrapper
+    # auth_state imports this module for the password handlers
+    from lmrex.state.auth_state import ProtectedState
+
+    on_load = page_kwargs.pop("on_load", None) or []
+    if not isinstance(on_load, list):
+        on_load = [on_load]
+
+    def protected_page():
+        return rx.cond(
+            ProtectedState.is_logged_in,
+            page_function(),
+            rx.center(rx.spinner(size="3"), min_height="80vh"),
+        )
+
+    protected_page.__name__ = page_function.__name__
+    app.add_page(protected_page, route=route, on_load=[ProtectedState.on_load, *on_load], **page_kwargs)
 
 
 def get_user_from_token(token: str) -> Optional[dict]:
@@ -35,21 +60,123 @@ def get_user_from_token(token: str) -> Optional[dict]:
     return None
 
 
-def hash_password(password: str) -> str:
+class PasswordHasher:
     """
-    Hash a password - handled by reflex-local-auth
-    This is here for reference
+    bcrypt on a bounded thread pool, so hashing never blocks the event loop.
+
+    A bcrypt round costs 100-300 ms of CPU; run inline in an event handler it
+    stalls every websocket session on the worker. bcrypt releases the GIL
+    while hashing, so a few threads keep up to ``workers`` hashes running in
+    parallel while the loop keeps serving events; further requests queue for
+    a free thread. ``rounds`` is the bcrypt cost factor for new hashes; stored
+    hashes carry their own cost and verify at that cost.
+
+    Usage:
+        password_hash = await hash_password(password)
+        ok = await verify_password(password, user.password_hash)
     """
-    # reflex-local-auth uses passlib for password hashing
-    # You don't need to call this directly
-    return password
 
+    def __init__(self, rounds: int = 12, workers: int = 2):
+        self.rounds = rounds
+        self.workers = workers
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def hash(self, password: str) -> bytes:
+        return await self._run(bcrypt.hashpw, password.encode("utf-8"), bcrypt.gensalt(self.rounds))
 
-def verify_password(password: str, hashed: str) -> bool:
+    async def verify(self, password: str, hashed: bytes) -> bool:
+        try:
+            return await self._run(bcrypt.checkpw, password.encode("utf-8"), hashed)
+        except ValueError:
+            # Not a bcrypt hash
+            return False
+
+
+# Shared by the login and registration handlers
+password_hasher = PasswordHasher(rounds=PASSWORD_HASH_ROUNDS, workers=PASSWORD_HASH_WORKERS)
+
+
+async def hash_password(password: str) -> bytes:
+    """Hash a password with bcrypt off the event loop."""
+    return await password_hasher.hash(password)
+
+
+async def verify_password(password: str, hashed: bytes) -> bool:
+    """Check a password against a bcrypt hash off the event loop."""
+    return await password_hasher.verify(password, hashed)
+
+
+class _OffloadedPasswordHandlers:
     """
-    Verify a password against a hash - handled by reflex-local-auth
-    This is here for reference
+    reflex-local-auth's login and registration handlers, awaiting bcrypt on
+    the hashing pool instead of running it inline, behind the rate limits of
+    lmrex.middleware.rate_limit. Installed on LoginState and
+    RegistrationState by offload_password_hashing, so the library's pages and
+    our own forms both use them.
     """
-    # reflex-local-auth uses passlib for password verification
-    # You don't need to call this directly
-    return False
\ No newline at end of file
+
+    async def on_submit(self, form_data: Dict[str, Any]):
+        """LoginState.on_submit"""
+        self.error_message = ""
+        username = form_data["username"]
+        password = form_data["password"]
+        try:
+            await login_limiter.check(ip=self.router.session.client_ip, username=username)
+        except RateLimited as e:
+            self.error_message = str(e)
+            return rx.set_value("password", "")
+        with rx.session() as session:
+            user = session.exec(
+                select(reflex_local_auth.LocalUser).where(reflex_local_auth.LocalUser.username == username)
+            ).one_or_none()
+        if user is not None and not user.enabled:
+            self.error_message = "This account is disabled."
+            return rx.set_value("password", "")
+        if (
+            user is not None
+            and user.id is not None
+            and password
+            and await verify_password(password, user.password_hash)
+        ):
+            self._login(user.id)
+            return reflex_local_auth.LoginState.redir()
+        self.error_message = "There was a problem logging in, please try again."
+        return rx.set_value("password", "")
+
+    async def handle_registration(self, form_data: Dict[str, Any]):
+        """RegistrationState.handle_registration"""
+        username = form_data["username"]
+        password = form_data["password"]
+        try:
+            await registration_limiter.check(ip=self.router.session.client_ip)
+        except RateLimited as e:
+            self.error_message = str(e)
+            self.new_user_id = -1
+            return
+        validation_errors = self._validate_fields(username, password, form_data["confirm_password"])
+        if validation_errors:
+            self.new_user_id = -1
+            return validation_errors
+        password_hash = await hash_password(password)
+        with rx.session() as session:
+            user = reflex_local_auth.LocalUser(username=username, password_hash=password_hash, enabled=True)
+            session.add(user)
+            session.commit()
+            session.refresh(user)
+            self.new_user_id = user.id
+        return type(self).successful_registration
+
+
+def offload_password_hashing() -> None:
+    """Swap the login and registration handlers for the pooled versions."""
+    for state_cls, name in (
+        (reflex_local_auth.LoginState, "on_submit"),
+        (reflex_local_auth.RegistrationState, "handle_registration"),
+    ):
+        fn = getattr(_OffloadedPasswordHandlers, name)
+        handler = dataclasses.replace(state_cls.event_handlers[name], fn=fn)
+        state_cls.event_handlers[name] = handler
+        setattr(state_cls, name, handler)
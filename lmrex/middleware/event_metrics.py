@@ -0,0 +1,258 @@
+# lmrex/middleware/event_metrics.py
+"""
+Per-event websocket traffic instrumentation.
+
+EventMetricsMiddleware records, for every processed event, the serialized
+size of the state updates it sent to the client and the handler latency. Both
+are kept as rolling histograms per handler and exposed as JSON at
+``/_metrics/events`` and in a dev-only overlay.
+"""
+
+import asyncio
+import bisect
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import reflex as rx
+from reflex.event import Event
+from reflex.middleware import Middleware
+from reflex.state import BaseState, StateUpdate
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+
+class RollingHistogram:
+    """Histogram over the most recent ``window`` samples."""
+
+    def __init__(self, window: int = 1024):
+        self._samples: Deque[float] = deque(maxlen=window)
+        self.total_count = 0
+
+    def record(self, value: float) -> None:
+        self._samples.append(value)
+        self.total_count += 1
+
+    def percentile(self, fraction: float) -> float:
+        """Return the value at ``fraction`` (0-1) of the current window."""
+        if not self._samples:
+            return 0.0
+        ordered = sorted(self._samples)
+        return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+    def buckets(self, bounds: Tuple[float, ...]) -> List[int]:
+        """Count window samples per bucket; the last bucket holds values above all bounds."""
+        counts = [0] * (len(bounds) + 1)
+        for value in self._samples:
+            counts[bisect.bisect_left(bounds, value)] += 1
+        return counts
+
+    def summary(self) -> Dict[str, float]:
+        samples = self._samples
+        return {
+            "count": self.total_count,
+            "mean": sum(samples) / len(samples) if samples else 0.0,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+            "max": max(samples, default=0.0),
+        }
+
+
+class EventMetrics:
+    """Delta size and latency histograms keyed by handler name."""
+
+    SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536)
+    LATENCY_BUCKETS_MS = (1, 5, 25, 100, 500)
+
+    def __init__(self, window: int = 1024):
+        self.window = window
+        self._delta_bytes: Dict[str, RollingHistogram] = {}
+        self._latency_ms: Dict[str, RollingHistogram] = {}
+
+    def _histogram(self, table: Dict[str, RollingHistogram], name: str) -> RollingHistogram:
+        histogram = table.get(name)
+        if histogram is None:
+            histogram = table[name] = RollingHistogram(self.window)
+        return histogram
+
+    def record_delta(self, name: str, size: int) -> None:
+        self._histogram(self._delta_bytes, name).record(size)
+
+    def record_latency(self, name: str, latency_ms: float) -> None:
+        self._histogram(self._latency_ms, name).record(latency_ms)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Summaries and bucket counts per handler, largest mean delta first."""
+        names = sorted(
+            set(self._delta_bytes) | set(self._latency_ms),
+            key=lambda name: -self._histogram(self._delta_bytes, name).summary()["mean"],
+        )
+        return {
+            name: {
+                "delta_bytes": {
+                    **self._histogram(self._delta_bytes, name).summary(),
+                    "buckets": self._histogram(self._delta_bytes, name).buckets(
+                        self.SIZE_BUCKETS
+                    ),
+                },
+                "latency_ms": {
+                    **self._histogram(self._latency_ms, name).summary(),
+                    "buckets": self._histogram(self._latency_ms, name).buckets(
+                        self.LATENCY_BUCKETS_MS
+                    ),
+                },
+            }
+            for name in names
+        }
+
+    def reset(self) -> None:
+        self._delta_bytes.clear()
+        self._latency_ms.clear()
+
+
+# Shared by the middleware, the endpoint and the overlay
+event_metrics = EventMetrics()
+
+
+def event_label(state: BaseState, event: Event) -> str:
+    """Readable handler name such as ``CarouselState.next_item`` for an event."""
+    path, _, handler = event.name.rpartition(".")
+    try:
+        state_cls = type(state).get_class_substate(tuple(path.split(".")))
+    except ValueError:
+        return event.name
+    return f"{state_cls.__name__}.{handler}"
+
+
+class _EventRun:
+    """Bookkeeping for one in-flight event."""
+
+    __slots__ = ("event", "name", "started", "delta_bytes", "watching_task")
+
+    def __init__(self, event: Event, name: str):
+        # Holding the event keeps its id() unique while the run is open
+        self.event = event
+        self.name = name
+        self.started = time.perf_counter()
+        self.delta_bytes = 0
+        self.watching_task = False
+
+
+class EventMetricsMiddleware(Middleware):
+    """
+    Record the serialized delta size and latency of every handled event.
+
+    An event may push several updates (generator and background handlers);
+    their sizes are summed and recorded once the event is done: on its final
+    update, or for background handlers, whose updates never carry
+    ``final=True``, when the task running them ends.
+    """
+
+    def __init__(self, metrics: EventMetrics = event_metrics):
+        self.metrics = metrics
+        # Keyed per event, so overlapping events on one token (background
+        # tasks run concurrently with later events) never share an entry
+        self._runs: Dict[int, _EventRun] = {}
+
+    async def preprocess(
+        self, app: rx.App, state: BaseState, event: Event
+    ) -> Optional[StateUpdate]:
+        self._runs[id(event)] = _EventRun(event, event_label(state, event))
+        return None
+
+    async def postprocess(
+        self, app: rx.App, state: BaseState, event: Event, update: StateUpdate
+    ) -> StateUpdate:
+        size = len(update.json().encode("utf-8"))
+        run = self._runs.get(id(event))
+        if run is None:
+            # Upload events are postprocessed without a preprocess step
+            self.metrics.record_delta(event_label(state, event), size)
+            return update
+        run.delta_bytes += size
+        if update.final:
+            self._finish(id(event))
+        elif update.final is None and not run.watching_task:
+            task = asyncio.current_task()
+            if task is not None:
+                run.watching_task = True
+                task.add_done_callback(lambda _, key=id(event): self._finish(key))
+        return update
+
+    def _finish(self, key: int) -> None:
+        run = self._runs.pop(key, None)
+        if run is not None:
+            self.metrics.record_delta(run.name, run.delta_bytes)
+            self.metrics.record_latency(run.name, (time.perf_counter() - run.started) * 1000)
+
+
+async def event_metrics_endpoint(request: Request) -> JSONResponse:
+    """Backend endpoint returning the per-handler histograms."""
+    return JSONResponse(event_metrics.snapshot())
+
+
+class EventMetricsState(rx.State):
+    """Snapshot of the event metrics for the dev overlay."""
+
+    rows: list[dict[str, str]] = []
+    visible: bool = False
+
+    @rx.event
+    def refresh(self):
+        """Reload the handler table from the process metrics."""
+        self.rows = [
+            {
+                "name": name,
+                "count": str(stats["delta_bytes"]["count"]),
+                "delta_p50": f"{stats['delta_bytes']['p50']:.0f} B",
+                "delta_max": f"{stats['delta_bytes']['max']:.0f} B",
+                "latency_p50": f"{stats['latency_ms']['p50']:.1f} ms",
+                "latency_p99": f"{stats['latency_ms']['p99']:.1f} ms",
+            }
+            for name, stats in event_metrics.snapshot().items()
+        ]
+
+    @rx.event
+    def toggle(self):
+        self.visible = not self.visible
+        if self.visible:
+            self.refresh()
+
+
+def event_metrics_overlay() -> rx.Component:
+    """Floating per-handler traffic table, meant for development builds only."""
+    columns = ("name", "count", "delta_p50", "delta_max", "latency_p50", "latency_p99")
+    return rx.box(
+        rx.button("Events", size="1", variant="soft", on_click=EventMetricsState.toggle),
+        rx.cond(
+            EventMetricsState.visible,
+            rx.vstack(
+                rx.button("Refresh", size="1", on_click=EventMetricsState.refresh),
+                rx.table.root(
+                    rx.table.header(
+                        rx.table.row(*(rx.table.column_header_cell(c) for c in columns))
+                    ),
+                    rx.table.body(
+                        rx.foreach(
+                            EventMetricsState.rows,
+                            lambda row: rx.table.row(
+                                *(rx.table.cell(row[c]) for c in columns)
+                            ),
+                        )
+                    ),
+                    size="1",
+                ),
+                max_height="50vh",
+                overflow="auto",
+                padding="8px",
+                background_color="white",
+                border="1px solid #ddd",
+                border_radius="8px",
+            ),
+        ),
+        position="fixed",
+        bottom="12px",
+        right="12px",
+        z_index="1000",
+    )
@@ -0,0 +1,146 @@
+# lmrex/middleware/page_hydrate.py
+"""
+Hydrate only the states the current page renders.
+
+Reflex's HydrateMiddleware answers the hydrate event with ``state.dict()`` for
+the whole state tree, so every route pays for every substate, including the
+computed vars of pages the visitor never opens. PageHydrateMiddleware answers
+it with the root state plus the substates (and their ancestors) whose vars
+the page's components reference. The frontend keeps its compiled defaults for
+the rest, and the first navigation to a page that needs one of them sends it
+along with that page's on-load update.
+"""
+
+import dataclasses
+import weakref
+from typing import TYPE_CHECKING, Any, Dict, FrozenSet, Iterable, Optional, Set, Type
+
+from reflex import constants
+from reflex.compiler.compiler import into_component
+from reflex.event import Event, get_hydrate_event
+from reflex.middleware.hydrate_middleware import HydrateMiddleware
+from reflex.state import FIELD_MARKER, BaseState, OnLoadInternalState, StateUpdate, _resolve_delta
+
+if TYPE_CHECKING:
+    from reflex.app import App
+    from reflex.components.component import Component
+
+ON_LOAD_EVENT = f"{OnLoadInternalState.get_full_name()}.on_load_internal"
+
+
+def _page_key(path: str) -> str:
+    """Key of a matched route (``/Gallery``) in the app's page table."""
+    return path.strip("/") or constants.PageNames.INDEX_ROUTE
+
+
+def component_states(component: "Component", root: Type[BaseState]) -> Set[Type[BaseState]]:
+    """State classes whose vars a component tree references, with their ancestors."""
+    states = set()
+    for var in component._get_vars(include_children=True):
+        var_data = var._get_all_var_data()
+        if var_data is None or not var_data.state:
+            continue
+        try:
+            state_cls = root.get_class_substate(var_data.state)
+        except ValueError:
+            continue
+        while state_cls is not None and state_cls not in states:
+            states.add(state_cls)
+            state_cls = state_cls.get_parent_state()
+    return states
+
+
+async def state_dict(state: BaseState) -> Dict[str, Any]:
+    """A single state's entry of ``state.dict()``, without its substates."""
+    state._mark_dirty_computed_vars()
+    names = [
+        *state.base_vars,
+        *(name for name, var in state.computed_vars.items() if not var._backend),
+    ]
+    return await _resolve_delta(
+        {state.get_full_name(): {name + FIELD_MARKER: state.get_value(name) for name in sorted(names)}}
+    )
+
+
+@dataclasses.dataclass(init=True)
+class PageHydrateMiddleware(HydrateMiddleware):
+    """
+    HydrateMiddleware that sends only the states the current page uses.
+
+    Routes whose page cannot be evaluated (404s, pages that fail to build)
+    fall back to hydrating the full tree.
+
+    Usage:
+        app.add_middleware(PageHydrateMiddleware(), index=0)
+    """
+
+    # Page key -> state classes its components reference (None: whole tree)
+    page_states: Dict[str, Optional[FrozenSet[Type[BaseState]]]] = dataclasses.field(
+        default_factory=dict
+    )
+    # Root state -> substates the client has received in full since hydrating
+    _sent: "weakref.WeakKeyDictionary[BaseState, Set[Type[BaseState]]]" = dataclasses.field(
+        default_factory=weakref.WeakKeyDictionary
+    )
+
+    def states_for(self, app: "App", state: BaseState) -> Optional[FrozenSet[Type[BaseState]]]:
+        """State classes the client's current page needs, or None for all."""
+        key = _page_key(state.router_data.get(constants.RouteVar.PATH, ""))
+        if key not in self.page_states:
+            page = app._unevaluated_pages.get(key)
+            try:
+                components = [into_component(page.component)] if page is not None else None
+                if components is not None and app.overlay_component is not None:
+                    components.append(into_component(app.overlay_component))
+            except Exception:
+                components = None
+            self.page_states[key] = (
+                frozenset().union(*(component_states(c, type(state)) for c in components))
+                if components is not None
+                else None
+            )
+        return self.page_states[key]
+
+    async def _dicts(self, state: BaseState, classes: Iterable[Type[BaseState]]) -> Dict[str, Any]:
+        delta = {}
+        for state_cls in classes:
+            delta.update(await state_dict(await state.get_state(state_cls)))
+        return delta
+
+    async def preprocess(self, app: "App", state: BaseState, event: Event) -> Optional[StateUpdate]:
+        if event.name != get_hydrate_event(state):
+            return None
+        classes = self.states_for(app, state)
+        if classes is None:
+            self._sent.pop(state, None)
+            return await super().preprocess(app, state, event)
+
+        state._reset_client_storage()
+        setattr(state, constants.CompileVars.IS_HYDRATED, False)
+        delta = await state_dict(state)
+        delta.update(await self._dicts(state, classes - {type(state)}))
+        self._sent[state] = set(classes)
+        state._clean()
+        return StateUpdate(delta=delta, events=[])
+
+    async def postprocess(
+        self, app: "App", state: BaseState, event: Event, update: StateUpdate
+    ) -> StateUpdate:
+        """Send the states a newly visited page needs with its first on-load update."""
+        sent = self._sent.get(state)
+        if event.name != ON_LOAD_EVENT or sent is None:
+            return update
+        classes = self.states_for(app, state)
+        if classes is None:
+            # Unknown page: send everything once and stop scoping this client
+            del self._sent[state]
+            delta = await _resolve_delta(state.dict())
+        else:
+            missing = classes - sent
+            if not missing:
+                return update
+            sent.update(missing)
+            delta = await self._dicts(state, missing)
+        for name, values in update.delta.items():
+            delta.setdefault(name, {}).update(values)
+        return dataclasses.replace(update, delta=delta)
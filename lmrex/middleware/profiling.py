@@ -0,0 +1,302 @@
+# lmrex/middleware/profiling.py
+"""
+Per-handler latency profiling for state event handlers.
+
+``profile_handlers`` wraps every event handler of the given state classes so
+each call records its wall time, its queue wait (time spent waiting for the
+session's state lock before the handler started) and any exception it raised.
+Timings go into in-memory HDR-style histograms and are exported in the
+Prometheus text format at ``/metrics``.
+"""
+
+import dataclasses
+import functools
+import inspect
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Type
+
+import reflex as rx
+from reflex.event import EventHandler
+from reflex.state import BaseState, EventHandlerSetVar
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+# perf_counter_ns() when the current event started waiting for its state lock
+_queued_at: ContextVar[Optional[int]] = ContextVar("lmrex_queued_at", default=None)
+
+
+class HdrHistogram:
+    """
+    Log-linear histogram of integer microsecond values.
+
+    Values below ``2 ** significant_bits`` are counted exactly; above that each
+    power of two is split into ``2 ** (significant_bits - 1)`` equal buckets,
+    so any reported quantile is within ``1 / 2 ** (significant_bits - 1)`` of
+    the true value while memory only grows with the range of values seen.
+    """
+
+    def __init__(self, significant_bits: int = 7):
+        self.significant_bits = significant_bits
+        self._exact = 1 << significant_bits
+        self._half = self._exact >> 1
+        self._counts: Counter = Counter()
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+
+    def _index(self, value: int) -> int:
+        if value < self._exact:
+            return value
+        shift = value.bit_length() - self.significant_bits
+        return self._exact + (shift - 1) * self._half + (value >> shift) - self._half
+
+    def _upper_bound(self, index: int) -> int:
+        """Largest value that falls into the bucket at ``index``."""
+        if index < self._exact:
+            return index
+        shift, offset = divmod(index - self._exact, self._half)
+        shift += 1
+        return ((offset + self._half + 1) << shift) - 1
+
+    def record(self, value: int) -> None:
+        value = max(int(value), 0)
+        self._counts[self._index(value)] += 1
+        if not self.count or value < self.min:
+            self.min = value
+        self.max = max(self.max, value)
+        self.count += 1
+        self.total += value
+
+    def quantile(self, fraction: float) -> int:
+        """Value at ``fraction`` (0-1) of all recorded samples, 0 when empty."""
+        if not self.count:
+            return 0
+        rank = max(fraction * self.count, 1)
+        seen = 0
+        for index in sorted(self._counts):
+            seen += self._counts[index]
+            if seen >= rank:
+                return min(self._upper_bound(index), self.max)
+        return self.max
+
+    def reset(self) -> None:
+        self._counts.clear()
+        self.count = self.total = self.min = self.max = 0
+
+
+class HandlerProfile:
+    """Wall time, queue wait and exception counts for one handler."""
+
+    def __init__(self):
+        self.wall_us = HdrHistogram()
+        self.queue_wait_us = HdrHistogram()
+        self.exceptions: Counter = Counter()
+
+
+class HandlerProfiler:
+    """Handler profiles keyed by name such as ``CarouselState.next_item``."""
+
+    def __init__(self):
+        self.profiles: Dict[str, HandlerProfile] = {}
+
+    def profile(self, name: str) -> HandlerProfile:
+        profile = self.profiles.get(name)
+        if profile is None:
+            profile = self.profiles[name] = HandlerProfile()
+        return profile
+
+    def record(
+        self,
+        name: str,
+        wall_us: int,
+        queue_wait_us: Optional[int] = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        profile = self.profile(name)
+        profile.wall_us.record(wall_us)
+        if queue_wait_us is not None:
+            profile.queue_wait_us.record(queue_wait_us)
+        if error is not None:
+            profile.exceptions[type(error).__name__] += 1
+
+    def reset(self) -> None:
+        self.profiles.clear()
+
+    def prometheus(self) -> str:
+        """Render every profile in the Prometheus text exposition format."""
+        lines: List[str] = []
+        for metric, attribute, help_text in (
+            ("lmrex_handler_duration_seconds", "wall_us", "Event handler wall time."),
+            (
+                "lmrex_handler_queue_wait_seconds",
+                "queue_wait_us",
+                "Time an event waited for its session lock before the handler ran.",
+            ),
+        ):
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} summary"]
+            for name, profile in sorted(self.profiles.items()):
+                histogram: HdrHistogram = getattr(profile, attribute)
+                label = f'handler="{name}"'
+                for fraction in QUANTILES:
+                    value = histogram.quantile(fraction) / 1e6
+                    lines.append(f'{metric}{{{label},quantile="{fraction}"}} {value:.6f}')
+                lines.append(f"{metric}_sum{{{label}}} {histogram.total / 1e6:.6f}")
+                lines.append(f"{metric}_count{{{label}}} {histogram.count}")
+
+        metric = "lmrex_handler_exceptions_total"
+        lines += [
+            f"# HELP {metric} Exceptions raised by event handlers.",
+            f"# TYPE {metric} counter",
+        ]
+        for name, profile in sorted(self.profiles.items()):
+            for error, count in sorted(profile.exceptions.items()):
+                lines.append(f'{metric}{{handler="{name}",exception="{error}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+# Shared by every profiled handler and the /metrics endpoint
+handler_profiler = HandlerProfiler()
+
+# Exporters of other components (caches, queues) served next to the profiles
+metric_collectors: List[Callable[[], str]] = []
+
+
+def _elapsed_us(started: int) -> int:
+    return (time.perf_counter_ns() - started) // 1000
+
+
+def _queue_wait_us(started: int) -> Optional[int]:
+    """Consume the lock wait recorded for the event that is starting now."""
+    queued = _queued_at.get()
+    if queued is None:
+        return None
+    _queued_at.set(None)
+    return max(started - queued, 0) // 1000
+
+
+def _profiled(fn: Callable, name: str, profiler: HandlerProfiler) -> Callable:
+    """Wrap a handler function, keeping its kind (sync/async, generator or not)."""
+    # Background tasks run outside the event's lock, so they have no queue wait
+    background = getattr(fn, "_reflex_background_task", False)
+
+    def finish(started: int, wait: Optional[int], error: Optional[BaseException]) -> None:
+        profiler.record(name, _elapsed_us(started), wait, error)
+
+    def start() -> Tuple[int, Optional[int]]:
+        started = time.perf_counter_ns()
+        return started, None if background else _queue_wait_us(started)
+
+    if inspect.isasyncgenfunction(fn):
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            started, wait = start()
+            error = None
+            try:
+                async for update in fn(*args, **kwargs):
+                    yield update
+            except Exception as e:
+                error = e
+                raise
+            finally:
+                finish(started, wait, error)
+
+    elif inspect.iscoroutinefunction(fn):
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            started, wait = start()
+            error = None
+            try:
+                return await fn(*args, **kwargs)
+            except Exception as e:
+                error = e
+                raise
+            finally:
+                finish(started, wait, error)
+
+    elif inspect.isgeneratorfunction(fn):
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            started, wait = start()
+            error = None
+            try:
+                yield from fn(*args, **kwargs)
+            except Exception as e:
+                error = e
+                raise
+            finally:
+                finish(started, wait, error)
+
+    else:
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            started, wait = start()
+            error = None
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                error = e
+                raise
+            finally:
+                finish(started, wait, error)
+
+    wrapper.__profiled__ = True
+    return wrapper
+
+
+def _handlers(state_cls: Type[BaseState]) -> Iterator[Tuple[str, EventHandler]]:
+    for name, handler in state_cls.event_handlers.items():
+        # setvar dispatches to the generated setters, which are profiled themselves
+        if isinstance(handler, EventHandlerSetVar) or handler.fn is None:
+            continue
+        if getattr(handler.fn, "__profiled__", False):
+            continue
+        yield name, handler
+
+
+def profile_handlers(
+    *state_classes: Type[BaseState], profiler: HandlerProfiler = handler_profiler
+) -> None:
+    """Record wall time, queue wait and exceptions for every handler of the states."""
+    for state_cls in state_classes:
+        for name, handler in list(_handlers(state_cls)):
+            fn = _profiled(handler.fn, f"{state_cls.__name__}.{name}", profiler)
+            profiled = dataclasses.replace(handler, fn=fn)
+            state_cls.event_handlers[name] = profiled
+            setattr(state_cls, name, profiled)
+
+
+async def track_queue_wait(app: rx.App) -> None:
+    """Lifespan task: timestamp every event before it waits for its state lock."""
+    manager = app.state_manager
+    acquire = manager.modify_state_with_links
+    if getattr(acquire, "__profiled__", False):
+        return
+
+    @functools.wraps(acquire)
+    def timed(*args, **kwargs):
+        _queued_at.set(time.perf_counter_ns())
+        return acquire(*args, **kwargs)
+
+    timed.__profiled__ = True
+    manager.modify_state_with_links = timed
+
+
+def register_metrics(collect: Callable[[], str]) -> None:
+    """Append another component's Prometheus text to the /metrics output."""
+    if collect not in metric_collectors:
+        metric_collectors.append(collect)
+
+
+async def metrics_endpoint(request: Request) -> PlainTextResponse:
+    """Backend endpoint exporting the handler profiles for Prometheus."""
+    body = "".join([handler_profiler.prometheus(), *(collect() for collect in metric_collectors)])
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
@@ -0,0 +1,191 @@
+# lmrex/middleware/rate_limit.py
+"""
+Token-bucket rate limits for login and registration attempts.
+
+Every attempt takes a token from a bucket per client IP and, for logins, one
+per username; an empty bucket rejects the attempt with RateLimited before
+the user is looked up or any bcrypt hash is computed. Buckets live in process
+memory by default. When Reflex is configured with a Redis URL they live in
+Redis, updated by one atomic script per attempt, so every worker shares the
+same budget.
+"""
+
+import dataclasses
+import math
+import time
+from collections import Counter, OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from reflex.utils import prerequisites
+
+from lmrex.middleware.profiling import register_metrics
+from rxconfig import LOGIN_IP_RATE, LOGIN_USERNAME_RATE, REGISTRATION_IP_RATE
+
+
+class RateLimited(Exception):
+    """Raised when an attempt finds its bucket empty."""
+
+    def __init__(self, bucket: str, retry_after: float):
+        super().__init__(f"Too many attempts, try again in {math.ceil(retry_after)} s")
+        self.bucket = bucket
+        self.retry_after = retry_after
+
+
+@dataclasses.dataclass(frozen=True)
+class Limit:
+    """``capacity`` attempts in a burst, refilled evenly over ``period`` seconds."""
+
+    capacity: int
+    period: float
+
+    @property
+    def rate(self) -> float:
+        return self.capacity / self.period
+
+    @classmethod
+    def parse(cls, spec: str) -> "Limit":
+        """Parse ``"<attempts>/<seconds>"``, e.g. ``"5/300"``."""
+        capacity, _, period = spec.partition("/")
+        return cls(int(capacity), float(period))
+
+
+class MemoryBuckets:
+    """Buckets in this process, the least recently used dropped past ``max_keys``."""
+
+    def __init__(self, max_keys: int = 100_000, clock: Callable[[], float] = time.monotonic):
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def take(self, key: str, limit: Limit) -> float:
+        """Take a token; returns 0 if one was available, else seconds until one is."""
+        now = self.clock()
+        tokens, stamp = self._buckets.get(key, (limit.capacity, now))
+        tokens = min(limit.capacity, tokens + (now - stamp) * limit.rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / limit.rate
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return wait
+
+
+# KEYS[1] bucket; ARGV capacity, refill per second. Uses the server clock so
+# workers with drifting clocks agree; the reply is a string because Redis
+# truncates Lua numbers to integers.
+TAKE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'stamp')
+local tokens = tonumber(bucket[1]) or capacity
+local stamp = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + (now - stamp) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'stamp', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return tostring(wait)
+"""
+
+
+class RedisBuckets:
+    """Buckets shared by every worker, one atomic script call per attempt."""
+
+    def __init__(self, redis, prefix: str = "lmrex:ratelimit:"):
+        self.redis = redis
+        self.prefix = prefix
+        self._take = redis.register_script(TAKE_SCRIPT)
+
+    async def take(self, key: str, limit: Limit) -> float:
+        wait = await self._take(keys=[self.prefix + key], args=[limit.capacity, limit.rate])
+        return float(wait)
+
+
+class RateLimiter:
+    """
+    Named token-bucket limits checked together for one kind of attempt.
+
+    Usage:
+        await login_limiter.check(ip=client_ip, username=username)
+    """
+
+    def __init__(self, name: str, limits: Dict[str, Limit], backend=None):
+        self.name = name
+        self.limits = limits
+        self.backend = backend
+        self.counts: Counter = Counter()
+        self._fallback: Optional[MemoryBuckets] = None
+
+    def _backend(self):
+        if self.backend is None:
+            redis = prerequisites.get_redis() if prerequisites.parse_redis_url() else None
+            self.backend = RedisBuckets(redis) if redis is not None else MemoryBuckets()
+        return self.backend
+
+    async def _take(self, key: str, limit: Limit) -> float:
+        try:
+            return await self._backend().take(key, limit)
+        except Exception:
+            # Keep limiting with this worker's own buckets while the store is down
+            self.counts["backend_errors"] += 1
+            if self._fallback is None:
+                self._fallback = MemoryBuckets()
+            return await self._fallback.take(key, limit)
+
+    async def check(self, **keys: str) -> None:
+        """Take a token from each named bucket, in order; raises RateLimited on the first empty one."""
+        for bucket, value in keys.items():
+            wait = await self._take(f"{self.name}:{bucket}:{value.strip().lower()}", self.limits[bucket])
+            if wait > 0:
+                self.counts[f"rejected:{bucket}"] += 1
+                raise RateLimited(bucket, wait)
+        self.counts["allowed"] += 1
+
+
+def prometheus(*limiters: RateLimiter) -> str:
+    """Counters of the given limiters in the Prometheus text exposition format."""
+    lines: List[str] = []
+    for metric, help_text, samples in (
+        ("lmrex_rate_limit_allowed_total", "Attempts let through.", lambda limiter: {"": limiter.counts["allowed"]}),
+        (
+            "lmrex_rate_limit_rejected_total",
+            "Attempts rejected, by the bucket that ran out.",
+            lambda limiter: {
+                f',bucket="{bucket}"': limiter.counts[f"rejected:{bucket}"] for bucket in limiter.limits
+            },
+        ),
+        (
+            "lmrex_rate_limit_backend_errors_total",
+            "Checks that fell back to in-process buckets.",
+            lambda limiter: {"": limiter.counts["backend_errors"]},
+        ),
+    ):
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+        for limiter in limiters:
+            for labels, value in samples(limiter).items():
+                lines.append(f'{metric}{{limiter="{limiter.name}"{labels}}} {value}')
+    return "\n".join(lines) + "\n"
+
+
+# Checked by the login and registration handlers before any password hashing
+login_limiter = RateLimiter(
+    "login", {"ip": Limit.parse(LOGIN_IP_RATE), "username": Limit.parse(LOGIN_USERNAME_RATE)}
+)
+registration_limiter = RateLimiter("registration", {"ip": Limit.parse(REGISTRATION_IP_RATE)})
+
+
+def rate_limit_metrics() -> str:
+    return prometheus(login_limiter, registration_limiter)
+
+
+register_metrics(rate_limit_metrics)
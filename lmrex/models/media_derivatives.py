@@ -0,0 +1,273 @@
+# lmrex/models/media_derivatives.py
+"""Responsive image derivatives (width variants, WebP/AVIF) keyed by content hash."""
+
+import asyncio
+import hashlib
+import io
+import ipaddress
+import json
+import logging
+import socket
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Sequence
+from urllib.parse import urlsplit
+
+import httpx
+
+from lmrex.models.media_model import MediaService, MediaType
+from rxconfig import DERIVATIVE_DIR, api_url
+
+try:
+    from PIL import Image, features
+except ImportError:  # Pillow is optional; without it the carousel serves originals
+    Image = None
+    features = None
+
+logger = logging.getLogger(__name__)
+
+DERIVATIVE_WIDTHS = (320, 640, 1280)
+DERIVATIVE_FORMATS = ("avif", "webp")
+# Written while the app runs, so served by the backend (see routes.backend_api)
+# rather than from assets/, which a production build freezes at export time
+CACHE_DIR = Path(DERIVATIVE_DIR)
+URL_PATH = "/derivatives"
+URL_PREFIX = api_url.rstrip("/") + URL_PATH
+CAROUSEL_SIZES = "(max-width: 640px) 100vw, 600px"
+# Limits on what a submitted URL can make the server download and decode
+MAX_SOURCE_BYTES = 25 * 1024 * 1024
+MAX_SOURCE_PIXELS = 40_000_000
+MAX_REDIRECTS = 5
+
+
+class UnsafeSourceError(ValueError):
+    """Raised for image sources the server must not fetch or decode."""
+
+
+def _render(
+    data: bytes, out_dir: str, widths: Sequence[int], formats: Sequence[str], max_pixels: int
+) -> Dict[str, Any]:
+    """Decode an image once and write every width/format variant. Runs in a worker process."""
+    # Only the header is read by open(); the pixel count is checked before decoding
+    Image.MAX_IMAGE_PIXELS = max_pixels
+    try:
+        image = Image.open(io.BytesIO(data))
+    except Image.DecompressionBombError as e:
+        raise UnsafeSourceError(str(e)) from None
+    if image.width * image.height > max_pixels:
+        raise UnsafeSourceError(f"Image is {image.width}x{image.height}, over {max_pixels} pixels")
+    image.load()
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+
+    # Never upscale; tiny sources still get a single re-encoded variant
+    targets = [width for width in widths if width < image.width] or [image.width]
+    variants: Dict[str, list] = {}
+    for width in targets:
+        height = max(round(image.height * width / image.width), 1)
+        resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+        for fmt in formats:
+            if not features.check(fmt):
+                continue
+            name = f"{width}.{fmt}"
+            resized.save(out / name, fmt.upper(), quality=75)
+            variants.setdefault(fmt, []).append([width, f"{out.name}/{name}"])
+
+    manifest = {"width": image.width, "height": image.height, "variants": variants}
+    (out / "manifest.json").write_text(json.dumps(manifest))
+    return manifest
+
+
+class DerivativeService:
+    """
+    Generate and look up responsive variants of catalog images.
+
+    Variants are written to ``cache_dir/<content hash>/<width>.<format>`` in a
+    process pool, so identical images fetched from different URLs share one
+    set of files. A small per-URL pointer file maps each source URL to its hash.
+
+    Sources are user-submitted URLs, so they are only fetched from public
+    addresses (every redirect hop is checked), at most ``max_source_bytes``
+    are read, and images over ``max_source_pixels`` are never decoded.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path = CACHE_DIR,
+        url_prefix: str = URL_PREFIX,
+        widths: Sequence[int] = DERIVATIVE_WIDTHS,
+        formats: Sequence[str] = DERIVATIVE_FORMATS,
+        max_workers: Optional[int] = None,
+        max_source_bytes: int = MAX_SOURCE_BYTES,
+        max_source_pixels: int = MAX_SOURCE_PIXELS,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.url_prefix = url_prefix
+        self.widths = tuple(widths)
+        self.formats = tuple(formats)
+        self.max_workers = max_workers
+        self.max_source_bytes = max_source_bytes
+        self.max_source_pixels = max_source_pixels
+        self.transport = transport
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._manifests: Dict[str, Dict[str, Any]] = {}
+
+    @staticmethod
+    def available() -> bool:
+        """Whether Pillow is installed."""
+        return Image is not None
+
+    @staticmethod
+    def content_hash(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()[:32]
+
+    def _pointer(self, url: str) -> Path:
+        return self.cache_dir / "urls" / hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+    def _manifest(self, digest: str) -> Optional[Dict[str, Any]]:
+        manifest = self._manifests.get(digest)
+        if manifest is None:
+            path = self.cache_dir / digest / "manifest.json"
+            if not path.exists():
+                return None
+            manifest = self._manifests[digest] = json.loads(path.read_text())
+        return manifest
+
+    def lookup(self, url: str) -> Optional[Dict[str, Any]]:
+        """Return the manifest for an already processed URL, or None."""
+        pointer = self._pointer(url)
+        if not pointer.exists():
+            return None
+        return self._manifest(pointer.read_text().strip())
+
+    def srcset(self, manifest: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """Return the ``srcset`` string per format for a manifest (empty without one)."""
+        sources = {fmt: "" for fmt in self.formats}
+        if manifest:
+            for fmt, variants in manifest["variants"].items():
+                sources[fmt] = ", ".join(
+                    f"{self.url_prefix}/{path} {width}w" for width, path in variants
+                )
+        return sources
+
+    @staticmethod
+    async def _check_public(url: str) -> None:
+        """Refuse URLs that are not http(s) or resolve to a non-public address."""
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise UnsafeSourceError(f"Not an http(s) URL: {url}")
+        try:
+            infos = await asyncio.get_running_loop().getaddrinfo(
+                parts.hostname, parts.port or (443 if parts.scheme == "https" else 80),
+                type=socket.SOCK_STREAM,
+            )
+        except socket.gaierror as e:
+            raise UnsafeSourceError(f"Cannot resolve {parts.hostname}: {e}") from e
+        for info in infos:
+            address = ipaddress.ip_address(info[4][0].split("%", 1)[0])
+            if not address.is_global:
+                raise UnsafeSourceError(f"{parts.hostname} resolves to non-public {address}")
+
+    async def _download(self, url: str) -> bytes:
+        """Stream an image source, hop by hop, stopping at ``max_source_bytes``."""
+        async with httpx.AsyncClient(timeout=30, transport=self.transport) as client:
+            for _ in range(MAX_REDIRECTS + 1):
+                await self._check_public(url)
+                async with client.stream("GET", url) as response:
+                    if response.has_redirect_location:
+                        url = str(response.url.join(response.headers["location"]))
+                        continue
+                    response.raise_for_status()
+                    length = response.headers.get("content-length", "")
+                    if length.isdigit() and int(length) > self.max_source_bytes:
+                        raise UnsafeSourceError(f"{url} is {length} bytes")
+                    data = bytearray()
+                    async for chunk in response.aiter_bytes():
+                        data += chunk
+                        if len(data) > self.max_source_bytes:
+                            raise UnsafeSourceError(f"{url} exceeds {self.max_source_bytes} bytes")
+                    return bytes(data)
+        raise UnsafeSourceError(f"{url}: more than {MAX_REDIRECTS} redirects")
+
+    async def ensure(self, url: str, data: Optional[bytes] = None) -> Optional[Dict[str, Any]]:
+        """Generate variants for an image URL unless they already exist."""
+        if not self.available():
+            return None
+        manifest = self.lookup(url)
+        if manifest is not None:
+            return manifest
+        if data is None:
+            data = await self._download(url)
+
+        digest = self.content_hash(data)
+        manifest = self._manifest(digest)
+        if manifest is None:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            manifest = await asyncio.get_running_loop().run_in_executor(
+                self._executor,
+                _render,
+                data,
+                str(self.cache_dir / digest),
+                self.widths,
+                self.formats,
+                self.max_source_pixels,
+            )
+            self._manifests[digest] = manifest
+
+        pointer = self._pointer(url)
+        pointer.parent.mkdir(parents=True, exist_ok=True)
+        pointer.write_text(digest)
+        return manifest
+
+    async def publish(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Generate variants for a catalog image and store their srcsets in its
+        render descriptor. Returns the updated item, or None without variants.
+        """
+        manifest = await self.ensure(url)
+        if manifest is None:
+            return None
+        return await asyncio.to_thread(MediaService.apply_image_sources, url, self.srcset(manifest))
+
+    async def publish_many(self, urls: Iterable[str]) -> int:
+        """Publish several URLs concurrently. Returns how many now have variants."""
+        results = await asyncio.gather(
+            *(self.publish(url) for url in dict.fromkeys(urls)), return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning("Failed to build derivatives: %s", result)
+        return sum(1 for result in results if isinstance(result, dict))
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+# Shared by the carousel state; the pool starts on first use
+derivatives = DerivativeService()
+
+
+async def build_catalog_derivatives(page_size: int = 100) -> int:
+    """Generate variants for every image in the catalog."""
+    built = 0
+    cursor = None
+    while True:
+        page, cursor = await asyncio.to_thread(
+            MediaService.list_page, cursor, page_size, MediaType.IMAGE.value
+        )
+        built += await derivatives.publish_many(item["url"] for item in page)
+        if cursor is None:
+            return built
+
+
+if __name__ == "__main__":
+    try:
+        print(f"Built derivatives for {asyncio.run(build_catalog_derivatives())} images")
+    finally:
+        derivatives.shutdown()
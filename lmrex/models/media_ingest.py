@@ -0,0 +1,127 @@
+# lmrex/models/media_ingest.py
+"""Bounded background queue that persists and enriches submitted media."""
+
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+from lmrex.models.media_metadata import MediaEnricher
+from lmrex.models.media_model import MediaService
+
+
+class IngestQueueFull(Exception):
+    """Raised when a submission cannot be queued before the enqueue timeout."""
+
+
+class MediaIngestQueue:
+    """
+    Persist and enrich media submissions on a small pool of worker tasks.
+
+    Form handlers await ``submit`` from a background event, so the session's
+    state lock is not held while the item is written and its metadata fetched.
+    At most ``max_depth`` submissions wait in the queue; once it is full a
+    submission waits up to ``enqueue_timeout`` seconds for a slot and is then
+    rejected with IngestQueueFull, so overload turns into a prompt error
+    instead of an ever-growing backlog.
+
+    Usage:
+        item = await ingest_queue.submit(title, url, media_type)
+    """
+
+    def __init__(
+        self,
+        max_depth: int = 64,
+        workers: int = 4,
+        enqueue_timeout: float = 0.5,
+        enrich: bool = True,
+        **enricher_options,
+    ):
+        self.max_depth = max_depth
+        self.workers = workers
+        self.enqueue_timeout = enqueue_timeout
+        self.enrich = enrich
+        self.enricher_options = enricher_options
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._enricher: Optional[MediaEnricher] = None
+
+    def _start(self) -> asyncio.Queue:
+        """Start the workers on the running loop, once per loop."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue(self.max_depth)
+            if self.enrich:
+                self._enricher = MediaEnricher(**self.enricher_options)
+            self._tasks = [loop.create_task(self._work()) for _ in range(self.workers)]
+        return self._queue
+
+    async def _ingest(self, title: str, url: str, media_type: str) -> Dict[str, Any]:
+        item = await asyncio.to_thread(MediaService.add, title, url, media_type)
+        if self._enricher is not None:
+            # Network failures only lose the metadata, never the item
+            await self._enricher.enrich_url(item["url"])
+        return item
+
+    async def _work(self) -> None:
+        queue = self._queue
+        while True:
+            args, future = await queue.get()
+            try:
+                result = await self._ingest(*args)
+            except Exception as e:
+                self.failed += 1
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                self.completed += 1
+                if not future.done():
+                    future.set_result(result)
+            finally:
+                queue.task_done()
+
+    async def submit(self, title: str, url: str, media_type: str) -> Dict[str, Any]:
+        """
+        Queue a submission and wait until it is persisted and enriched.
+
+        Returns the stored item. Raises IngestQueueFull when the queue stays
+        full, and the ValueError from validation for invalid submissions.
+        """
+        queue = self._start()
+        future = self._loop.create_future()
+        job: Tuple[Tuple[str, str, str], asyncio.Future] = ((title, url, media_type), future)
+        try:
+            await asyncio.wait_for(queue.put(job), self.enqueue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise IngestQueueFull(
+                "Too many submissions in progress, please try again shortly"
+            ) from None
+        return await future
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_depth": self.max_depth,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
+
+    async def aclose(self) -> None:
+        """Stop the workers and close the enricher's clients."""
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._enricher is not None:
+            await self._enricher.aclose()
+            self._enricher = None
+        self._loop = self._queue = None
+
+
+# Shared by the media forms; workers start with the first submission
+ingest_queue = MediaIngestQueue()
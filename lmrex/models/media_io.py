@@ -0,0 +1,76 @@
+# lmrex/models/media_io.py
+"""Streaming JSONL/CSV readers and writers for bulk media import/export."""
+
+import csv
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, TextIO, Union
+
+from lmrex.models.media_model import ImportReport, MediaService
+
+FIELDS = ("title", "url", "type")
+
+
+def read_rows(stream: TextIO, fmt: str) -> Iterator[Union[Dict[str, Any], ValueError]]:
+    """
+    Yield one row dict per record. Unparseable JSONL lines are yielded as
+    ValueError instances so the importer can report them by row number.
+    """
+    if fmt == "csv":
+        yield from csv.DictReader(stream)
+        return
+    for line in stream:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            yield ValueError(f"invalid JSON: {e.msg}")
+
+
+def write_rows(rows: Iterable[Dict[str, str]], stream: TextIO, fmt: str) -> int:
+    """Write rows one at a time. Returns the number written."""
+    count = 0
+    if fmt == "csv":
+        writer = csv.DictWriter(stream, fieldnames=FIELDS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+        return count
+    for row in rows:
+        stream.write(json.dumps(row) + "\n")
+        count += 1
+    return count
+
+
+def _format(path: Path) -> str:
+    return "csv" if path.suffix.lower() == ".csv" else "jsonl"
+
+
+def import_file(path: Union[str, Path]) -> ImportReport:
+    """Import a .jsonl or .csv file into the catalog."""
+    path = Path(path)
+    with path.open(newline="", encoding="utf-8") as stream:
+        return MediaService.import_stream(
+            read_rows(stream, _format(path)),
+            on_error=lambda row, message: print(f"  row {row}: {message}"),
+        )
+
+
+def export_file(path: Union[str, Path]) -> int:
+    """Export the catalog to a .jsonl or .csv file."""
+    path = Path(path)
+    with path.open("w", newline="", encoding="utf-8") as stream:
+        return write_rows(MediaService.export_stream(), stream, _format(path))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "import":
+        report = import_file(sys.argv[2])
+        print(f"Imported {report.imported} media items, {report.failed} rejected")
+    elif len(sys.argv) == 3 and sys.argv[1] == "export":
+        print(f"Exported {export_file(sys.argv[2])} media items")
+    else:
+        print("Usage: python -m lmrex.models.media_io import|export <file.jsonl|file.csv>")
@@ -0,0 +1,229 @@
+# lmrex/models/media_metadata.py
+"""Async metadata enrichment for media URLs (redirects, HEAD and oEmbed)."""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+import httpx
+import sqlalchemy as sa
+from sqlmodel import Field, select
+
+import reflex as rx
+
+from lmrex.models.media_model import MediaItem, MediaService
+
+logger = logging.getLogger(__name__)
+
+
+class MediaMetadata(rx.Model, table=True):
+    """Cached enrichment result for a media URL."""
+
+    url: str = Field(unique=True, index=True)
+    canonical_url: str = ""
+    content_type: str = ""
+    content_length: Optional[int] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    thumbnail_url: str = ""
+    provider: str = ""
+    fetched_at: float = 0.0
+    expires_at: float = Field(default=0.0, index=True)
+
+
+class MediaEnricher:
+    """
+    Resolve redirects and fetch HEAD/oEmbed metadata for media URLs.
+
+    Requests run with bounded overall concurrency and one pooled client per
+    host; redirects are followed hop by hop so each hop uses its own host's
+    client. Results are persisted in the MediaMetadata table and reused until
+    their TTL expires, and applied to the catalog item's render descriptor
+    (aspect ratio and poster) so the carousel can lay out embeds before they
+    load.
+
+    Usage:
+        async with MediaEnricher() as enricher:
+            metadata = await enricher.enrich(MediaService.get_default_media_items())
+    """
+
+    OEMBED_ENDPOINTS: Dict[str, str] = {
+        "vimeo.com": "https://vimeo.com/api/oembed.json",
+        "player.vimeo.com": "https://vimeo.com/api/oembed.json",
+        "soundcloud.com": "https://soundcloud.com/oembed",
+        "youtube.com": "https://www.youtube.com/oembed",
+        "www.youtube.com": "https://www.youtube.com/oembed",
+    }
+
+    MAX_REDIRECTS = 10
+
+    def __init__(
+        self,
+        concurrency: int = 8,
+        per_host_connections: int = 4,
+        ttl: float = 24 * 60 * 60,
+        timeout: float = 10.0,
+        oembed_endpoints: Optional[Dict[str, str]] = None,
+    ):
+        self.ttl = ttl
+        self.timeout = timeout
+        self.per_host_connections = per_host_connections
+        self.oembed_endpoints = oembed_endpoints or self.OEMBED_ENDPOINTS
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    async def __aenter__(self) -> "MediaEnricher":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close every pooled client."""
+        clients, self._clients = self._clients, {}
+        await asyncio.gather(*(client.aclose() for client in clients.values()))
+
+    def _client(self, url: str) -> httpx.AsyncClient:
+        """Return the pooled client for the URL's host."""
+        host = urlsplit(url).netloc
+        client = self._clients.get(host)
+        if client is None:
+            client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.per_host_connections,
+                    max_keepalive_connections=self.per_host_connections,
+                ),
+            )
+            self._clients[host] = client
+        return client
+
+    # ─────────────────────────────
+    # Cache
+    # ─────────────────────────────
+    @staticmethod
+    def cached(url: str, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Return unexpired cached metadata for a URL, or None."""
+        now = time.time() if now is None else now
+        with MediaService.session_factory() as session:
+            row = session.exec(
+                select(MediaMetadata).where(
+                    MediaMetadata.url == url, MediaMetadata.expires_at > now
+                )
+            ).first()
+            return row.model_dump() if row else None
+
+    def _store(self, url: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            return self._upsert(url, metadata)
+        except sa.exc.IntegrityError:
+            # A concurrent enrichment of the same URL inserted its row first
+            return self._upsert(url, metadata)
+
+    def _upsert(self, url: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        now = time.time()
+        with MediaService.session_factory() as session:
+            row = session.exec(
+                select(MediaMetadata).where(MediaMetadata.url == url)
+            ).first() or MediaMetadata(url=url)
+            for field, value in metadata.items():
+                setattr(row, field, value)
+            row.fetched_at = now
+            row.expires_at = now + self.ttl
+            session.add(row)
+            session.commit()
+            session.refresh(row)
+            return row.model_dump()
+
+    # ─────────────────────────────
+    # Fetching
+    # ─────────────────────────────
+    async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send a request, following redirects through each hop's own host client."""
+        for _ in range(self.MAX_REDIRECTS + 1):
+            response = await self._client(url).request(method, url, **kwargs)
+            if not response.has_redirect_location:
+                return response
+            url = str(response.url.join(response.headers["location"]))
+            # The query is part of the redirect target
+            kwargs.pop("params", None)
+        raise httpx.TooManyRedirects(f"More than {self.MAX_REDIRECTS} redirects", request=response.request)
+
+    async def _head(self, url: str) -> Dict[str, Any]:
+        """Follow redirects with HEAD and record the canonical URL and headers."""
+        response = await self._request("HEAD", url)
+        length = response.headers.get("content-length")
+        return {
+            "canonical_url": str(response.url),
+            "content_type": response.headers.get("content-type", "").split(";")[0],
+            "content_length": int(length) if length and length.isdigit() else None,
+        }
+
+    async def _oembed(self, url: str) -> Dict[str, Any]:
+        """Fetch oEmbed dimensions, duration and thumbnail if the host has a provider."""
+        endpoint = self.oembed_endpoints.get(urlsplit(url).hostname or "")
+        if endpoint is None:
+            return {}
+        response = await self._request("GET", endpoint, params={"url": url, "format": "json"})
+        if response.status_code != 200:
+            return {}
+        data = response.json()
+        return {
+            "width": _dimension(data.get("width")),
+            "height": _dimension(data.get("height")),
+            "thumbnail_url": str(data.get("thumbnail_url") or ""),
+            "provider": str(data.get("provider_name") or ""),
+        }
+
+    async def enrich_url(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Return metadata for one URL, from cache when fresh, and apply it to the
+        catalog item with that URL. None on network errors.
+        """
+        metadata = await asyncio.to_thread(self.cached, url)
+        if metadata is None:
+            async with self._semaphore:
+                try:
+                    fetched = await self._head(url)
+                    fetched.update(await self._oembed(fetched["canonical_url"]))
+                except (httpx.HTTPError, ValueError) as e:
+                    logger.warning("Failed to enrich %s: %s", url, e)
+                    return None
+            metadata = await asyncio.to_thread(self._store, url, fetched)
+        await asyncio.to_thread(MediaService.apply_metadata, url, metadata)
+        return metadata
+
+    async def enrich(self, items: Iterable[MediaItem]) -> Dict[str, Dict[str, Any]]:
+        """Enrich many items concurrently. Returns metadata keyed by original URL."""
+        urls: List[str] = list(dict.fromkeys(item.url for item in items))
+        results = await asyncio.gather(*(self.enrich_url(url) for url in urls))
+        return {url: result for url, result in zip(urls, results) if result is not None}
+
+
+def _dimension(value: Any) -> Optional[int]:
+    """A positive pixel size from an oEmbed field, which providers may send as a string."""
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        # Missing, or relative such as "100%"
+        return None
+    return size if size > 0 else None
+
+
+async def enrich_catalog(page_size: int = 100, **enricher_options) -> int:
+    """Walk the whole catalog page by page and enrich every item. Returns the count."""
+    enriched = 0
+    cursor = None
+    async with MediaEnricher(**enricher_options) as enricher:
+        while True:
+            page, cursor = await asyncio.to_thread(MediaService.list_page, cursor, page_size)
+            results = await enricher.enrich(MediaItem.from_dict(item) for item in page)
+            enriched += len(results)
+            if cursor is None:
+                return enriched
+
+
+if __name__ == "__main__":
+    print(f"Enriched {asyncio.run(enrich_catalog())} media items")
@@ -2,54 +2,421 @@
 #
 """Media service for managing media data and operations."""
 
-from typing import Dict, List, Optional, Tuple
+import hashlib
+import re
+import threading
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field, replace
+from enum import Enum
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import reflex as rx
+import sqlalchemy as sa
+from sqlmodel import Field, Session, func, select
+
+
+class MediaType(str, Enum):
+    """Supported media types. Members are singletons, so every item shares them."""
+
+    IMAGE = "image"
+    VIDEO = "video"
+    AUDIO = "audio"
+    TEXT = "text"
+
+
+@dataclass(frozen=True, slots=True)
+class RenderDescriptor:
+    """
+    How the carousel displays an item: which player component, what it loads,
+    at which aspect ratio ("" keeps the media's natural size), the poster
+    image shown while an embed loads and, for images, the srcsets of the
+    generated AVIF/WebP variants ("" for none).
+    """
+
+    player: str
+    embed_url: str
+    aspect_ratio: str = ""
+    poster: str = ""
+    avif: str = ""
+    webp: str = ""
+
+    def to_dict(self) -> Dict[str, str]:
+        return {
+            "player": self.player,
+            "embed_url": self.embed_url,
+            "aspect_ratio": self.aspect_ratio,
+            "poster": self.poster,
+            "avif": self.avif,
+            "webp": self.webp,
+        }
+
+    def with_metadata(
+        self, width: Optional[int], height: Optional[int], thumbnail_url: str
+    ) -> "RenderDescriptor":
+        """Refine the descriptor with an embed's reported size and thumbnail."""
+        aspect_ratio = self.aspect_ratio
+        if self.player == "iframe" and width and height:
+            aspect_ratio = f"{width} / {height}"
+        return replace(self, aspect_ratio=aspect_ratio, poster=thumbnail_url or self.poster)
+
+
+# Media type -> function building the render descriptor for a canonical URL
+RENDERERS: Dict[MediaType, Callable[[str], RenderDescriptor]] = {}
+
+
+def register_renderer(
+    media_type: MediaType,
+) -> Callable[[Callable[[str], RenderDescriptor]], Callable[[str], RenderDescriptor]]:
+    """Register the descriptor builder for a media type, replacing any previous one."""
+
+    def decorator(
+        build: Callable[[str], RenderDescriptor],
+    ) -> Callable[[str], RenderDescriptor]:
+        RENDERERS[media_type] = build
+        return build
+
+    return decorator
+
+
+@register_renderer(MediaType.IMAGE)
+def _render_image(url: str) -> RenderDescriptor:
+    return RenderDescriptor("image", url)
+
+
+@register_renderer(MediaType.VIDEO)
+def _render_video(url: str) -> RenderDescriptor:
+    parts = urlsplit(url)
+    if parts.hostname == "www.youtube.com" and parts.path == "/watch":
+        video_id = dict(parse_qsl(parts.query)).get("v", "")
+        url = f"https://www.youtube.com/embed/{video_id}"
+    return RenderDescriptor("iframe", url, "16 / 9")
+
+
+@register_renderer(MediaType.AUDIO)
+def _render_audio(url: str) -> RenderDescriptor:
+    host = urlsplit(url).hostname or ""
+    if host == "soundcloud.com" or host.endswith(".soundcloud.com"):
+        widget = "https://w.soundcloud.com/player/?" + urlencode({"url": url})
+        return RenderDescriptor("iframe", widget, "3 / 1")
+    return RenderDescriptor("audio", url)
+
+
+@register_renderer(MediaType.TEXT)
+def _render_text(url: str) -> RenderDescriptor:
+    return RenderDescriptor("text", url)
+
+
+@dataclass(frozen=True, slots=True)
+class MediaItem:
+    """Compact, immutable media record."""
+
+    title: str
+    url: str
+    type: MediaType = MediaType.IMAGE
+    id: Optional[int] = None
+    position: int = 0
+    render: Optional[RenderDescriptor] = None
+
+    def to_dict(self) -> Dict[str, str]:
+        """Return the dict shape the Reflex frontend expects."""
+        return {"title": self.title, "url": self.url, "type": self.type.value}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "MediaItem":
+        """Build an item from the frontend dict shape."""
+        return cls(data["title"], data["url"], MediaType(data["type"]))
+
+    @classmethod
+    def from_row(cls, media: "Media") -> "MediaItem":
+        """Build an item from a persisted catalog row."""
+        return cls(
+            media.title,
+            media.url,
+            MediaType(media.type),
+            media.id,
+            media.position,
+            RenderDescriptor(
+                media.player, media.embed_url, media.aspect_ratio, media.poster, media.avif, media.webp
+            ),
+        )
+
+
+class MediaCatalog:
+    """
+    Id-keyed, insertion-ordered media collection.
+
+    Every mutation touches a single dict entry (O(1)) and bumps ``version``.
+    A bounded journal remembers which ids changed, so readers holding an older
+    version can sync only the changed entries instead of the whole collection.
+
+    With a ``capacity`` the catalog acts as an LRU cache: reads refresh an
+    entry and the least recently used entries are evicted past the limit.
+    Evictions and cache fills via ``put`` are not changes and keep the version.
+
+    The catalog is shared with worker threads (MediaService calls run under
+    asyncio.to_thread), so entries and journal are guarded by one lock.
+    Listeners are called after it is released.
+    """
+
+    JOURNAL_SIZE = 1024
+
+    def __init__(self, items: Iterable[MediaItem] = (), capacity: Optional[int] = None):
+        self._items: Dict[int, MediaItem] = OrderedDict()
+        self._journal: Deque[Tuple[int, int]] = deque(maxlen=self.JOURNAL_SIZE)
+        self._listeners: List[Callable[[int], None]] = []
+        self._lock = threading.Lock()
+        self._next_id = 1
+        self.capacity = capacity
+        self.version = 0
+        for item in items:
+            self.add(item)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, media_id: int) -> bool:
+        return media_id in self._items
+
+    def __iter__(self) -> Iterator[MediaItem]:
+        with self._lock:
+            return iter(list(self._items.values()))
+
+    def ids(self) -> List[int]:
+        """Return the item ids in insertion order."""
+        with self._lock:
+            return list(self._items)
+
+    def get(self, media_id: int) -> Optional[MediaItem]:
+        """Return the item with the given id, or None."""
+        with self._lock:
+            item = self._items.get(media_id)
+            if item is not None and self.capacity is not None:
+                self._items.move_to_end(media_id)
+            return item
+
+    def add(self, item: MediaItem) -> int:
+        """Append an item, assigning an id if it has none. Returns the id."""
+        with self._lock:
+            media_id = item.id if item.id is not None else self._next_id
+            self._store(media_id, item)
+            version = self._record(media_id)
+        self._notify(version)
+        return media_id
+
+    def put(self, item: MediaItem) -> None:
+        """
+        Cache an item read from the database. Only a cached entry that differs
+        (an edit made elsewhere) counts as a change.
+        """
+        with self._lock:
+            cached = self._items.get(item.id)
+            self._store(item.id, item)
+            if cached is None or cached == item:
+                return
+            version = self._record(item.id)
+        self._notify(version)
+
+    def update(self, media_id: int, item: MediaItem) -> bool:
+        """Replace the item stored under media_id. Returns False if missing."""
+        with self._lock:
+            if media_id not in self._items:
+                return False
+            self._store(media_id, item)
+            version = self._record(media_id)
+        self._notify(version)
+        return True
+
+    def remove(self, media_id: int) -> bool:
+        """Remove the item stored under media_id. Returns False if missing."""
+        with self._lock:
+            if self._items.pop(media_id, None) is None:
+                return False
+            version = self._record(media_id)
+        self._notify(version)
+        return True
+
+    def invalidate(self, media_id: int) -> None:
+        """Drop an entry and record a change, whether or not it was cached."""
+        self.invalidate_many([media_id])
+
+    def invalidate_many(self, media_ids: Iterable[int]) -> None:
+        """Invalidate a batch of ids, notifying listeners once."""
+        with self._lock:
+            version = None
+            for media_id in media_ids:
+                self._items.pop(media_id, None)
+                version = self._record(media_id)
+        if version is not None:
+            self._notify(version)
+
+    def subscribe(self, listener: Callable[[int], None]) -> Callable[[], None]:
+        """
+        Call ``listener`` with the new version after every change. It may run
+        on any thread. Returns a function that unsubscribes it.
+        """
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    def changes_since(self, version: int) -> Optional[Dict[int, Optional[MediaItem]]]:
+        """
+        Map each id changed after ``version`` to its current item (None if
+        removed or not cached). Returns None when the journal no longer reaches
+        back that far.
+        """
+        with self._lock:
+            if version == self.version:
+                return {}
+            if not self._journal or self._journal[0][0] > version + 1:
+                return None
+            return {
+                media_id: self._items.get(media_id)
+                for changed_at, media_id in self._journal
+                if changed_at > version
+            }
+
+    def _store(self, media_id: int, item: MediaItem) -> None:
+        self._next_id = max(self._next_id, media_id + 1)
+        self._items[media_id] = replace(item, id=media_id)
+        if self.capacity is not None:
+            self._items.move_to_end(media_id)
+            while len(self._items) > self.capacity:
+                self._items.popitem(last=False)
+
+    def _record(self, media_id: int) -> int:
+        self.version += 1
+        self._journal.append((self.version, media_id))
+        return self.version
+
+    def _notify(self, version: int) -> None:
+        for listener in list(self._listeners):
+            listener(version)
+
+
+class DuplicateMediaError(ValueError):
+    """Raised when a media URL is already in the catalog."""
+
+
+@dataclass
+class ImportReport:
+    """Outcome of a bulk import. Only the first MAX_ERRORS errors are kept."""
+
+    MAX_ERRORS = 100
+
+    imported: int = 0
+    failed: int = 0
+    errors: List[Tuple[int, str]] = field(default_factory=list)
+
+    def record_error(self, row_number: int, message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < self.MAX_ERRORS:
+            self.errors.append((row_number, message))
+
+
+class Media(rx.Model, table=True):
+    """Persisted media catalog entry, ordered by (position, id)."""
+
+    __table_args__ = (sa.Index("ix_media_position_id", "position", "id"),)
+
+    title: str = ""
+    url: str = ""
+    # sha256 of the canonical URL; a fixed-width unique key for duplicate probes
+    url_hash: str = Field(default="", unique=True, index=True)
+    type: str = Field(default="image", index=True)
+    position: int = 0
+    # Render descriptor, computed once when the row is written
+    player: str = "image"
+    embed_url: str = ""
+    aspect_ratio: str = ""
+    poster: str = ""
+    avif: str = ""
+    webp: str = ""
 
 
 class MediaService:
     """Service class for managing media items."""
 
-    DEFAULT_MEDIA_ITEMS: List[Dict[str, str]] = [
-        {
-            "title": "Panama Rose",
-            "url": "https://mir-s3-cdn-cf.behance.net/project_modules/1400_webp/230b6e209581411.6778b1b7b0b77.jpeg",
-            "type": "image",
-        },
-        {
-            "title": "~OM~",
-            "url": "https://mir-s3-cdn-cf.behance.net/project_modules/1400_webp/09397a148430145.62d5a256db3d1.jpg",
-            "type": "image",
-        },
-        {
-            "title": "Swirls",
-            "url": "https://player.vimeo.com/video/1127068081?",
-            "type": "video",
-        },
-        {
-            "title": "Test_Audio",
-            "url": "https://on.soundcloud.com/LSgMc7ip5ZocgIF431",
-            "type": "audio",
-        },
-    ]
-
-    VALID_MEDIA_TYPES = ["image", "video", "audio", "text"]
+    DEFAULT_MEDIA_ITEMS: Tuple[MediaItem, ...] = (
+        MediaItem(
+            "Panama Rose",
+            "https://mir-s3-cdn-cf.behance.net/project_modules/1400_webp/230b6e209581411.6778b1b7b0b77.jpeg",
+            MediaType.IMAGE,
+        ),
+        MediaItem(
+            "~OM~",
+            "https://mir-s3-cdn-cf.behance.net/project_modules/1400_webp/09397a148430145.62d5a256db3d1.jpg",
+            MediaType.IMAGE,
+        ),
+        MediaItem(
+            "Swirls",
+            "https://player.vimeo.com/video/1127068081?",
+            MediaType.VIDEO,
+        ),
+        MediaItem(
+            "Test_Audio",
+            "https://on.soundcloud.com/LSgMc7ip5ZocgIF431",
+            MediaType.AUDIO,
+        ),
+    )
+
+    VALID_MEDIA_TYPES = [media_type.value for media_type in MediaType]
+
+    PAGE_SIZE = 20
+
+    # Query parameters that never change what a media URL points to
+    TRACKING_PARAMS = ("fbclid", "gclid", "igshid", "si", "ref")
+    IMPORT_BATCH_SIZE = 1000
+
+    # Swapped out in tests to point the catalog at a throwaway engine
+    session_factory: Callable[[], Session] = rx.session
+
+    # Process-wide LRU cache of catalog rows shared by every session. The
+    # write methods journal their changes so sessions can be invalidated.
+    CATALOG_CACHE_SIZE = 10_000
+    catalog = MediaCatalog(capacity=CATALOG_CACHE_SIZE)
+
+    # Full-text index DDL per dialect. Triggers (SQLite) and a generated
+    # column (Postgres) keep the index in step with every add/update/remove.
+    SEARCH_INDEX_DDL: Dict[str, List[str]] = {
+        "sqlite": [
+            "CREATE VIRTUAL TABLE IF NOT EXISTS media_fts USING fts5("
+            "title, content='media', content_rowid='id', prefix='2 3', "
+            "tokenize='unicode61 remove_diacritics 2')",
+            "CREATE TRIGGER IF NOT EXISTS media_fts_ai AFTER INSERT ON media BEGIN "
+            "INSERT INTO media_fts(rowid, title) VALUES (new.id, new.title); END",
+            "CREATE TRIGGER IF NOT EXISTS media_fts_ad AFTER DELETE ON media BEGIN "
+            "INSERT INTO media_fts(media_fts, rowid, title) "
+            "VALUES ('delete', old.id, old.title); END",
+            "CREATE TRIGGER IF NOT EXISTS media_fts_au AFTER UPDATE OF title ON media BEGIN "
+            "INSERT INTO media_fts(media_fts, rowid, title) "
+            "VALUES ('delete', old.id, old.title); "
+            "INSERT INTO media_fts(rowid, title) VALUES (new.id, new.title); END",
+        ],
+        "postgresql": [
+            "ALTER TABLE media ADD COLUMN IF NOT EXISTS search_vector tsvector "
+            "GENERATED ALWAYS AS (to_tsvector('simple', coalesce(title, ''))) STORED",
+            "CREATE INDEX IF NOT EXISTS ix_media_search_vector "
+            "ON media USING GIN (search_vector)",
+        ],
+    }
 
     # ─────────────────────────────
     # Retrieval Methods
     # ─────────────────────────────
     @staticmethod
-    def get_default_media_items() -> List[Dict[str, str]]:
+    def get_default_media_items() -> List[MediaItem]:
         """Return a copy of the default media items."""
-        return MediaService.DEFAULT_MEDIA_ITEMS.copy()
+        return list(MediaService.DEFAULT_MEDIA_ITEMS)
 
     @staticmethod
-    def get_media_count(media_list: List[Dict[str, str]]) -> int:
+    def get_media_count(catalog: MediaCatalog) -> int:
         """Return the total number of media items."""
-        return len(media_list)
+        return len(catalog)
 
     @staticmethod
     def get_media_item_by_index(
-        media_list: List[Dict[str, str]], index: int
-    ) -> Optional[Dict[str, str]]:
+        media_list: List[MediaItem], index: int
+    ) -> Optional[MediaItem]:
         """Return a media item by index. Returns None if index is invalid."""
         if 0 <= index < len(media_list):
             return media_list[index]
@@ -58,7 +425,14 @@ class MediaService:
     @staticmethod
     def get_empty_media_item() -> Dict[str, str]:
         """Return an empty media item structure."""
-        return {"title": "", "url": "", "type": "image"}
+        return {**MediaItem("", "").to_dict(), **RenderDescriptor("", "").to_dict()}
+
+    @staticmethod
+    def describe(item: MediaItem) -> RenderDescriptor:
+        """Return the item's render descriptor, building it if it was never stored."""
+        if item.render is not None:
+            return item.render
+        return RENDERERS[item.type](item.url)
 
     # ─────────────────────────────
     # Creation / Mutation Methods
@@ -69,46 +443,489 @@ class MediaService:
         return media_type.lower() in MediaService.VALID_MEDIA_TYPES
 
     @staticmethod
-    def create_media_item(title: str, url: str, media_type: str) -> Dict[str, str]:
-        """Create a new media item dictionary."""
+    def canonicalize_url(url: str) -> str:
+        """
+        Normalize a media URL so equivalent forms compare equal: lowercase
+        scheme and host, no default port, fragment, tracking parameters or
+        empty query, sorted query parameters, and provider embed forms for
+        Vimeo and YouTube links.
+        """
+        url = url.strip()
+        if not url:
+            return ""
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        host = (parts.hostname or "").lower()
+        if parts.port and (scheme, parts.port) not in (("http", 80), ("https", 443)):
+            host = f"{host}:{parts.port}"
+        path = parts.path.rstrip("/") or ("/" if host else "")
+        query = sorted(
+            (key, value)
+            for key, value in parse_qsl(parts.query, keep_blank_values=True)
+            if key not in MediaService.TRACKING_PARAMS and not key.startswith("utm_")
+        )
+
+        if host in ("vimeo.com", "www.vimeo.com") and re.fullmatch(r"/\d+", path):
+            host, path = "player.vimeo.com", "/video" + path
+        elif host == "youtu.be" and len(path) > 1:
+            host, query = "www.youtube.com", sorted(query + [("v", path[1:])])
+            path = "/watch"
+        elif host == "youtube.com":
+            host = "www.youtube.com"
+
+        return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+    @staticmethod
+    def url_hash(url: str) -> str:
+        """Return the index key for an already canonical URL."""
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def create_media_item(title: str, url: str, media_type: str) -> MediaItem:
+        """Create a new media item with a canonical URL."""
         if not MediaService.is_valid_media_type(media_type):
             raise ValueError(f"Invalid media type: {media_type}")
-        return {"title": title.strip(), "url": url.strip(), "type": media_type.lower()}
+        return MediaItem(
+            title.strip(),
+            MediaService.canonicalize_url(url),
+            MediaType(media_type.lower()),
+        )
 
     @staticmethod
     def add_media(
-        media_list: List[Dict[str, str]], title: str, url: str, media_type: str
-    ) -> List[Dict[str, str]]:
-        """Add a new media item to the list."""
+        catalog: MediaCatalog, title: str, url: str, media_type: str
+    ) -> int:
+        """Add a new media item to the catalog. Returns its id."""
         new_item = MediaService.create_media_item(title, url, media_type)
-        return media_list + [new_item]
-        media_list.append(new_item)
+        return catalog.add(new_item)
 
     @staticmethod
-    def remove_media_item(
-        media_list: List[Dict[str, str]], index: int
-    ) -> List[Dict[str, str]]:
-        """Remove a media item at the specified index."""
-        if 0 <= index < len(media_list):
-            return media_list[:index] + media_list[index + 1 :]
-        return media_list
+    def remove_media_item(catalog: MediaCatalog, media_id: int) -> bool:
+        """Remove the media item with the specified id."""
+        return catalog.remove(media_id)
 
     @staticmethod
     def update_media_item(
-        media_list: List[Dict[str, str]],
-        index: int,
+        catalog: MediaCatalog,
+        media_id: int,
         title: str,
         url: str,
         media_type: str,
-    ) -> List[Dict[str, str]]:
-        """Update a media item at the specified index."""
-        if not (0 <= index < len(media_list)):
-            return media_list
+    ) -> bool:
+        """Update the media item with the specified id."""
+        if media_id not in catalog:
+            return False
 
         updated_item = MediaService.create_media_item(title, url, media_type)
-        new_list = media_list.copy()
-        new_list[index] = updated_item
-        return new_list
+        return catalog.update(media_id, updated_item)
+
+    # ─────────────────────────────
+    # Catalog (Database) Methods
+    # ─────────────────────────────
+    @staticmethod
+    def encode_cursor(position: int, media_id: int) -> str:
+        """Encode a (position, id) keyset into an opaque page cursor."""
+        return f"{position}:{media_id}"
+
+    @staticmethod
+    def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[int, int]]:
+        """Decode a page cursor. Returns None for an empty or malformed cursor."""
+        if not cursor:
+            return None
+        try:
+            position, media_id = cursor.split(":", 1)
+            return int(position), int(media_id)
+        except ValueError:
+            return None
+
+    @staticmethod
+    def to_dict(media: MediaItem) -> Dict[str, Any]:
+        """Return the dict shape the frontend expects for a catalog item."""
+        return {
+            **media.to_dict(),
+            **MediaService.describe(media).to_dict(),
+            "id": media.id,
+            "position": media.position,
+        }
+
+    @staticmethod
+    def cursor_of(item: Dict[str, Any]) -> str:
+        """Return the page cursor pointing at a catalog item dict."""
+        return MediaService.encode_cursor(item["position"], item["id"])
+
+    @staticmethod
+    def list_page(
+        cursor: Optional[str] = None,
+        limit: int = PAGE_SIZE,
+        type: Optional[str] = None,
+        backward: bool = False,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Return one page of the catalog using keyset pagination on (position, id).
+
+        Forward pages hold the items after ``cursor``; backward pages hold the
+        items before it (or the tail of the catalog when no cursor is given).
+        Items are always returned in ascending order. The second element is the
+        cursor to continue in the same direction, or None when exhausted.
+        """
+        rows, next_cursor = MediaService._page_rows(cursor, limit, type, backward)
+        items = [MediaService._mirror(row) for row in rows]
+        return [MediaService.to_dict(item) for item in items], next_cursor
+
+    @staticmethod
+    def _page_rows(
+        cursor: Optional[str], limit: int, type: Optional[str], backward: bool
+    ) -> Tuple[List[Media], Optional[str]]:
+        """Run the keyset page query without touching the catalog mirror."""
+        key = MediaService.decode_cursor(cursor)
+        order = (Media.position, Media.id)
+        query = select(Media)
+        if type is not None:
+            query = query.where(Media.type == type.lower())
+        if key is not None:
+            comparison = sa.tuple_(*order) < key if backward else sa.tuple_(*order) > key
+            query = query.where(comparison)
+        if backward:
+            query = query.order_by(*(col.desc() for col in order))
+        else:
+            query = query.order_by(*order)
+
+        with MediaService.session_factory() as session:
+            rows = list(session.exec(query.limit(limit + 1)).all())
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if backward:
+            rows.reverse()
+        next_cursor = None
+        if has_more and rows:
+            edge = rows[0] if backward else rows[-1]
+            next_cursor = MediaService.encode_cursor(edge.position, edge.id)
+        return rows, next_cursor
+
+    @staticmethod
+    def get(media_id: int) -> Optional[Dict[str, Any]]:
+        """Return a catalog item by id, or None if it does not exist."""
+        item = MediaService.catalog.get(media_id)
+        if item is None:
+            with MediaService.session_factory() as session:
+                media = session.get(Media, media_id)
+                if media is None:
+                    return None
+                item = MediaService._mirror(media)
+        return MediaService.to_dict(item)
+
+    @staticmethod
+    def count(type: Optional[str] = None) -> int:
+        """Return the number of catalog items, optionally filtered by type."""
+        query = select(func.count()).select_from(Media)
+        if type is not None:
+            query = query.where(Media.type == type.lower())
+        with MediaService.session_factory() as session:
+            return session.exec(query).one()
+
+    @staticmethod
+    def _row_values(item: MediaItem) -> Dict[str, Any]:
+        """Column values for persisting an item, including its URL hash and render descriptor."""
+        return {
+            **item.to_dict(),
+            **RENDERERS[item.type](item.url).to_dict(),
+            "url_hash": MediaService.url_hash(item.url),
+        }
+
+    @staticmethod
+    def find_by_url(url: str) -> Optional[int]:
+        """Return the id of the item with an equivalent URL, via one index probe."""
+        url_hash = MediaService.url_hash(MediaService.canonicalize_url(url))
+        with MediaService.session_factory() as session:
+            return session.exec(select(Media.id).where(Media.url_hash == url_hash)).first()
+
+    @staticmethod
+    def _commit_unique(session: Session, url: str) -> None:
+        """Commit, turning a unique violation on url_hash into DuplicateMediaError."""
+        try:
+            session.commit()
+        except sa.exc.IntegrityError as e:
+            session.rollback()
+            raise DuplicateMediaError(f"Media already exists: {url}") from e
+
+    @staticmethod
+    def add(title: str, url: str, media_type: str) -> Dict[str, Any]:
+        """Validate and persist a new item at the end of the catalog."""
+        item = MediaService.create_media_item(title, url, media_type)
+        values = MediaService._row_values(item)
+        with MediaService.session_factory() as session:
+            if session.exec(
+                select(Media.id).where(Media.url_hash == values["url_hash"])
+            ).first() is not None:
+                raise DuplicateMediaError(f"Media already exists: {item.url}")
+            last = session.exec(select(func.max(Media.position))).one()
+            media = Media(**values, position=(last or 0) + 1)
+            session.add(media)
+            MediaService._commit_unique(session, item.url)
+            session.refresh(media)
+            return MediaService.to_dict(MediaService._publish(media))
+
+    @staticmethod
+    def update(
+        media_id: int, title: str, url: str, media_type: str
+    ) -> Optional[Dict[str, Any]]:
+        """Validate and update a catalog item. Returns None if it does not exist."""
+        item = MediaService.create_media_item(title, url, media_type)
+        with MediaService.session_factory() as session:
+            media = session.get(Media, media_id)
+            if media is None:
+                return None
+            values = MediaService._row_values(item)
+            if (media.url, media.type) == (item.url, item.type.value):
+                # Same media: keep the descriptor refined by enrichment
+                for name in RenderDescriptor.__slots__:
+                    del values[name]
+            for field, value in values.items():
+                setattr(media, field, value)
+            session.add(media)
+            MediaService._commit_unique(session, item.url)
+            session.refresh(media)
+            return MediaService.to_dict(MediaService._publish(media))
+
+    @staticmethod
+    def apply_metadata(url: str, metadata: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Refine the stored render descriptor of the item with an equivalent URL
+        from its enrichment metadata. Returns the item, or None if there is none.
+        """
+        return MediaService._refine(
+            url,
+            lambda render: render.with_metadata(
+                metadata.get("width"), metadata.get("height"), metadata.get("thumbnail_url", "")
+            ),
+        )
+
+    @staticmethod
+    def apply_image_sources(url: str, sources: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        """Store the srcsets of an image's generated variants in its render descriptor."""
+        return MediaService._refine(
+            url,
+            lambda render: replace(
+                render, avif=sources.get("avif", render.avif), webp=sources.get("webp", render.webp)
+            ),
+        )
+
+    @staticmethod
+    def _refine(
+        url: str, refine: Callable[[RenderDescriptor], RenderDescriptor]
+    ) -> Optional[Dict[str, Any]]:
+        """Rewrite the stored render descriptor of the item with an equivalent URL."""
+        url_hash = MediaService.url_hash(MediaService.canonicalize_url(url))
+        with MediaService.session_factory() as session:
+            media = session.exec(select(Media).where(Media.url_hash == url_hash)).first()
+            if media is None:
+                return None
+            stored = MediaItem.from_row(media).render
+            values = refine(stored).to_dict()
+            if values == stored.to_dict():
+                return MediaService.to_dict(MediaService._mirror(media))
+            for field, value in values.items():
+                setattr(media, field, value)
+            session.add(media)
+            session.commit()
+            session.refresh(media)
+            return MediaService.to_dict(MediaService._publish(media))
+
+    @staticmethod
+    def remove(media_id: int) -> bool:
+        """Delete a catalog item. Returns False if it did not exist."""
+        with MediaService.session_factory() as session:
+            media = session.get(Media, media_id)
+            if media is None:
+                return False
+            session.delete(media)
+            session.commit()
+        MediaService.catalog.invalidate(media_id)
+        return True
+
+    @staticmethod
+    def _mirror(media: Media) -> MediaItem:
+        """Cache a catalog row read from the database and return it."""
+        item = MediaItem.from_row(media)
+        MediaService.catalog.put(item)
+        return item
+
+    @staticmethod
+    def _publish(media: Media) -> MediaItem:
+        """Cache a row this process just wrote and journal it as a change."""
+        item = MediaItem.from_row(media)
+        if not MediaService.catalog.update(item.id, item):
+            MediaService.catalog.add(item)
+        return item
+
+    # ─────────────────────────────
+    # Search Methods
+    # ─────────────────────────────
+    @staticmethod
+    def create_search_index(engine: sa.engine.Engine) -> None:
+        """Create the full-text index for the engine's dialect and backfill it."""
+        statements = MediaService.SEARCH_INDEX_DDL.get(engine.dialect.name, [])
+        with engine.begin() as connection:
+            for statement in statements:
+                connection.execute(sa.text(statement))
+            if engine.dialect.name == "sqlite":
+                connection.execute(
+                    sa.text("INSERT INTO media_fts(media_fts) VALUES ('rebuild')")
+                )
+
+    @staticmethod
+    def _search_terms(query: str) -> List[str]:
+        """Split a user query into plain word tokens safe to embed in FTS syntax."""
+        return re.findall(r"\w+", query.lower())
+
+    @staticmethod
+    def search(query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Return catalog items whose title matches every word of ``query``
+        (the last word as a prefix), best match first.
+        """
+        terms = MediaService._search_terms(query)
+        if not terms:
+            return []
+        columns = (
+            "m.id, m.title, m.url, m.type, m.position, "
+            "m.player, m.embed_url, m.aspect_ratio, m.poster, m.avif, m.webp"
+        )
+        with MediaService.session_factory() as session:
+            dialect = session.get_bind().dialect.name
+            if dialect == "sqlite":
+                match = " ".join(f'"{term}"' for term in terms) + "*"
+                # Rank inside FTS5 first so only `limit` rows are joined
+                statement = sa.text(
+                    f"SELECT {columns} FROM ("
+                    "SELECT rowid, rank FROM media_fts WHERE media_fts MATCH :match "
+                    "ORDER BY rank LIMIT :limit"
+                    ") hits JOIN media m ON m.id = hits.rowid ORDER BY hits.rank"
+                )
+            elif dialect == "postgresql":
+                match = " & ".join(terms) + ":*"
+                statement = sa.text(
+                    f"SELECT {columns} FROM media m, to_tsquery('simple', :match) q "
+                    "WHERE m.search_vector @@ q "
+                    "ORDER BY ts_rank(m.search_vector, q) DESC, m.position, m.id "
+                    "LIMIT :limit"
+                )
+            else:
+                match = "%" + "%".join(terms) + "%"
+                statement = sa.text(
+                    f"SELECT {columns} FROM media m WHERE lower(m.title) LIKE :match "
+                    "ORDER BY m.position, m.id LIMIT :limit"
+                )
+            rows = session.execute(statement, {"match": match, "limit": limit}).all()
+        return [MediaService.to_dict(MediaService._mirror(row)) for row in rows]
+
+    # ─────────────────────────────
+    # Bulk Import / Export Methods
+    # ─────────────────────────────
+    @staticmethod
+    def import_stream(
+        rows: Iterable[Any],
+        batch_size: Optional[int] = None,
+        on_error: Optional[Callable[[int, str], None]] = None,
+    ) -> ImportReport:
+        """
+        Validate rows through create_media_item and append them to the catalog
+        in batched executemany inserts. Invalid rows are reported (and passed to
+        ``on_error``) without aborting the import. Rows may be dicts with
+        title/url/type keys, or exceptions raised while parsing the source.
+        """
+        batch_size = batch_size or MediaService.IMPORT_BATCH_SIZE
+        report = ImportReport()
+        insert = Media.__table__.insert()
+
+        def reject(row_number: int, message: str) -> None:
+            report.record_error(row_number, message)
+            if on_error is not None:
+                on_error(row_number, message)
+
+        with MediaService.session_factory() as session:
+            position = session.exec(select(func.max(Media.position))).one() or 0
+            # url_hash -> (row number, values) for the rows awaiting insert
+            batch: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+
+            def flush() -> None:
+                nonlocal position
+                existing = set(
+                    session.exec(
+                        select(Media.url_hash).where(Media.url_hash.in_(list(batch)))
+                    ).all()
+                )
+                values = []
+                for url_hash, (row_number, row_values) in batch.items():
+                    if url_hash in existing:
+                        reject(row_number, f"duplicate url {row_values['url']}")
+                        continue
+                    position += 1
+                    values.append({**row_values, "position": position})
+                if values:
+                    session.execute(insert, values)
+                    session.commit()
+                    # Journal the batch so open carousels pick the rows up
+                    MediaService.catalog.invalidate_many(
+                        session.exec(
+                            select(Media.id).where(
+                                Media.url_hash.in_([row["url_hash"] for row in values])
+                            )
+                        ).all()
+                    )
+                report.imported += len(values)
+                batch.clear()
+
+            for row_number, row in enumerate(rows, 1):
+                try:
+                    if isinstance(row, Exception):
+                        raise ValueError(str(row))
+                    if not isinstance(row, dict):
+                        raise ValueError("row is not an object")
+                    item = MediaService.create_media_item(
+                        str(row["title"]), str(row["url"]), str(row.get("type") or "image")
+                    )
+                    if not item.url:
+                        raise ValueError("url is empty")
+                except (KeyError, ValueError) as e:
+                    reject(row_number, f"missing field {e}" if isinstance(e, KeyError) else str(e))
+                    continue
+                row_values = MediaService._row_values(item)
+                if row_values["url_hash"] in batch:
+                    reject(row_number, f"duplicate url {item.url}")
+                    continue
+                batch[row_values["url_hash"]] = (row_number, row_values)
+                if len(batch) >= batch_size:
+                    flush()
+            if batch:
+                flush()
+        return report
+
+    @staticmethod
+    def export_stream(
+        batch_size: Optional[int] = None, type: Optional[str] = None
+    ) -> Iterator[Dict[str, str]]:
+        """Yield every catalog item in order, one keyset page in memory at a time."""
+        batch_size = batch_size or MediaService.IMPORT_BATCH_SIZE
+        cursor = None
+        while True:
+            rows, cursor = MediaService._page_rows(cursor, batch_size, type, False)
+            for row in rows:
+                yield MediaItem.from_row(row).to_dict()
+            if cursor is None:
+                return
+
+    @staticmethod
+    def seed_default_media() -> int:
+        """Insert DEFAULT_MEDIA_ITEMS into an empty catalog. Returns rows added."""
+        with MediaService.session_factory() as session:
+            if session.exec(select(func.count()).select_from(Media)).one():
+                return 0
+            for position, item in enumerate(MediaService.DEFAULT_MEDIA_ITEMS, 1):
+                item = replace(item, url=MediaService.canonicalize_url(item.url))
+                session.add(Media(**MediaService._row_values(item), position=position))
+            session.commit()
+            return len(MediaService.DEFAULT_MEDIA_ITEMS)
 
 
 if __name__ == "__main__":
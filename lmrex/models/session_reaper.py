@@ -0,0 +1,133 @@
+# lmrex/models/session_reaper.py
+"""Background sweeper deleting expired reflex-local-auth sessions."""
+
+import asyncio
+import datetime
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+import reflex as rx
+from reflex_local_auth.auth_session import LocalAuthSession
+from sqlalchemy import Index, delete
+from sqlmodel import select
+
+from lmrex.middleware.profiling import register_metrics
+from lmrex.state.session_cache import session_cache
+from rxconfig import SESSION_REAP_BATCH, SESSION_REAP_INTERVAL
+
+# Lets each batch read the oldest expired rows instead of scanning the table;
+# created by migration a3d5e8f1b2c4 (and by create_all for new databases)
+EXPIRATION_INDEX = Index("ix_localauthsession_expiration", LocalAuthSession.__table__.c.expiration)
+
+
+class SessionReaper:
+    """
+    Delete expired LocalAuthSession rows in bounded batches.
+
+    Each batch selects at most ``batch_size`` of the oldest expired rows
+    through the expiration index and deletes them by id in its own short
+    transaction, so logins are never blocked behind one large delete. A sweep
+    stops after ``max_batches``; whatever is left waits for the next sweep.
+
+    Usage:
+        reaped = session_reaper.sweep()
+    """
+
+    def __init__(self, interval: float = 600.0, batch_size: int = 500, max_batches: int = 20):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self.counts: Counter = Counter()
+        self.errors: Counter = Counter()
+        self.seconds = 0.0
+        self.last_sweep_seconds = 0.0
+
+    def reap_batch(self, now: datetime.datetime) -> int:
+        """Delete up to ``batch_size`` sessions that expired before ``now``."""
+        with rx.session() as session:
+            expired = session.exec(
+                select(LocalAuthSession.id, LocalAuthSession.session_id)
+                .where(LocalAuthSession.expiration < now)
+                .order_by(LocalAuthSession.expiration)
+                .limit(self.batch_size)
+            ).all()
+            if not expired:
+                return 0
+            session.exec(delete(LocalAuthSession).where(LocalAuthSession.id.in_([row[0] for row in expired])))
+            session.commit()
+        # Bulk deletes skip the ORM events the session cache listens to
+        for _, token in expired:
+            session_cache.invalidate(token)
+        return len(expired)
+
+    def sweep(self, now: Optional[datetime.datetime] = None) -> int:
+        """Run batches until the expired rows run out or ``max_batches`` is reached."""
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        started = time.perf_counter()
+        reaped = 0
+        try:
+            for _ in range(self.max_batches):
+                count = self.reap_batch(now)
+                self.counts["batches"] += 1
+                reaped += count
+                if count < self.batch_size:
+                    break
+        finally:
+            self.last_sweep_seconds = time.perf_counter() - started
+            self.seconds += self.last_sweep_seconds
+            self.counts["sweeps"] += 1
+            self.counts["rows"] += reaped
+        return reaped
+
+    async def run(self) -> None:
+        """Sweep every ``interval`` seconds until cancelled; errors wait for the next sweep."""
+        while True:
+            try:
+                await asyncio.to_thread(self.sweep)
+            except Exception as e:
+                self.errors[type(e).__name__] += 1
+            await asyncio.sleep(self.interval)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "rows": self.counts["rows"],
+            "batches": self.counts["batches"],
+            "sweeps": self.counts["sweeps"],
+            "seconds": self.seconds,
+            "last_sweep_seconds": self.last_sweep_seconds,
+            "errors": sum(self.errors.values()),
+        }
+
+    def prometheus(self) -> str:
+        """Counters in the Prometheus text exposition format."""
+        lines: List[str] = []
+        for metric, kind, help_text, value in (
+            ("lmrex_session_reaper_rows_total", "counter", "Expired sessions deleted.", self.counts["rows"]),
+            ("lmrex_session_reaper_batches_total", "counter", "Delete batches run.", self.counts["batches"]),
+            ("lmrex_session_reaper_sweeps_total", "counter", "Sweeps run.", self.counts["sweeps"]),
+            ("lmrex_session_reaper_seconds_total", "counter", "Time spent sweeping.", f"{self.seconds:.6f}"),
+            (
+                "lmrex_session_reaper_last_sweep_seconds",
+                "gauge",
+                "Duration of the latest sweep.",
+                f"{self.last_sweep_seconds:.6f}",
+            ),
+        ):
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}", f"{metric} {value}"]
+        metric = "lmrex_session_reaper_errors_total"
+        lines += [f"# HELP {metric} Sweeps that failed.", f"# TYPE {metric} counter"]
+        for error, count in sorted(self.errors.items()):
+            lines.append(f'{metric}{{exception="{error}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+# Started with the app by reap_expired_sessions
+session_reaper = SessionReaper(interval=SESSION_REAP_INTERVAL, batch_size=SESSION_REAP_BATCH)
+register_metrics(session_reaper.prometheus)
+
+
+async def reap_expired_sessions(app: rx.App) -> None:
+    """Lifespan task: delete expired sessions every SESSION_REAP_INTERVAL seconds."""
+    if session_reaper.interval > 0:
+        await session_reaper.run()
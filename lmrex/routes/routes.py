@@ -1,7 +1,23 @@
 # ./routes/routes.py
 
 import reflex as rx
+from reflex.app import default_overlay_component
+from starlette.applications import Starlette
+from starlette.routing import Mount, Route
+from starlette.staticfiles import StaticFiles
 
+from rxconfig import IS_PRODUCTION, STATE_SNAPSHOT_DIR
+from lmrex.middleware.auth_logic import require_login
+from lmrex.middleware.event_metrics import (
+    EventMetricsMiddleware,
+    event_metrics_endpoint,
+    event_metrics_overlay,
+)
+from lmrex.middleware.page_hydrate import PageHydrateMiddleware
+from lmrex.middleware.profiling import metrics_endpoint, track_queue_wait
+
+from lmrex.models.media_derivatives import CACHE_DIR, URL_PATH
+from lmrex.models.session_reaper import reap_expired_sessions
 from lmrex.ui.about import about
 from lmrex.ui.contact import contact
 from lmrex.ui.gallery import gallery
@@ -11,12 +27,40 @@ from lmrex.ui.login import login
 from lmrex.ui.account import account_page
 from lmrex.ui.login import login
 from lmrex.ui.user_gallery import user_gallery
+from lmrex.state.snapshot import use_snapshot_state_manager
+from lmrex.state.state import broadcast_catalog_changes
 # from lmrex.ui.gallery_music import music
 # from lmrex.ui.gallery_pictures import pictures
 # from lmrex.ui.gallery_video import videos
 # Import your UI pages
 
-app = rx.App()
+# Backend-only endpoints, served next to the Reflex event socket
+backend_api = Starlette(
+    routes=[
+        Route("/_metrics/events", event_metrics_endpoint),
+        Route("/metrics", metrics_endpoint),
+        # Image variants generated at runtime by media_derivatives
+        Mount(URL_PATH, app=StaticFiles(directory=CACHE_DIR, check_dir=False)),
+    ]
+)
+
+
+def overlay():
+    """Connection overlay, plus the event traffic table outside production."""
+    if IS_PRODUCTION:
+        return default_overlay_component()
+    return rx.fragment(default_overlay_component(), event_metrics_overlay())
+
+
+app = rx.App(api_transformer=backend_api, overlay_component=overlay)
+# Sessions are written as compact snapshots and restored on reconnect
+use_snapshot_state_manager(app, STATE_SNAPSHOT_DIR or None)
+# Hydrate only the states the requested page renders, ahead of Reflex's own
+app.add_middleware(PageHydrateMiddleware(), index=0)
+app.add_middleware(EventMetricsMiddleware())
+app.register_lifespan_task(broadcast_catalog_changes)
+app.register_lifespan_task(track_queue_wait)
+app.register_lifespan_task(reap_expired_sessions)
 
 # Health check endpoints
 def ping():
@@ -38,8 +82,9 @@ def add_routes():
     app.add_page(gallery, route="/Gallery")
     app.add_page(contact, route="/Contact")
     app.add_page(login, route="/Login")
-    app.add_page(account_page, route="/Account")
-    app.add_page(user_gallery, route="/Account/Gallery/")
+    # Login-only pages: the guard runs as their on_load, before they render
+    require_login(app, account_page, route="/Account")
+    require_login(app, user_gallery, route="/Account/Gallery/")
     # app.add_page(videos, route="/gallery/videos")
     # app.add_page(music, route="/gallery/music")
     # app._compile()
@@ -8,6 +8,13 @@ import reflex as rx
 import reflex_local_auth
 from typing import Optional, List
 
+from lmrex.middleware.auth_logic import offload_password_hashing
+from lmrex.middleware.profiling import profile_handlers
+from lmrex.state.session_cache import cache_session_lookups, session_cache
+from lmrex.state.snapshot import snapshot_states
+
+LOGIN_ROUTE = "/Login"
+
 
 class AuthState(reflex_local_auth.LocalAuthState):
     """
@@ -66,12 +73,17 @@ class ProtectedState(AuthState):
 
     protected_data: str = ""
 
-    def on_load(self):
-        """Check authentication on protected page load"""
+    async def on_load(self):
+        """
+        Login guard of protected pages, registered as their first on_load by
+        auth_logic.require_login; the user comes from the session cache
+        """
         if not self.is_authenticated:
-            # Redirect to login page if not authenticated
-            return reflex_local_auth.LoginState.redir
-        
+            # Send the visitor to the login page, and back here once logged in
+            login = await self.get_state(reflex_local_auth.LoginState)
+            login.redirect_to = self.router.url.path
+            return rx.redirect(LOGIN_ROUTE)
+
         # Load protected data for authenticated users
         self.protected_data = f"Welcome {self.authenticated_user.username}! This is your protected content."
 
@@ -81,4 +93,13 @@ class ProtectedState(AuthState):
         if self.is_authenticated:
             self.protected_data = f"User data for {self.authenticated_user.username}"
         else:
-            self.protected_data = ""
\ No newline at end of file
+            self.protected_data = ""
+
+
+profile_handlers(AuthState, ProtectedState)
+snapshot_states(AuthState, ProtectedState, version=1)
+
+# Page navigations read the session's user from memory instead of the database
+cache_session_lookups(session_cache)
+# bcrypt runs on the hashing pool instead of blocking the event loop
+offload_password_hashing()
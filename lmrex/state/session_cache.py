@@ -0,0 +1,160 @@
+# lmrex/state/session_cache.py
+"""
+Per-process TTL cache for the user behind an auth session token.
+
+``LocalAuthState.authenticated_user`` joins ``localauthsession`` and
+``localuser`` for the session token every time it is recomputed, and it is
+recomputed on every hydrate because the navbar's ``AuthState.is_logged_in``
+depends on it. With the cache installed, a page navigation is served from
+memory; only the first lookup of a token per TTL reaches the database.
+
+Entries for a token are dropped as soon as one of its LocalAuthSession rows
+is inserted or deleted through the ORM, which covers login, ``do_logout`` and
+``logout_and_redirect``. Sessions ended by another worker process are seen
+after at most ``ttl`` seconds.
+"""
+
+import functools
+import time
+from collections import Counter, OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+from reflex_local_auth import LocalAuthState, LocalUser
+from reflex_local_auth.auth_session import LocalAuthSession
+from sqlalchemy import event
+
+from lmrex.middleware.profiling import register_metrics
+from rxconfig import SESSION_CACHE_SIZE, SESSION_CACHE_TTL
+
+
+class SessionUserCache:
+    """
+    Bounded LRU of session token -> LocalUser whose entries expire after ``ttl``.
+
+    Misses (unknown or expired tokens) are cached too, so anonymous visitors
+    and stale tokens do not query on every page either.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 60.0,
+        max_size: int = 10_000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.clock = clock
+        self.counts: Counter = Counter()
+        self._entries: "OrderedDict[str, Tuple[float, LocalUser]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, token: str) -> Optional[LocalUser]:
+        """The cached user for a token, or None if it has to be looked up."""
+        entry = self._entries.get(token)
+        if entry is not None and entry[0] > self.clock():
+            self._entries.move_to_end(token)
+            self.counts["hits"] += 1
+            return entry[1]
+        if entry is not None:
+            del self._entries[token]
+        self.counts["misses"] += 1
+        return None
+
+    def put(self, token: str, user: LocalUser) -> LocalUser:
+        self._entries[token] = (self.clock() + self.ttl, user)
+        self._entries.move_to_end(token)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.counts["evictions"] += 1
+        return user
+
+    def invalidate(self, token: Optional[str]) -> None:
+        if self._entries.pop(token, None) is not None:
+            self.counts["invalidations"] += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.counts.clear()
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.counts["hits"] + self.counts["misses"]
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.counts["hits"],
+            "misses": self.counts["misses"],
+            "invalidations": self.counts["invalidations"],
+            "evictions": self.counts["evictions"],
+            "hit_rate": self.counts["hits"] / lookups if lookups else 0.0,
+        }
+
+    def prometheus(self) -> str:
+        """Counters in the Prometheus text exposition format."""
+        metric = "lmrex_session_cache_lookups_total"
+        lines = [
+            f"# HELP {metric} Session token lookups by authenticated_user.",
+            f"# TYPE {metric} counter",
+            f'{metric}{{result="hit"}} {self.counts["hits"]}',
+            f'{metric}{{result="miss"}} {self.counts["misses"]}',
+        ]
+        for name, help_text in (
+            ("invalidations", "Entries dropped because their session changed."),
+            ("evictions", "Entries dropped to stay within the size bound."),
+        ):
+            metric = f"lmrex_session_cache_{name}_total"
+            lines += [
+                f"# HELP {metric} {help_text}",
+                f"# TYPE {metric} counter",
+                f"{metric} {self.counts[name]}",
+            ]
+        metric = "lmrex_session_cache_entries"
+        lines += [
+            f"# HELP {metric} Tokens currently cached.",
+            f"# TYPE {metric} gauge",
+            f"{metric} {len(self._entries)}",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+def _cached_lookup(lookup: Callable[[LocalAuthState], LocalUser], cache: SessionUserCache):
+    @functools.wraps(lookup)
+    def authenticated_user(self) -> LocalUser:
+        token = self.auth_token
+        user = cache.get(token)
+        if user is None:
+            user = cache.put(token, lookup(self))
+        return user
+
+    authenticated_user.__session_cached__ = True
+    return authenticated_user
+
+
+def cache_session_lookups(cache: SessionUserCache) -> None:
+    """Serve LocalAuthState.authenticated_user from the cache (once per process)."""
+    # The class attribute and the computed_vars entry are separate ComputedVars
+    computed_vars = {
+        id(var): var
+        for var in (
+            LocalAuthState.computed_vars["authenticated_user"],
+            LocalAuthState.__dict__["authenticated_user"],
+        )
+    }
+    if any(getattr(var.fget, "__session_cached__", False) for var in computed_vars.values()):
+        return
+
+    for computed in computed_vars.values():
+        # ComputedVar is frozen; this is how its own __init__ stores the getter
+        object.__setattr__(computed, "_fget", _cached_lookup(computed.fget, cache))
+
+    def session_changed(mapper, connection, target: LocalAuthSession) -> None:
+        cache.invalidate(target.session_id)
+
+    event.listen(LocalAuthSession, "after_insert", session_changed)
+    event.listen(LocalAuthSession, "after_delete", session_changed)
+    register_metrics(cache.prometheus)
+
+
+# Shared by every LocalAuthState in this process
+session_cache = SessionUserCache(ttl=SESSION_CACHE_TTL, max_size=SESSION_CACHE_SIZE)
@@ -0,0 +1,311 @@
+# lmrex/state/snapshot.py
+"""
+Compact, versioned session snapshots so sessions survive a backend restart.
+
+Registered state classes (State, AuthState, ...) are written as msgpack
+instead of pickle: only vars that differ from their defaults, tagged with the
+class name and a schema version. Snapshots are written per substate, only
+for substates touched since the last write, and read back lazily when a
+client reconnects. A snapshot whose version no longer matches is dropped and
+the substate starts fresh, so a schema change never restores stale shapes.
+
+The encoder implements the msgpack subset session vars need (nil, bool, int,
+float, str, bin, array, map), so the files can be inspected with any msgpack
+reader without making msgpack a dependency.
+"""
+
+import dataclasses
+import functools
+import struct
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Type
+
+import reflex as rx
+from reflex.state import BaseState, _split_substate_key, _substate_key
+from reflex.istate.manager.disk import StateManagerDisk  # after reflex.state (import cycle)
+from reflex.utils import prerequisites
+from reflex.utils.misc import run_in_thread
+
+# 0xc1 is never used by msgpack and pickles start with 0x80, so snapshot
+# files are told apart from the pickles of unregistered states by this prefix
+MAGIC = b"\xc1LMS"
+
+# State full name -> schema version; bump a version when a var changes meaning
+SNAPSHOT_SCHEMAS: Dict[str, int] = {}
+
+
+class SnapshotError(ValueError):
+    """Raised for values that cannot be snapshotted or malformed snapshots."""
+
+
+def snapshot_states(*state_classes: Type[BaseState], version: int) -> None:
+    """Store the given states as compact snapshots under a schema version."""
+    for state_cls in state_classes:
+        SNAPSHOT_SCHEMAS[state_cls.get_full_name()] = version
+
+
+# ─────────────────────────────
+# msgpack subset
+# ─────────────────────────────
+def _pack_header(
+    out: bytearray,
+    length: int,
+    fix: Optional[Tuple[int, int]],
+    code8: Optional[int],
+    code16: int,
+    code32: int,
+) -> None:
+    """Type byte plus length, in the smallest form msgpack allows for the type."""
+    if fix is not None and length < fix[1]:
+        out.append(fix[0] | length)
+    elif code8 is not None and length < 0x100:
+        out += struct.pack(">BB", code8, length)
+    elif length < 0x10000:
+        out += struct.pack(">BH", code16, length)
+    else:
+        out += struct.pack(">BI", code32, length)
+
+
+def _pack(value: Any, out: bytearray) -> None:
+    if value is None:
+        out.append(0xC0)
+    elif value is True or value is False:
+        out.append(0xC3 if value else 0xC2)
+    elif isinstance(value, int):
+        if 0 <= value < 0x80 or -32 <= value < 0:
+            out += struct.pack(">b" if value < 0 else ">B", value)
+        elif 0 <= value < 1 << 64:
+            for code, fmt, limit in ((0xCC, "B", 8), (0xCD, "H", 16), (0xCE, "I", 32), (0xCF, "Q", 64)):
+                if value < 1 << limit:
+                    out += struct.pack(">B" + fmt, code, value)
+                    break
+        elif -(1 << 63) <= value < 0:
+            for code, fmt, limit in ((0xD0, "b", 7), (0xD1, "h", 15), (0xD2, "i", 31), (0xD3, "q", 63)):
+                if value >= -(1 << limit):
+                    out += struct.pack(">B" + fmt, code, value)
+                    break
+        else:
+            raise SnapshotError(f"Integer out of range: {value}")
+    elif isinstance(value, float):
+        out += struct.pack(">Bd", 0xCB, value)
+    elif isinstance(value, str):
+        data = value.encode("utf-8")
+        _pack_header(out, len(data), (0xA0, 32), 0xD9, 0xDA, 0xDB)
+        out += data
+    elif isinstance(value, (bytes, bytearray)):
+        _pack_header(out, len(value), None, 0xC4, 0xC5, 0xC6)
+        out += value
+    elif isinstance(value, (list, tuple)):
+        _pack_header(out, len(value), (0x90, 16), None, 0xDC, 0xDD)
+        for item in value:
+            _pack(item, out)
+    elif isinstance(value, dict):
+        _pack_header(out, len(value), (0x80, 16), None, 0xDE, 0xDF)
+        for key, item in value.items():
+            _pack(key, out)
+            _pack(item, out)
+    else:
+        raise SnapshotError(f"Cannot snapshot {type(value).__name__} values")
+
+
+def packb(value: Any) -> bytes:
+    out = bytearray()
+    _pack(value, out)
+    return bytes(out)
+
+
+_FIXED = {
+    0xCC: ">B", 0xCD: ">H", 0xCE: ">I", 0xCF: ">Q",
+    0xD0: ">b", 0xD1: ">h", 0xD2: ">i", 0xD3: ">q",
+    0xCA: ">f", 0xCB: ">d",
+}
+_LENGTHS = {
+    0xD9: (">B", "str"), 0xDA: (">H", "str"), 0xDB: (">I", "str"),
+    0xC4: (">B", "bin"), 0xC5: (">H", "bin"), 0xC6: (">I", "bin"),
+    0xDC: (">H", "array"), 0xDD: (">I", "array"),
+    0xDE: (">H", "map"), 0xDF: (">I", "map"),
+}
+
+
+def _unpack(data: bytes, pos: int) -> Tuple[Any, int]:
+    code = data[pos]
+    pos += 1
+    if code < 0x80:
+        return code, pos
+    if code >= 0xE0:
+        return code - 0x100, pos
+    if code == 0xC0:
+        return None, pos
+    if code in (0xC2, 0xC3):
+        return code == 0xC3, pos
+    if code in _FIXED:
+        fmt = _FIXED[code]
+        return struct.unpack_from(fmt, data, pos)[0], pos + struct.calcsize(fmt)
+    if 0xA0 <= code <= 0xBF:
+        kind, length = "str", code & 0x1F
+    elif 0x90 <= code <= 0x9F:
+        kind, length = "array", code & 0x0F
+    elif 0x80 <= code <= 0x8F:
+        kind, length = "map", code & 0x0F
+    elif code in _LENGTHS:
+        fmt, kind = _LENGTHS[code]
+        length = struct.unpack_from(fmt, data, pos)[0]
+        pos += struct.calcsize(fmt)
+    else:
+        raise SnapshotError(f"Unsupported msgpack type 0x{code:02x}")
+
+    if kind in ("str", "bin"):
+        raw = data[pos : pos + length]
+        if len(raw) != length:
+            raise SnapshotError("Truncated snapshot")
+        return (raw.decode("utf-8") if kind == "str" else bytes(raw)), pos + length
+    if kind == "array":
+        items = []
+        for _ in range(length):
+            item, pos = _unpack(data, pos)
+            items.append(item)
+        return items, pos
+    mapping = {}
+    for _ in range(length):
+        key, pos = _unpack(data, pos)
+        mapping[key], pos = _unpack(data, pos)
+    return mapping, pos
+
+
+def unpackb(data: bytes) -> Any:
+    try:
+        value, end = _unpack(data, 0)
+    except (IndexError, struct.error, UnicodeDecodeError) as e:
+        raise SnapshotError(f"Malformed snapshot: {e}") from e
+    if end != len(data):
+        raise SnapshotError("Trailing bytes after snapshot")
+    return value
+
+
+# ─────────────────────────────
+# State snapshots
+# ─────────────────────────────
+def _snapshot_vars(state_cls: Type[BaseState]) -> Tuple[str, ...]:
+    """Names of the vars a class owns (not inherited, not computed)."""
+    names = [*state_cls.base_vars, *state_cls.backend_vars]
+    return tuple(
+        name
+        for name in names
+        if name not in state_cls.inherited_vars
+        and name not in state_cls.inherited_backend_vars
+        and name != "_reflex_internal_links"
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _defaults(state_cls: Type[BaseState]) -> Dict[str, Any]:
+    fresh = state_cls(_reflex_internal_init=True, init_substates=False)
+    return {name: _plain(getattr(fresh, name)) for name in _snapshot_vars(state_cls)}
+
+
+def _plain(value: Any) -> Any:
+    """Strip reflex mutable proxies so the encoder sees builtin containers."""
+    return getattr(value, "__wrapped__", value)
+
+
+def dump_snapshot(state: BaseState) -> bytes:
+    """Encode a registered substate's non-default vars."""
+    state_cls = type(state)
+    name = state_cls.get_full_name()
+    defaults = _defaults(state_cls)
+    values = {
+        var: _plain(getattr(state, var))
+        for var in defaults
+        if _plain(getattr(state, var)) != defaults[var]
+    }
+    return MAGIC + packb([SNAPSHOT_SCHEMAS[name], name, values])
+
+
+def load_snapshot(data: bytes, state_cls: Type[BaseState]) -> Optional[BaseState]:
+    """Rebuild a substate from a snapshot; None if it is for another schema."""
+    version, name, values = unpackb(data[len(MAGIC) :])
+    if name != state_cls.get_full_name() or version != SNAPSHOT_SCHEMAS.get(name):
+        return None
+    state = state_cls(_reflex_internal_init=True, init_substates=False)
+    for var, value in values.items():
+        if var in state_cls.backend_vars:
+            state._backend_vars[var] = value
+            object.__setattr__(state, var, value)
+        elif var in state_cls.base_vars:
+            object.__setattr__(state, var, value)
+    state.dirty_vars.clear()
+    state._was_touched = False
+    return state
+
+
+@dataclasses.dataclass
+class SnapshotStateManager(StateManagerDisk):
+    """
+    Disk state manager writing registered states as compact snapshots.
+
+    Writes stay incremental and debounced as in StateManagerDisk; substates
+    of classes that are not registered (or hold values msgpack cannot carry)
+    keep the pickle format.
+    """
+
+    snapshot_dir: Optional[str] = None
+    stats: Counter = dataclasses.field(default_factory=Counter)
+
+    @functools.cached_property
+    def states_directory(self) -> Path:
+        return Path(self.snapshot_dir) if self.snapshot_dir else prerequisites.get_states_dir()
+
+    def _state_class(self, token: str) -> Optional[Type[BaseState]]:
+        path = _split_substate_key(token)[1]
+        if SNAPSHOT_SCHEMAS.get(path) is None:
+            return None
+        try:
+            return self.state.get_class_substate(path)
+        except ValueError:
+            return None
+
+    def serialize(self, substate: BaseState) -> bytes:
+        if type(substate).get_full_name() in SNAPSHOT_SCHEMAS:
+            try:
+                data = dump_snapshot(substate)
+            except SnapshotError:
+                self.stats["pickled"] += 1
+            else:
+                self.stats["snapshots_written"] += 1
+                return data
+        return substate._serialize()
+
+    async def load_state(self, token: str) -> Optional[BaseState]:
+        path = self.token_path(token)
+        if not path.exists():
+            return None
+        data = await run_in_thread(path.read_bytes)
+        if not data.startswith(MAGIC):
+            return await super().load_state(token)
+        state_cls = self._state_class(token)
+        try:
+            state = load_snapshot(data, state_cls) if state_cls is not None else None
+        except SnapshotError:
+            state = None
+        self.stats["snapshots_restored" if state is not None else "snapshots_dropped"] += 1
+        return state
+
+    async def set_state_for_substate(self, client_token: str, substate: BaseState):
+        if substate._get_was_touched():
+            substate._was_touched = False
+            data = self.serialize(substate)
+            if data:
+                path = self.token_path(_substate_key(client_token, substate))
+                path.parent.mkdir(parents=True, exist_ok=True)
+                await run_in_thread(lambda: path.write_bytes(data))
+
+        for child in substate.substates.values():
+            await self.set_state_for_substate(client_token, child)
+
+
+def use_snapshot_state_manager(app: rx.App, snapshot_dir: Optional[str] = None) -> None:
+    """Persist the app's sessions as snapshots, unless Redis already holds them."""
+    if prerequisites.parse_redis_url() is not None:
+        return
+    app._state_manager = SnapshotStateManager(state=app._state, snapshot_dir=snapshot_dir)
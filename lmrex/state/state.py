@@ -1,12 +1,42 @@
 # ./state/state.py
+import asyncio
+from typing import ClassVar, Optional
+
 import reflex as rx
+from reflex.experimental.client_state import ClientStateVar, _client_state_ref
 
 # from ..models.user_model import User1, NewUser
-from lmrex.models.media_model import MediaService
+from lmrex.models.media_derivatives import derivatives
+from lmrex.models.media_ingest import IngestQueueFull, ingest_queue
+from lmrex.models.media_model import MediaService, MediaType
+from lmrex.middleware.profiling import profile_handlers
+from lmrex.state.snapshot import snapshot_states
+
+
+# Carousel position within CarouselState.window_items, kept in the browser
+# when the carousel navigates client-side (see CarouselState.sync_index)
+carousel_position = ClientStateVar.create("carousel_position", 0)
+
+
+def _move_client_position(expression: str) -> rx.event.EventSpec:
+    # No-op on pages without a client-side carousel
+    setter = _client_state_ref(carousel_position._setter_name)
+    return rx.call_script(f"{setter}?.({expression})")
 
 
-class State(rx.State):
-    """Global app state controller."""
+def set_client_position(index: int) -> rx.event.EventSpec:
+    """Move the client-side carousel to a window position."""
+    return _move_client_position(str(index))
+
+
+def shift_client_position(shift: int) -> rx.event.EventSpec:
+    """Offset the client-side carousel after the window gained or lost items ahead of it."""
+    getter = _client_state_ref(carousel_position._getter_name)
+    return _move_client_position(f"({getter} ?? 0) + {shift}")
+
+
+class LabelState(rx.State):
+    """The header label and the phrases it cycles through."""
 
     label: str = ""
     label_arr: list[str] = ["We", "Gonna", "Be", "Alright"]
@@ -24,6 +54,10 @@ class State(rx.State):
         """Update label based on user input."""
         self.label = value.strip()
 
+
+class ModalState(rx.State):
+    """Dialog and add-media modal visibility."""
+
     show_dialog: bool = False
     show_modal: bool = False
 
@@ -34,92 +68,481 @@ class State(rx.State):
     @rx.event
     def toggle_modal(self):
         """Toggle the modal visibility."""
-        print(f"Modal toggled. Current state: {self.show_modal}")
         self.show_modal = not self.show_modal
 
-    media: list[dict[str, str]] = MediaService.get_default_media_items()
+    @rx.event
+    def close_modal(self):
+        self.show_modal = False
+
+
+class CarouselState(rx.State):
+    """The media carousel: a window onto the catalog and the current item."""
+
+    # Only a sliding window of catalog cursors ("position:id") around
+    # current_index and the catalog version live in the session; item data is
+    # read from the process-wide MediaService.catalog cache, so session size
+    # is independent of the catalog.
+    CAROUSEL_WINDOW: ClassVar[int] = 12
+    CAROUSEL_PREFETCH_MARGIN: ClassVar[int] = 3
+
+    _window: list[str] = []
+    _has_more_before: bool = False
+    _has_more_after: bool = False
+    _prefetching: bool = False
+    _media_total: int = 0
+    _catalog_version: int = 0
+    _client_navigation: bool = False
+    window_offset: int = 0
     current_index: int = 0
-    media_type: str = ""
-    media_title: str = ""
-    media_url: str = ""
 
-    @rx.var
+    # Computed vars list their inputs explicitly (auto_deps=False), so an
+    # event only re-sends them when one of those inputs actually changed.
+    @rx.var(deps=["_media_total"], auto_deps=False)
     def media_count(self) -> int:
         """Get the total number of media items."""
-        return len(self.media)
+        return self._media_total
+
+    @rx.var(deps=["window_offset", "current_index"], auto_deps=False)
+    def catalog_index(self) -> int:
+        """Position of the current item within the whole catalog."""
+        return self.window_offset + self.current_index
+
+    @property
+    def _media_ids(self) -> list[int]:
+        """Ids of the items in the loaded window."""
+        return [MediaService.decode_cursor(cursor)[1] for cursor in self._window]
+
+    def _track_window(self):
+        """Tell the catalog broadcaster which items this session shows."""
+        carousel_sessions[self.router.session.client_token] = set(self._media_ids)
 
+    def _fetch_size(self) -> int:
+        return max(self.CAROUSEL_WINDOW // 2, 1)
+
+    def _set_window(self, items: list[dict], offset: int, more_before: bool, more_after: bool):
+        """Replace the window with a freshly loaded run of items."""
+        self._window = [MediaService.cursor_of(item) for item in items]
+        self.window_offset = offset
+        self._has_more_before = more_before
+        self._has_more_after = more_after
+        self._track_window()
+
+    def _extend_after(self, items: list[dict], more_after: bool) -> int:
+        """
+        Append items to the window, dropping the oldest ones past its size.
+        Returns how far current_index moved.
+        """
+        self._window.extend(MediaService.cursor_of(item) for item in items)
+        self._has_more_after = more_after
+        overflow = len(self._window) - self.CAROUSEL_WINDOW
+        if overflow > 0:
+            del self._window[:overflow]
+        self._track_window()
+        if overflow <= 0:
+            return 0
+        self.window_offset += overflow
+        self.current_index -= overflow
+        self._has_more_before = True
+        return -overflow
+
+    def _extend_before(self, items: list[dict], more_before: bool) -> int:
+        """
+        Prepend items to the window, dropping the newest ones past its size.
+        Returns how far current_index moved.
+        """
+        self._window[:0] = [MediaService.cursor_of(item) for item in items]
+        self.window_offset -= len(items)
+        self.current_index += len(items)
+        self._has_more_before = more_before
+        overflow = len(self._window) - self.CAROUSEL_WINDOW
+        if overflow > 0:
+            del self._window[-overflow:]
+            self._has_more_after = True
+        self._track_window()
+        return len(items)
+
+    def _load_first_window(self):
+        items, next_cursor = MediaService.list_page(limit=self.CAROUSEL_WINDOW)
+        self._set_window(items, 0, False, next_cursor is not None)
+        self.current_index = 0
+
+    def _load_last_window(self):
+        items, next_cursor = MediaService.list_page(
+            limit=self.CAROUSEL_WINDOW, backward=True
+        )
+        offset = max(self._media_total - len(items), 0)
+        self._set_window(items, offset, next_cursor is not None, False)
+        self.current_index = max(len(items) - 1, 0)
+
+    @rx.event
+    def load_media(self, client_navigation: bool = False):
+        """
+        Load the first catalog window, unless the session still holds a valid
+        one (the page was revisited, or the session was restored from a
+        snapshot after a restart). Called when the carousel mounts; a
+        client-side carousel also needs the whole window shipped.
+        """
+        self._client_navigation = client_navigation
+        self._media_total = MediaService.count()
+        self._catalog_version = MediaService.catalog.version
+        self._track_window()
+        if self._window and all(
+            MediaService.get(media_id) is not None for media_id in self._media_ids
+        ):
+            # The browser starts over at position 0 when the page loads
+            return set_client_position(self.current_index) if client_navigation else None
+        self._load_first_window()
+
+    def _apply_catalog_changes(
+        self, changed: Optional[set[int]], removed: set[int], total: int, version: int
+    ):
+        """Catch up with catalog edits made by other sessions (None: everything changed)."""
+        self._media_total = total
+        for media_id in removed & set(self._media_ids):
+            self._drop_from_window(media_id)
+        if changed is None or changed & set(self._media_ids):
+            self._catalog_version = version
+
+    def _near_end(self) -> bool:
+        return len(self._window) - 1 - self.current_index <= self.CAROUSEL_PREFETCH_MARGIN
+
+    def _near_start(self) -> bool:
+        return self.current_index <= self.CAROUSEL_PREFETCH_MARGIN
+
+    @rx.event
     def previous_item(self):
         """Navigate to the previous item in the carousel."""
-        if self.media:
-            self.current_index = (self.current_index - 1) % len(self.media)
+        if not self._window:
+            return
+        if self.current_index == 0:
+            if not self._has_more_before:
+                self._load_last_window()
+                return
+            # Prefetch did not land in time; fetch synchronously
+            items, next_cursor = MediaService.list_page(
+                self._window[0], self._fetch_size(), backward=True
+            )
+            if not items:
+                # The items before the window were removed since it loaded
+                self._has_more_before = False
+                return
+            self._extend_before(items, next_cursor is not None)
+        self.current_index -= 1
+        return self._prefetch_event()
 
+    @rx.event
     def next_item(self):
         """Navigate to the next item in the carousel."""
-        if self.media:
-            self.current_index = (self.current_index + 1) % len(self.media)
+        if not self._window:
+            return
+        if self.current_index + 1 >= len(self._window):
+            if not self._has_more_after:
+                self._load_first_window()
+                return
+            # Prefetch did not land in time; fetch synchronously
+            items, next_cursor = MediaService.list_page(
+                self._window[-1], self._fetch_size()
+            )
+            if not items:
+                # The items after the window were removed since it loaded
+                self._has_more_after = False
+                return
+            self._extend_after(items, next_cursor is not None)
+        self.current_index += 1
+        return self._prefetch_event()
+
+    def _prefetch_event(self):
+        """Start a background window extension when the index nears an edge."""
+        if self._prefetching:
+            return None
+        if self._near_end() and self._has_more_after:
+            self._prefetching = True
+            return CarouselState.prefetch_next
+        if self._near_start() and self._has_more_before:
+            self._prefetching = True
+            return CarouselState.prefetch_previous
+        return None
 
-    @rx.var
+    @rx.event
+    def sync_index(self, index: int):
+        """
+        Adopt the position reached by client-side navigation. Positions past
+        either end of the window step through the server path and move the
+        client to wherever that lands.
+        """
+        if not self._window:
+            return
+        index = int(index)
+        if 0 <= index < len(self._window):
+            self.current_index = index
+            return self._prefetch_event()
+        if index < 0:
+            self.current_index = 0
+            event = self.previous_item()
+        else:
+            self.current_index = len(self._window) - 1
+            event = self.next_item()
+        return [set_client_position(self.current_index), event]
+
+    @rx.event(background=True)
+    async def prefetch_next(self):
+        """Extend the window past its end before the user reaches it."""
+        async with self:
+            edge = self._window[-1] if self._window else ""
+            limit = self._fetch_size()
+        items, next_cursor = await asyncio.to_thread(MediaService.list_page, edge, limit)
+        async with self:
+            shift = 0
+            # Skip if navigation replaced the window while we were fetching
+            if edge and self._window and self._window[-1] == edge:
+                shift = self._extend_after(items, next_cursor is not None)
+            self._prefetching = False
+        if shift:
+            return shift_client_position(shift)
+
+    @rx.event(background=True)
+    async def prefetch_previous(self):
+        """Extend the window before its start before the user reaches it."""
+        async with self:
+            edge = self._window[0] if self._window else ""
+            limit = self._fetch_size()
+        items, next_cursor = await asyncio.to_thread(
+            MediaService.list_page, edge, limit, None, True
+        )
+        async with self:
+            shift = 0
+            if edge and self._window and self._window[0] == edge:
+                shift = self._extend_before(items, next_cursor is not None)
+            self._prefetching = False
+        if shift:
+            return shift_client_position(shift)
+
+    @rx.var(deps=["_window", "current_index", "_catalog_version"], auto_deps=False)
     def current_media_item(self) -> dict[str, str]:
         """Get the current media item to display."""
-        item = MediaService.get_media_item_by_index(self.media, self.current_index)
-        return item or MediaService.get_empty_media_item()
+        item = MediaService.get_empty_media_item()
+        if 0 <= self.current_index < len(self._window):
+            media_id = MediaService.decode_cursor(self._window[self.current_index])[1]
+            stored = MediaService.get(media_id)
+            if stored is not None:
+                item = {key: stored[key] for key in item}
+        return item
+
+    @rx.var(deps=["_window", "_catalog_version", "_client_navigation"], auto_deps=False)
+    def window_items(self) -> list[dict[str, str]]:
+        """
+        Every item in the loaded window, for client-side navigation. Sent once
+        per window change rather than once per step.
+        """
+        if not self._client_navigation:
+            return []
+        items = (self._item(media_id) for media_id in self._media_ids)
+        return [item for item in items if item is not None]
+
+    @rx.var(
+        deps=["_window", "current_index", "_catalog_version", "_client_navigation"],
+        auto_deps=False,
+    )
+    def adjacent_media_items(self) -> list[dict[str, str]]:
+        """
+        The loaded items either side of the current one, so the carousel can
+        preload them before the next step. Client navigation finds its
+        neighbours in window_items instead.
+        """
+        if self._client_navigation:
+            return []
+        window = self._window
+        items = (
+            self._item(MediaService.decode_cursor(window[index])[1])
+            for index in (self.current_index - 1, self.current_index + 1)
+            if 0 <= index < len(window)
+        )
+        return [item for item in items if item is not None]
+
+    @staticmethod
+    def _item(media_id: int) -> Optional[dict[str, str]]:
+        stored = MediaService.get(media_id)
+        if stored is None:
+            return None
+        return {key: stored[key] for key in MediaService.get_empty_media_item()}
+
+    @rx.event(background=True)
+    async def build_derivatives(self, url: str):
+        """
+        Generate responsive variants for a newly added image. Their srcsets are
+        stored with the item, so every session picks them up from the catalog.
+        """
+        try:
+            item = await derivatives.publish(url)
+        except Exception as e:
+            print(f"Failed to build derivatives for {url}: {e}")
+            return
+        if item is None:
+            return
+        async with self:
+            if item["id"] in self._media_ids:
+                self._catalog_version = MediaService.catalog.version
+
+    def _append_loaded(self, item: dict):
+        """Track a newly persisted item if the window reaches the catalog end."""
+        self._media_total += 1
+        if not self._has_more_after:
+            self._extend_after([item], False)
 
     @rx.event
     def add_media_item(self):
-        """Add a new media item to the state with default values."""
-        new_item = MediaService.create_media_item(
-            "New Title", "https://example.com/new_media", "image"
-        )
-        self.media = self.media + [new_item]
+        """Add a new media item to the catalog with default values."""
+        try:
+            new_item = MediaService.add(
+                "New Title", "https://example.com/new_media", "image"
+            )
+        except ValueError as e:
+            print(f"Error adding media item: {e}")
+            return
+        self._append_loaded(new_item)
         print("Media added:", new_item)
+        return CarouselState.build_derivatives(new_item["url"])
+
+    @rx.event
+    def media_added(self, media_id: int):
+        """Pick up an item persisted by another state."""
+        item = MediaService.get(media_id)
+        if item is not None:
+            self._append_loaded(item)
+            if item["type"] == MediaType.IMAGE.value:
+                return CarouselState.build_derivatives(item["url"])
 
-    def remove_media_item(self, index: int):
-        """Remove media item at the specified index."""
-        self.media = MediaService.remove_media_item(self.media, index)
+    def _drop_from_window(self, media_id: int):
+        """Remove an item from the loaded window, keeping current_index in bounds."""
+        media_ids = self._media_ids
+        if media_id in media_ids:
+            index = media_ids.index(media_id)
+            if index < self.current_index:
+                self.current_index -= 1
+            del self._window[index]
+        if not self._window:
+            self._load_first_window()
+            return
         # Adjust current_index to stay within bounds
-        self.current_index = min(self.current_index, max(len(self.media) - 1, 0))
+        self.current_index = min(self.current_index, len(self._window) - 1)
+        self._track_window()
 
-    def update_media_item(self, index: int, title: str, url: str, media_type: str):
-        """Update media item at the specified index."""
+    def remove_media_item(self, media_id: int):
+        """Remove the media item with the given id."""
+        if not MediaService.remove(media_id):
+            return
+        self._media_total = max(self._media_total - 1, 0)
+        self._drop_from_window(media_id)
+
+    def update_media_item(self, media_id: int, title: str, url: str, media_type: str):
+        """Update the media item with the given id."""
         try:
-            self.media = MediaService.update_media_item(
-                self.media, index, title, url, media_type
-            )
+            updated = MediaService.update(media_id, title, url, media_type)
         except ValueError as e:
             print(f"Error updating media item: {e}")
+            return
+        # Only re-send the current item when the edit touches the loaded page
+        if updated is not None and media_id in self._media_ids:
+            self._catalog_version = MediaService.catalog.version
 
     def remove_current_item(self):
         """Remove the currently displayed media item."""
-        if self.media:
-            self.remove_media_item(self.current_index)
+        if 0 <= self.current_index < len(self._window):
+            self.remove_media_item(self._media_ids[self.current_index])
 
     def reset_to_defaults(self):
-        """Reset media list to default items."""
-        self.media = MediaService.get_default_media_items()
-        self.current_index = 0
+        """Return to the start of the catalog."""
+        self._media_total = MediaService.count()
+        self._catalog_version = MediaService.catalog.version
+        self._load_first_window()
+        return set_client_position(0) if self._client_navigation else None
 
     def clear_all_media(self):
-        """Clear all media items."""
-        self.media = []
+        """Clear the loaded media window."""
+        self._set_window([], 0, False, False)
         self.current_index = 0
 
 
+# Client token -> ids of the catalog items each carousel session of this
+# process holds in its window
+carousel_sessions: dict[str, set[int]] = {}
+
+
+def _removed_ids(media_ids: set[int]) -> set[int]:
+    """Ids among ``media_ids`` that are no longer in the database."""
+    return {media_id for media_id in media_ids if MediaService.get(media_id) is None}
+
+
+async def broadcast_catalog_changes(app: rx.App, debounce: float = 0.25):
+    """
+    Lifespan task pushing catalog edits to the carousel sessions they affect.
+
+    Bursts of edits are coalesced into one pass. An edit only visits the
+    sessions whose window holds the edited item; adds and removes change the
+    total every carousel shows, so they visit all sessions once per pass.
+    """
+    loop = asyncio.get_running_loop()
+    changed = asyncio.Event()
+    catalog = MediaService.catalog
+    unsubscribe = catalog.subscribe(lambda _: loop.call_soon_threadsafe(changed.set))
+    version = catalog.version
+    shown_total = None
+    try:
+        while True:
+            await changed.wait()
+            await asyncio.sleep(debounce)
+            changed.clear()
+            changes = catalog.changes_since(version)
+            version = catalog.version
+            changed_ids = None if changes is None else set(changes)
+            # A missing entry may only have been evicted; confirm against the database
+            removed = await asyncio.to_thread(
+                _removed_ids,
+                {media_id for media_id, item in (changes or {}).items() if item is None},
+            )
+            total = await asyncio.to_thread(MediaService.count)
+
+            connected = app.event_namespace.token_to_sid if app.event_namespace else {}
+            for token, window in list(carousel_sessions.items()):
+                if token not in connected:
+                    carousel_sessions.pop(token, None)
+                    continue
+                if changed_ids is not None and total == shown_total and not changed_ids & window:
+                    continue
+                async with app.modify_state(f"{token}_{CarouselState.get_full_name()}") as root:
+                    state = await root.get_state(CarouselState)
+                    state._apply_catalog_changes(changed_ids, removed, total, version)
+            shown_total = total
+    finally:
+        unsubscribe()
+
+
 class FormState(rx.State):
     """State for handling form submission."""
 
-    @rx.event
-    def handle_submit(self):
-        """Handle form submissions."""
-        new_item = MediaService.create_media_item(
-            self.media_title, self.media_url, self.media_type
-        )
-        self.media = self.media + [new_item]
+    @rx.event(background=True)
+    async def handle_submit(self, form_data: dict):
+        """Handle form submissions through the ingestion queue, off the state lock."""
+        try:
+            new_item = await ingest_queue.submit(
+                form_data.get("media_title", ""),
+                form_data.get("media_url", ""),
+                form_data.get("media_type") or "image",
+            )
+        except (ValueError, IngestQueueFull) as e:
+            print(f"Failed to add media: {e}")
+            return
+        async with self:
+            state = await self.get_state(CarouselState)
+            state._append_loaded(new_item)
         print("Media added:", new_item)
-        # Reset form inputs
-        self.media_type = ""
-        self.media_title = ""
-        self.media_url = ""
+        if new_item["type"] == MediaType.IMAGE.value:
+            return CarouselState.build_derivatives(new_item["url"])
+
+
+profile_handlers(LabelState, ModalState, CarouselState, FormState)
+snapshot_states(LabelState, ModalState, CarouselState, version=1)
 
 
 if __name__ == "__main__":
-    print(State())
+    print(CarouselState())
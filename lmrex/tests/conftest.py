@@ -0,0 +1,139 @@
+import datetime
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+import reflex.model
+from reflex_local_auth import LocalUser
+from reflex_local_auth.auth_session import LocalAuthSession
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine
+
+from lmrex.models.media_metadata import MediaMetadata
+from lmrex.models.media_model import Media, MediaCatalog, MediaService
+from lmrex.state.session_cache import session_cache
+
+
+@pytest.fixture
+def media_db(monkeypatch):
+    """
+    Point MediaService at a fresh in-memory SQLite catalog seeded with the
+    default media items.
+    """
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(
+        engine, tables=[Media.__table__, MediaMetadata.__table__]
+    )
+    MediaService.create_search_index(engine)
+    monkeypatch.setattr(MediaService, "session_factory", lambda: Session(engine))
+    monkeypatch.setattr(MediaService, "catalog", MediaCatalog())
+    MediaService.seed_default_media()
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def auth_db(monkeypatch):
+    """
+    Point rx.session() at a fresh in-memory auth database where user "ada"
+    has a session for the token "tok", and start with an empty session cache.
+    """
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(
+        engine, tables=[LocalUser.__table__, LocalAuthSession.__table__]
+    )
+    with Session(engine) as session:
+        user = LocalUser(username="ada", password_hash=b"x", enabled=True)
+        session.add(user)
+        session.commit()
+        session.add(
+            LocalAuthSession(
+                user_id=user.id,
+                session_id="tok",
+                expiration=datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(days=1),
+            )
+        )
+        session.commit()
+    monkeypatch.setattr(reflex.model, "get_engine", lambda url=None: engine)
+    session_cache.clear()
+    yield engine
+    session_cache.clear()
+    engine.dispose()
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """
+    Offline stand-in for media hosts:
+
+        /short/<n>   302 -> /video/<n>
+        /moved/<n>   302 -> /video/<n> on host "localhost" (another client)
+        /video/<n>   200 text/html
+        /image.jpg   200 image/jpeg, Content-Length 2048
+        /oembed      oEmbed JSON for ?url=, width as a string like many providers
+        anything else 404
+    """
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, headers=(), body=b""):
+        self.server.hits.append((self.command, self.path))
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _route(self):
+        path = urlsplit(self.path)
+        if path.path.startswith("/short/"):
+            return self._send(302, [("Location", "/video/" + path.path.rsplit("/", 1)[1])])
+        if path.path.startswith("/moved/"):
+            port = self.server.server_address[1]
+            location = f"http://localhost:{port}/video/" + path.path.rsplit("/", 1)[1]
+            return self._send(302, [("Location", location)])
+        if path.path.startswith("/video/"):
+            return self._send(200, [("Content-Type", "text/html; charset=utf-8")])
+        if path.path == "/image.jpg":
+            self.server.hits.append((self.command, self.path))
+            self.send_response(200)
+            self.send_header("Content-Type", "image/jpeg")
+            self.send_header("Content-Length", "2048")
+            self.end_headers()
+            return
+        if path.path == "/oembed":
+            url = parse_qs(path.query)["url"][0]
+            body = json.dumps({
+                "provider_name": "Stub",
+                "width": "640",
+                "height": 360,
+                "thumbnail_url": url + "/thumb.jpg",
+            }).encode()
+            return self._send(200, [("Content-Type", "application/json")], body)
+        return self._send(404)
+
+    do_GET = _route
+    do_HEAD = _route
+
+
+@pytest.fixture
+def stub_media_server():
+    """Serve fake media hosts on localhost so enrichment can be tested offline."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    server.hits = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield server
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,118 @@
+import asyncio
+
+import pytest
+import reflex as rx
+import reflex_local_auth
+from reflex.state import RouterData
+from reflex.state import State as RootState
+from reflex_local_auth.auth_session import LocalAuthSession
+from sqlmodel import Session, select
+
+import lmrex.state.auth_state  # noqa: F401  installs the pooled handlers
+from lmrex.middleware import auth_logic
+from lmrex.middleware.auth_logic import PasswordHasher, hash_password, require_login, verify_password
+from lmrex.state.auth_state import LOGIN_ROUTE, ProtectedState
+from lmrex.state.session_cache import session_cache
+
+
+@pytest.fixture
+def fast_hashing(monkeypatch):
+    monkeypatch.setattr(auth_logic.password_hasher, "rounds", 4)
+
+
+def _substate(root, state_cls):
+    return root.get_substate(state_cls.get_full_name().split("."))
+
+
+def _run(state, name, form_data):
+    return asyncio.run(type(state).event_handlers[name].fn(state, form_data))
+
+
+def test_hash_and_verify_round_trip(fast_hashing):
+    async def scenario():
+        hashed = await hash_password("s3cret")
+        return hashed, await verify_password("s3cret", hashed), await verify_password("nope", hashed)
+
+    hashed, good, bad = asyncio.run(scenario())
+
+    assert hashed.startswith(b"$2b$04$")
+    assert (good, bad) == (True, False)
+    assert asyncio.run(verify_password("s3cret", b"not a hash")) is False
+
+
+def test_hashing_leaves_the_event_loop_free():
+    hasher = PasswordHasher(rounds=10, workers=2)
+    ticks = []
+
+    async def ticker():
+        while True:
+            await asyncio.sleep(0.001)
+            ticks.append(1)
+
+    async def scenario():
+        task = asyncio.create_task(ticker())
+        await asyncio.gather(*(hasher.hash("pw") for _ in range(2)))
+        task.cancel()
+
+    asyncio.run(scenario())
+
+    assert len(ticks) >= 5
+
+
+def test_registration_and_login_use_the_pool(auth_db, fast_hashing):
+    root = RootState(_reflex_internal_init=True)
+    registration = _substate(root, reflex_local_auth.RegistrationState)
+    login = _substate(root, reflex_local_auth.LoginState)
+    login.auth_token = "fresh-token"
+
+    form = {"username": "grace", "password": "hopper", "confirm_password": "hopper"}
+    assert _run(registration, "handle_registration", form) is not None
+    assert registration.new_user_id > 0
+
+    _run(login, "on_submit", {"username": "grace", "password": "wrong"})
+    assert login.error_message.startswith("There was a problem")
+
+    _run(login, "on_submit", {"username": "grace", "password": "hopper"})
+    assert login.error_message == ""
+    with Session(auth_db) as session:
+        sessions = session.exec(
+            select(LocalAuthSession).where(LocalAuthSession.session_id == "fresh-token")
+        ).all()
+    assert [s.user_id for s in sessions] == [registration.new_user_id]
+
+
+def test_require_login_registers_guard_as_first_on_load():
+    app = rx.App()
+    extra = ProtectedState.load_user_data
+    require_login(app, lambda: rx.text("secret"), route="/Account")
+    require_login(app, lambda: rx.text("mine"), route="/Account/Gallery/", on_load=extra)
+
+    assert app.get_load_events("/Account") == [ProtectedState.on_load]
+    assert app.get_load_events("/Account/Gallery/") == [ProtectedState.on_load, extra]
+
+
+def _guarded(token, path):
+    root = RootState(_reflex_internal_init=True)
+    root.router_data = {"pathname": path, "asPath": path, "query": {}}
+    root.router = RouterData.from_router_data(root.router_data)
+    protected = _substate(root, ProtectedState)
+    protected.auth_token = token
+    return root, protected, asyncio.run(type(protected).event_handlers["on_load"].fn(protected))
+
+
+def test_guard_redirects_anonymous_sessions_to_login(auth_db):
+    root, protected, result = _guarded("unknown", "/Account/Gallery/")
+
+    assert result.args[0][1]._js_expr == f'"{LOGIN_ROUTE}"'
+    assert _substate(root, reflex_local_auth.LoginState).redirect_to == "/Account/Gallery/"
+    assert protected.protected_data == ""
+
+
+def test_guard_lets_logged_in_sessions_through(auth_db):
+    _guarded("tok", "/Account")
+    _, protected, result = _guarded("tok", "/Account")
+
+    assert result is None
+    assert protected.protected_data.startswith("Welcome ada!")
+    # The second page load found the session in the cache
+    assert session_cache.stats()["hits"] >= 1
@@ -0,0 +1,111 @@
+import asyncio
+import types
+
+import reflex as rx
+from reflex.event import Event
+from reflex.state import State as RootState
+from reflex.state import StateUpdate
+from starlette.applications import Starlette
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from lmrex.middleware import event_metrics as metrics_module
+from lmrex.middleware.event_metrics import (
+    EventMetrics,
+    EventMetricsMiddleware,
+    RollingHistogram,
+    event_metrics_endpoint,
+)
+from lmrex.state import state as state_module
+from lmrex.state.state import CarouselState
+
+
+def test_rolling_histogram_keeps_only_recent_samples():
+    histogram = RollingHistogram(window=4)
+    for value in (1000, 1, 2, 3, 4):
+        histogram.record(value)
+
+    summary = histogram.summary()
+    assert summary["count"] == 5
+    assert summary["max"] == 4
+    assert summary["p50"] == 3
+    assert histogram.buckets((2, 3)) == [2, 1, 1]
+
+
+def test_middleware_records_delta_size_and_latency_per_handler():
+    metrics = EventMetrics()
+    middleware = EventMetricsMiddleware(metrics)
+    root = RootState(_reflex_internal_init=True)
+    event = Event(token="token", name=f"{CarouselState.get_full_name()}.next_item", payload={})
+    partial = StateUpdate(delta={"state": {"x": 1}}, final=False)
+    final = StateUpdate(delta={"state": {"x": "y" * 500}})
+
+    async def process():
+        await middleware.preprocess(None, root, event)
+        await middleware.postprocess(None, root, event, partial)
+        await middleware.postprocess(None, root, event, final)
+
+    asyncio.run(process())
+
+    # One sample per event: the bytes of all its updates, recorded when it ends
+    stats = metrics.snapshot()["CarouselState.next_item"]
+    assert stats["delta_bytes"]["count"] == 1
+    assert stats["delta_bytes"]["max"] == len(partial.json()) + len(final.json())
+    assert stats["latency_ms"]["count"] == 1
+    assert middleware._runs == {}
+
+
+def test_middleware_records_concurrent_background_events_when_their_tasks_end(monkeypatch):
+    metrics = EventMetrics()
+    middleware = EventMetricsMiddleware(metrics)
+    app = rx.App()
+    app.add_middleware(middleware)
+    sent = []
+
+    async def emit_update(update, token):
+        sent.append(update)
+
+    app._event_namespace = types.SimpleNamespace(emit_update=emit_update)
+    root = RootState(_reflex_internal_init=True)
+    name = f"{CarouselState.get_full_name()}.build_derivatives"
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def publish(url):
+            await release.wait()
+            return None
+
+        monkeypatch.setattr(state_module.derivatives, "publish", publish)
+        # Two runs of the same background handler for one token overlap
+        tasks = []
+        for i in range(2):
+            event = Event(token="tok", name=name, payload={"url": f"https://example.com/{i}.png"})
+            assert await app._preprocess(root, event) is None
+            tasks.append(app._process_background(root, event))
+        await asyncio.sleep(0)
+        assert metrics.snapshot() == {}
+        release.set()
+        await asyncio.gather(*tasks)
+        await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+
+    stats = metrics.snapshot()["CarouselState.build_derivatives"]
+    assert len(sent) == 2 and all(update.final is None for update in sent)
+    assert stats["latency_ms"]["count"] == stats["delta_bytes"]["count"] == 2
+    assert stats["delta_bytes"]["max"] == len(sent[0].json())
+    assert middleware._runs == {}
+
+
+def test_metrics_endpoint_serves_snapshot(monkeypatch):
+    metrics = EventMetrics()
+    metrics.record_delta("ModalState.toggle_modal", 120)
+    metrics.record_latency("ModalState.toggle_modal", 0.4)
+    monkeypatch.setattr(metrics_module, "event_metrics", metrics)
+    client = TestClient(Starlette(routes=[Route("/_metrics/events", event_metrics_endpoint)]))
+
+    body = client.get("/_metrics/events").json()
+
+    assert body["ModalState.toggle_modal"]["delta_bytes"]["p50"] == 120
+    assert body["ModalState.toggle_modal"]["latency_ms"]["buckets"] == [1, 0, 0, 0, 0, 0]
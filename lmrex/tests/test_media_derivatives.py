@@ -0,0 +1,151 @@
+import asyncio
+import io
+import socket
+
+import httpx
+import pytest
+
+from lmrex.models.media_derivatives import DerivativeService, UnsafeSourceError
+from lmrex.models.media_model import MediaService
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def _png(width=1000, height=500):
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 40, 90)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def service(tmp_path):
+    service = DerivativeService(cache_dir=tmp_path, formats=("webp",), max_workers=1)
+    yield service
+    service.shutdown()
+
+
+def test_ensure_writes_width_variants_without_upscaling(service, tmp_path):
+    manifest = asyncio.run(service.ensure("https://cdn.example.com/a.png", _png()))
+
+    digest = service.content_hash(_png())
+    assert manifest["variants"]["webp"] == [
+        [320, f"{digest}/320.webp"],
+        [640, f"{digest}/640.webp"],
+    ]
+    with Image.open(tmp_path / digest / "640.webp") as variant:
+        assert variant.size == (640, 320)
+
+
+def test_srcset_lists_variants_under_the_backend_prefix(service):
+    url = "https://cdn.example.com/a.png"
+    assert service.lookup(url) is None
+    assert service.srcset(None) == {"webp": ""}
+
+    asyncio.run(service.ensure(url, _png()))
+    digest = service.content_hash(_png())
+    sources = service.srcset(service.lookup(url))
+    prefix = service.url_prefix
+    assert prefix.startswith("http") and prefix.endswith("/derivatives")
+    assert sources["webp"] == (
+        f"{prefix}/{digest}/320.webp 320w, {prefix}/{digest}/640.webp 640w"
+    )
+
+
+def test_identical_content_shares_one_cache_entry(service, tmp_path):
+    first = asyncio.run(service.ensure("https://a.example.com/x.png", _png()))
+    second = asyncio.run(service.ensure("https://b.example.com/y.png", _png()))
+
+    assert first == second
+    entries = [path.name for path in tmp_path.iterdir() if path.name != "urls"]
+    assert len(entries) == 1
+
+
+def test_small_images_get_single_variant(service):
+    manifest = asyncio.run(service.ensure("https://cdn.example.com/s.png", _png(200, 100)))
+    assert [width for width, _ in manifest["variants"]["webp"]] == [200]
+
+
+def _resolve_to(monkeypatch, address):
+    def getaddrinfo(host, port, *args, **kwargs):
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", (address, port))]
+
+    monkeypatch.setattr(socket, "getaddrinfo", getaddrinfo)
+
+
+def _serving(body, status=200, headers=None):
+    def handler(request):
+        return httpx.Response(status, headers=headers or {}, content=body)
+
+    return httpx.MockTransport(handler)
+
+
+@pytest.mark.parametrize("url", ["http://127.0.0.1/a.png", "http://[::1]/a.png", "file:///etc/passwd"])
+def test_ensure_refuses_local_sources(service, url):
+    with pytest.raises(UnsafeSourceError):
+        asyncio.run(service.ensure(url))
+
+
+def test_ensure_refuses_hosts_resolving_to_private_addresses(service, monkeypatch):
+    _resolve_to(monkeypatch, "10.0.0.7")
+    with pytest.raises(UnsafeSourceError, match="non-public"):
+        asyncio.run(service.ensure("https://intranet.example.com/a.png"))
+
+
+def test_every_redirect_hop_is_checked(tmp_path, monkeypatch):
+    hops = []
+
+    def getaddrinfo(host, port, *args, **kwargs):
+        hops.append(host)
+        address = "169.254.169.254" if host == "metadata.example.com" else "93.184.216.34"
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", (address, port))]
+
+    monkeypatch.setattr(socket, "getaddrinfo", getaddrinfo)
+    redirect = _serving(b"", 302, {"location": "http://metadata.example.com/latest"})
+    service = DerivativeService(cache_dir=tmp_path, transport=redirect)
+
+    with pytest.raises(UnsafeSourceError):
+        asyncio.run(service.ensure("https://cdn.example.com/a.png"))
+    assert hops == ["cdn.example.com", "metadata.example.com"]
+
+
+def test_downloads_stop_at_the_byte_cap(tmp_path, monkeypatch):
+    _resolve_to(monkeypatch, "93.184.216.34")
+    sent = []
+
+    async def chunks():
+        for _ in range(50):
+            sent.append(1)
+            yield b"x" * 100
+
+    declared = DerivativeService(cache_dir=tmp_path, max_source_bytes=1000, transport=_serving(b"x" * 5000))
+    with pytest.raises(UnsafeSourceError, match="5000 bytes"):
+        asyncio.run(declared.ensure("https://cdn.example.com/huge.png"))
+
+    # Without a Content-Length the stream is cut off once the cap is passed
+    streamed = DerivativeService(cache_dir=tmp_path, max_source_bytes=1000, transport=_serving(chunks()))
+    with pytest.raises(UnsafeSourceError, match="exceeds"):
+        asyncio.run(streamed.ensure("https://cdn.example.com/huge.png"))
+    assert len(sent) < 50
+
+
+def test_images_over_the_pixel_cap_are_not_decoded(tmp_path):
+    service = DerivativeService(cache_dir=tmp_path, formats=("webp",), max_workers=1, max_source_pixels=10_000)
+    try:
+        with pytest.raises(UnsafeSourceError):
+            asyncio.run(service.ensure("https://cdn.example.com/big.png", _png(1000, 500)))
+    finally:
+        service.shutdown()
+    assert not any(path.is_dir() and path.name != "urls" for path in tmp_path.iterdir())
+
+
+def test_publish_stores_srcsets_with_the_catalog_item(media_db, service, monkeypatch):
+    _resolve_to(monkeypatch, "93.184.216.34")
+    service.transport = _serving(_png())
+    item = MediaService.add("Pic", "https://cdn.example.com/pic.png", "image")
+    version = MediaService.catalog.version
+
+    published = asyncio.run(service.publish(item["url"]))
+
+    assert published["id"] == item["id"]
+    assert MediaService.get(item["id"])["webp"].endswith("/640.webp 640w")
+    assert MediaService.catalog.version > version
@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+
+from lmrex.models.media_ingest import IngestQueueFull, MediaIngestQueue
+from lmrex.models.media_metadata import MediaEnricher
+from lmrex.models.media_model import MediaService
+
+
+def test_submit_persists_and_enriches(media_db, stub_media_server):
+    url = stub_media_server.base_url + "/short/3"
+    queue = MediaIngestQueue(oembed_endpoints={"127.0.0.1": stub_media_server.base_url + "/oembed"})
+
+    async def scenario():
+        try:
+            return await queue.submit("Clip", url, "video")
+        finally:
+            await queue.aclose()
+
+    item = asyncio.run(scenario())
+
+    assert MediaService.get(item["id"])["title"] == "Clip"
+    metadata = MediaEnricher.cached(url)
+    assert metadata["canonical_url"] == stub_media_server.base_url + "/video/3"
+    assert queue.stats()["completed"] == 1
+
+
+def test_full_queue_rejects_after_enqueue_timeout(media_db, monkeypatch):
+    started = []
+    gates = {}
+
+    async def slow_ingest(self, title, url, media_type):
+        started.append(title)
+        await gates["release"].wait()
+        return {"title": title}
+
+    monkeypatch.setattr(MediaIngestQueue, "_ingest", slow_ingest)
+    queue = MediaIngestQueue(max_depth=2, workers=1, enqueue_timeout=0.05, enrich=False)
+
+    async def scenario():
+        gates["release"] = asyncio.Event()
+        submissions = [
+            asyncio.create_task(queue.submit(f"Item {i}", f"https://example.com/{i}", "image"))
+            for i in range(3)
+        ]
+        # One item is being worked on and two are queued
+        await asyncio.sleep(0.01)
+        assert queue.stats()["depth"] == 2
+        with pytest.raises(IngestQueueFull):
+            await queue.submit("Overflow", "https://example.com/x", "image")
+        gates["release"].set()
+        results = await asyncio.gather(*submissions)
+        await queue.aclose()
+        return results
+
+    results = asyncio.run(scenario())
+
+    assert [r["title"] for r in results] == ["Item 0", "Item 1", "Item 2"]
+    assert started == ["Item 0", "Item 1", "Item 2"]
+    assert queue.stats()["rejected"] == 1
+
+
+def test_validation_errors_reach_the_submitter(media_db):
+    queue = MediaIngestQueue(enrich=False)
+
+    async def scenario():
+        try:
+            await queue.submit("Bad", "https://example.com/bad", "hologram")
+        finally:
+            await queue.aclose()
+
+    with pytest.raises(ValueError):
+        asyncio.run(scenario())
+    assert queue.stats()["failed"] == 1
+    assert MediaService.count() == 4
+
@@ -0,0 +1,96 @@
+import io
+import json
+
+from lmrex.models.media_io import export_file, import_file, read_rows, write_rows
+from lmrex.models.media_model import MediaService
+
+
+def test_import_stream_reports_bad_rows_without_aborting(media_db):
+    rows = [
+        {"title": "One", "url": "https://example.com/1", "type": "image"},
+        {"title": "Two", "url": "https://example.com/2", "type": "hologram"},
+        {"title": "Three"},
+        "not a row",
+        {"title": "Four", "url": "https://example.com/4"},
+        {"title": "Five", "url": "  ", "type": "video"},
+        {"title": "Six", "url": "https://example.com/6", "type": "VIDEO"},
+    ]
+    seen = []
+    report = MediaService.import_stream(
+        rows, batch_size=2, on_error=lambda row, message: seen.append(row)
+    )
+
+    assert report.imported == 3
+    assert report.failed == 4
+    assert [row for row, _ in report.errors] == seen == [2, 3, 4, 6]
+    assert "hologram" in report.errors[0][1]
+    assert MediaService.count() == 7
+
+    tail, _ = MediaService.list_page(limit=3, backward=True)
+    assert [(item["title"], item["type"]) for item in tail] == [
+        ("One", "image"), ("Four", "image"), ("Six", "video"),
+    ]
+
+
+def test_import_stream_accepts_generators(media_db):
+    def rows():
+        for i in range(25):
+            yield {"title": f"Item {i}", "url": f"https://example.com/{i}"}
+
+    report = MediaService.import_stream(rows(), batch_size=10)
+    assert report.imported == 25
+    assert MediaService.count() == 29
+
+
+def test_export_stream_walks_catalog_in_order(media_db):
+    exported = list(MediaService.export_stream(batch_size=3))
+    assert [row["title"] for row in exported] == ["Panama Rose", "~OM~", "Swirls", "Test_Audio"]
+    assert set(exported[0]) == {"title", "url", "type"}
+    assert len(MediaService.catalog) == 0
+
+
+def test_jsonl_reader_yields_parse_errors_as_rows():
+    stream = io.StringIO('{"title": "A", "url": "u"}\n\n{oops\n')
+    rows = list(read_rows(stream, "jsonl"))
+    assert rows[0] == {"title": "A", "url": "u"}
+    assert isinstance(rows[1], ValueError)
+
+
+def test_csv_round_trip_through_files(media_db, tmp_path):
+    path = tmp_path / "media.csv"
+    assert export_file(path) == 4
+
+    # Re-importing the same catalog is rejected row by row as duplicates
+    report = import_file(path)
+    assert (report.imported, report.failed) == (0, 4)
+    assert MediaService.count() == 4
+
+    for item in MediaService.list_page(limit=10)[0]:
+        MediaService.remove(item["id"])
+    report = import_file(path)
+    assert (report.imported, report.failed) == (4, 0)
+    assert [row["title"] for row in MediaService.export_stream()] == [
+        "Panama Rose", "~OM~", "Swirls", "Test_Audio",
+    ]
+
+
+def test_import_stream_rejects_duplicates_within_and_across_batches(media_db):
+    rows = [
+        {"title": "A", "url": "https://Example.com/a?utm_source=x"},
+        {"title": "A again", "url": "https://example.com/a"},
+        {"title": "B", "url": "https://example.com/b"},
+        {"title": "Swirls copy", "url": "https://vimeo.com/1127068081"},
+        {"title": "B again", "url": "https://example.com/b#t=10"},
+    ]
+    report = MediaService.import_stream(rows, batch_size=2)
+
+    assert report.imported == 2
+    assert sorted(row for row, _ in report.errors) == [2, 4, 5]
+    assert all("duplicate" in message for _, message in report.errors)
+
+
+def test_jsonl_writer_emits_one_object_per_line():
+    stream = io.StringIO()
+    write_rows([{"title": "A", "url": "u", "type": "image"}] * 2, stream, "jsonl")
+    lines = stream.getvalue().splitlines()
+    assert [json.loads(line)["title"] for line in lines] == ["A", "A"]
@@ -0,0 +1,128 @@
+import asyncio
+
+import sqlalchemy as sa
+
+from lmrex.models import media_metadata
+from lmrex.models.media_metadata import MediaEnricher, MediaMetadata
+from lmrex.models.media_model import MediaItem, MediaService, MediaType
+
+
+def _enricher(server, **options):
+    return MediaEnricher(
+        oembed_endpoints={"127.0.0.1": server.base_url + "/oembed"}, **options
+    )
+
+
+async def _enrich(enricher, items):
+    async with enricher:
+        return await enricher.enrich(items)
+
+
+def test_enrich_resolves_redirects_and_fetches_oembed(media_db, stub_media_server):
+    short_url = stub_media_server.base_url + "/short/7"
+    result = asyncio.run(
+        _enrich(_enricher(stub_media_server), [MediaItem("Clip", short_url, MediaType.VIDEO)])
+    )
+
+    metadata = result[short_url]
+    assert metadata["canonical_url"] == stub_media_server.base_url + "/video/7"
+    assert metadata["content_type"] == "text/html"
+    # The stub sends width as a string
+    assert (metadata["width"], metadata["height"]) == (640, 360)
+    assert metadata["thumbnail_url"].endswith("/video/7/thumb.jpg")
+
+
+def test_enrich_reads_image_headers(media_db, stub_media_server):
+    url = stub_media_server.base_url + "/image.jpg"
+    enricher = MediaEnricher(oembed_endpoints={})
+    metadata = asyncio.run(_enrich(enricher, [MediaItem("Pic", url)]))[url]
+
+    assert metadata["content_type"] == "image/jpeg"
+    assert metadata["content_length"] == 2048
+    assert metadata["width"] is None
+
+
+def test_enrich_uses_ttl_cache(media_db, stub_media_server):
+    url = stub_media_server.base_url + "/short/1"
+    items = [MediaItem("Clip", url), MediaItem("Same clip", url)]
+
+    # Entries stored with a non-positive TTL are already stale
+    asyncio.run(_enrich(_enricher(stub_media_server, ttl=-1), items))
+    first_hits = len(stub_media_server.hits)
+    assert first_hits == 3  # redirect, HEAD, oEmbed; duplicate URL collapsed
+
+    asyncio.run(_enrich(_enricher(stub_media_server), items))
+    assert len(stub_media_server.hits) == first_hits * 2
+
+    asyncio.run(_enrich(_enricher(stub_media_server), items))
+    assert len(stub_media_server.hits) == first_hits * 2
+
+
+def test_enrich_skips_failed_urls(media_db, stub_media_server):
+    dead = "http://127.0.0.1:9/unreachable"
+    good = stub_media_server.base_url + "/image.jpg"
+    result = asyncio.run(
+        _enrich(MediaEnricher(oembed_endpoints={}, timeout=2), [MediaItem("x", dead), MediaItem("y", good)])
+    )
+    assert list(result) == [good]
+
+
+def test_redirect_hops_use_their_own_host_client(media_db, stub_media_server):
+    port = stub_media_server.server_address[1]
+    moved = stub_media_server.base_url + "/moved/3"
+    enricher = MediaEnricher(oembed_endpoints={})
+
+    async def scenario():
+        async with enricher:
+            metadata = await enricher.enrich_url(moved)
+            return metadata, set(enricher._clients)
+
+    metadata, hosts = asyncio.run(scenario())
+
+    assert metadata["canonical_url"] == f"http://localhost:{port}/video/3"
+    assert hosts == {f"127.0.0.1:{port}", f"localhost:{port}"}
+
+
+def test_enrichment_refines_the_items_render_descriptor(media_db, stub_media_server):
+    url = stub_media_server.base_url + "/short/9"
+    item = MediaService.add("Clip", url, "video")
+    version = MediaService.catalog.version
+
+    asyncio.run(_enrich(_enricher(stub_media_server), [MediaItem.from_dict(item)]))
+
+    stored = MediaService.get(item["id"])
+    assert stored["aspect_ratio"] == "640 / 360"
+    assert stored["poster"].endswith("/video/9/thumb.jpg")
+    # Journaled, so open carousels pick up the poster
+    assert MediaService.catalog.version > version
+
+    # Renaming the item keeps what enrichment found
+    MediaService.update(item["id"], "Renamed", url, "video")
+    assert MediaService.get(item["id"])["aspect_ratio"] == "640 / 360"
+
+
+def test_concurrent_store_of_the_same_url_updates(media_db, monkeypatch):
+    enricher = MediaEnricher()
+    url = "https://example.com/race.mp4"
+    upsert = enricher._upsert
+    calls = []
+
+    def racing_upsert(url, metadata):
+        if not calls:
+            # Another worker inserts the row between our select and insert
+            calls.append(upsert(url, {"provider": "other"}))
+            raise sa.exc.IntegrityError("INSERT", {}, Exception("UNIQUE constraint failed"))
+        return upsert(url, metadata)
+
+    monkeypatch.setattr(enricher, "_upsert", racing_upsert)
+    stored = enricher._store(url, {"provider": "mine"})
+
+    assert stored["provider"] == "mine"
+    with MediaService.session_factory() as session:
+        assert session.exec(sa.select(sa.func.count()).select_from(MediaMetadata)).one()[0] == 1
+
+
+def test_dimensions_are_coerced():
+    assert [media_metadata._dimension(v) for v in ("480", 480.0, "100%", None, 0)] == [
+        480, 480, None, None, None,
+    ]
@@ -1,59 +1,365 @@
+import asyncio
+import contextlib
+import types
+
 import pytest
+from reflex.state import RouterData
+from reflex.state import State as RootState
+
+from lmrex.components import media_modal as media_modal_module
 from lmrex.components.media_modal import MediaFormState
-from lmrex.state.state import State
+from lmrex.models.media_ingest import MediaIngestQueue
+from lmrex.state import state as state_module
+from lmrex.state.state import CarouselState, FormState, broadcast_catalog_changes
 from lmrex.models.media_model import MediaService
 
-def _unwrap_var(value):
-    """
-    If `value` is callable, call it; otherwise return it as-is.
 
-    This handles `@rx.var` decorated attributes that may be descriptors or
-    callables depending on the Reflex runtime.
-    """
-    return value() if callable(value) else value
+class _Locked:
+    """Stand-in for the StateProxy a background handler receives."""
+
+    def __init__(self, state):
+        object.__setattr__(self, "_state", state)
+
+    def __getattr__(self, name):
+        return getattr(self._state, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._state, name, value)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return None
+
+
+@pytest.fixture
+def ingest(monkeypatch):
+    """A fresh ingestion queue without network enrichment for the form handlers."""
+    queue = MediaIngestQueue(enrich=False)
+    monkeypatch.setattr(media_modal_module, "ingest_queue", queue)
+    monkeypatch.setattr(state_module, "ingest_queue", queue)
+    return queue
 
-def test_media_form_submit_increments_media_count():
+
+def _submit(state, form_data):
+    """Run a background handle_submit to completion against a plain state."""
+    handler = type(state).event_handlers["handle_submit"]
+    return asyncio.run(handler.fn(_Locked(state), form_data))
+
+
+def test_media_form_submit_persists_item(media_db, ingest):
     """
-    Submitting the media modal form should increment the media count,
-    close the modal, and reset the form fields. We avoid iterating over
-    `State.media` directly (it's a reactive Var) and instead assert on
-    `State.media_count`.
+    Submitting the media modal form should persist a new catalog item,
+    clear the uncontrolled inputs, close the modal and hand the new id to the
+    carousel.
     """
-    try:
-        # Start with a clean slate
-        State.media = []
-
-        form = MediaFormState()
-        form.media_type = "image"
-        form.media_title = "Test Title"
-        form.media_url = "https://example.com/test.png"
-
-        initial_count = _unwrap_var(State.media_count)
-        # Expect 0 since we reset the list
-        assert initial_count == 0
-
-        # Try to invoke the submit handler robustly (it may be wrapped by an event decorator)
-        wrapped = getattr(form.handle_submit, "__wrapped__", None)
-        if wrapped is not None:
-            wrapped(form)
-        else:
-            try:
-                form.handle_submit()
-            except TypeError:
-                cls_wrapped = getattr(MediaFormState.handle_submit, "__wrapped__", None)
-                if cls_wrapped is not None:
-                    cls_wrapped(form)
-                else:
-                    pytest.skip("Couldn't invoke MediaFormState.handle_submit in this environment")
-
-        new_count = _unwrap_var(State.media_count)
-        assert new_count == initial_count + 1
-
-        # Ensure the modal was closed and the local form was reset
-        assert State.show_modal is False
-        assert form.media_title == ""
-        assert form.media_url == ""
-        assert form.media_type == ""
-    finally:
-        # Restore a reasonable default so other tests are not affected
-        State.media = MediaService.get_default_media_items()
+    form = MediaFormState(_reflex_internal_init=True)
+
+    initial_count = MediaService.count()
+    *clear, close, added = _submit(
+        form,
+        {
+            "media_type": "image",
+            "media_title": "Test Title",
+            "media_url": "https://example.com/test.png",
+        },
+    )
+
+    assert MediaService.count() == initial_count + 1
+    assert close.fn.__name__ == "close_modal"
+    assert added.handler.fn.__name__ == "media_added"
+    # Ensure the browser-side inputs are reset
+    assert len(clear) == 3
+    assert form.form_error == ""
+    assert form.submitting is False
+    assert ingest.stats()["completed"] == 1
+
+
+def test_media_form_submit_rejects_invalid_type(media_db, ingest):
+    form = MediaFormState(_reflex_internal_init=True)
+
+    assert _submit(form, {"media_type": "hologram", "media_title": "Bad"}) is None
+    assert MediaService.count() == 4
+    assert "hologram" in form.form_error
+
+
+def test_media_form_reports_duplicates_from_the_worker(media_db, ingest):
+    form = MediaFormState(_reflex_internal_init=True)
+
+    assert _submit(form, {"media_title": "Again", "media_url": "https://vimeo.com/1127068081"}) is None
+    assert "already exists" in form.form_error
+    assert ingest.stats()["failed"] == 1
+
+
+def test_media_form_checks_url_for_duplicates(media_db):
+    form = MediaFormState(_reflex_internal_init=True)
+
+    form.check_url("https://vimeo.com/1127068081")
+    assert form.url_error != ""
+    form.check_url("https://example.com/new.png")
+    assert form.url_error == ""
+
+
+def test_form_state_submit_appends_to_carousel(media_db, ingest, monkeypatch):
+    state = CarouselState(_reflex_internal_init=True)
+    state.load_media()
+    form = FormState(_reflex_internal_init=True)
+
+    async def get_state(cls):
+        return state
+
+    monkeypatch.setattr(FormState, "get_state", lambda self, cls: get_state(cls))
+
+    event = _submit(form, {"media_title": "Typed", "media_url": "https://example.com/typed.png"})
+
+    assert state.media_count == 5
+    assert MediaService.get(state._media_ids[-1])["title"] == "Typed"
+    # Images go on to get their responsive variants
+    assert event.handler.fn.__name__ == "build_derivatives"
+    assert event.args[0][1]._var_value == "https://example.com/typed.png"
+
+
+def test_media_added_tracks_item(media_db):
+    state = CarouselState(_reflex_internal_init=True)
+    state.load_media()
+
+    item = MediaService.add("Fresh", "https://example.com/fresh.png", "image")
+    state.media_added(item["id"])
+
+    assert state.media_count == 5
+    assert state._media_ids[-1] == item["id"]
+
+
+def _windowed_state(monkeypatch, window=3, margin=1):
+    monkeypatch.setattr(CarouselState, "CAROUSEL_WINDOW", window)
+    monkeypatch.setattr(CarouselState, "CAROUSEL_PREFETCH_MARGIN", margin)
+    for i in range(4):
+        MediaService.add(f"Extra {i}", f"https://example.com/{i}.png", "image")
+    state = CarouselState(_reflex_internal_init=True)
+    state.load_media()
+    return state
+
+
+def test_carousel_window_slides_through_catalog(media_db, monkeypatch):
+    state = _windowed_state(monkeypatch)
+    assert len(state._window) == 3
+
+    titles = [state.current_media_item["title"]]
+    for _ in range(8):
+        state.next_item()
+        state._prefetching = False
+        titles.append(state.current_media_item["title"])
+        assert len(state._window) <= 3
+    assert titles == [
+        "Panama Rose", "~OM~", "Swirls", "Test_Audio",
+        "Extra 0", "Extra 1", "Extra 2", "Extra 3", "Panama Rose",
+    ]
+
+    state.previous_item()
+    assert state.current_media_item["title"] == "Extra 3"
+    assert state.catalog_index == 7
+    state.previous_item()
+    state._prefetching = False
+    state.previous_item()
+    assert state.current_media_item["title"] == "Extra 1"
+    assert state.catalog_index == 5
+
+
+def test_carousel_requests_prefetch_near_window_edge(media_db, monkeypatch):
+    state = _windowed_state(monkeypatch)
+
+    event = state.next_item()
+    assert event.fn.__name__ == "prefetch_next"
+    assert state._prefetching is True
+    # A second step while the prefetch is in flight does not queue another one
+    assert state.next_item() is None
+
+
+def test_carousel_stays_in_window_when_catalog_end_vanished(media_db, monkeypatch):
+    state = _windowed_state(monkeypatch)
+    state.next_item()
+    state.next_item()
+    state._prefetching = False
+    # Everything after the window was removed by another session
+    window_ids = set(state._media_ids)
+    for item in MediaService.list_page(state._window[-1], 10)[0]:
+        if item["id"] not in window_ids:
+            MediaService.remove(item["id"])
+
+    state.next_item()
+
+    assert state.current_index == len(state._window) - 1
+    assert state._has_more_after is False
+    assert state.current_media_item["title"] == "Swirls"
+
+
+def test_reset_to_defaults_loads_the_first_window_once(media_db, monkeypatch):
+    state = _windowed_state(monkeypatch)
+    state.next_item()
+    pages = []
+    list_page = MediaService.list_page
+    monkeypatch.setattr(
+        MediaService, "list_page", lambda *a, **kw: pages.append(a) or list_page(*a, **kw)
+    )
+
+    state.reset_to_defaults()
+
+    assert len(pages) == 1
+    assert (state.current_index, state.catalog_index) == (0, 0)
+    assert state.current_media_item["title"] == "Panama Rose"
+
+
+def test_updating_current_item_resends_only_that_item(media_db):
+    state = CarouselState(_reflex_internal_init=True)
+    state.load_media()
+    state.get_delta()
+    state._clean()
+
+    media_id = state._media_ids[0]
+    state.update_media_item(media_id, "Renamed", "https://example.com/r.png", "image")
+
+    delta = next(iter(state.get_delta().values()))
+    assert set(delta) == {
+        "current_media_item_rx_state_",
+        "window_items_rx_state_",
+        "adjacent_media_items_rx_state_",
+    }
+    assert delta["current_media_item_rx_state_"]["title"] == "Renamed"
+
+
+def test_adjacent_items_are_offered_for_preloading(media_db):
+    state = CarouselState(_reflex_internal_init=True)
+    state.load_media()
+    titles = [MediaService.get(media_id)["title"] for media_id in state._media_ids]
+
+    assert [item["title"] for item in state.adjacent_media_items] == [titles[1]]
+    state.next_item()
+    neighbours = state.adjacent_media_items
+    assert [item["title"] for item in neighbours] == [titles[0], titles[2]]
+    assert {"player", "embed_url", "avif", "webp"} <= set(neighbours[0])
+
+    # Client navigation preloads from window_items in the browser
+    state.load_media(True)
+    assert state.adjacent_media_items == []
+
+
+class _FakeApp:
+    """Just enough of rx.App for the catalog broadcast task."""
+
+    def __init__(self, states):
+        self.states = states
+        self.visited = []
+        self.event_namespace = types.SimpleNamespace(
+            token_to_sid={token: f"sid-{token}" for token in states}
+        )
+
+    @contextlib.asynccontextmanager
+    async def modify_state(self, key):
+        token = key.partition("_")[0]
+        self.visited.append(token)
+        state = self.states[token]
+
+        async def get_state(cls):
+            return state
+
+        yield types.SimpleNamespace(get_state=get_state)
+
+
+def _carousel_session(token):
+    root = RootState(_reflex_internal_init=True)
+    root.router = RouterData.from_router_data({"token": token})
+    state = root.get_substate(CarouselState.get_full_name().split("."))
+    state.load_media()
+    return state
+
+
+def test_catalog_edits_are_broadcast_to_affected_sessions(media_db, monkeypatch):
+    monkeypatch.setattr(state_module, "carousel_sessions", {})
+    viewing, elsewhere, gone = map(_carousel_session, ("viewing", "elsewhere", "gone"))
+    elsewhere.next_item()
+    app = _FakeApp({"viewing": viewing, "elsewhere": elsewhere})
+    for state in (viewing, elsewhere):
+        state._clean()
+
+    first, second = viewing._media_ids[:2]
+
+    def edit():
+        MediaService.update(first, "Renamed", "https://example.com/renamed.png", "image")
+        MediaService.add("Fresh", "https://example.com/fresh.png", "image")
+
+    asyncio.run(_broadcast(app, edit))
+
+    # Both sessions learn the new total; the edited item is only their current
+    # item in one of them, and disconnected sessions are forgotten
+    assert viewing.current_media_item["title"] == "Renamed"
+    assert viewing.media_count == elsewhere.media_count == 5
+    assert elsewhere.current_media_item["title"] == "~OM~"
+    assert set(state_module.carousel_sessions) == {"viewing", "elsewhere"}
+
+    asyncio.run(_broadcast(app, lambda: MediaService.remove(second)))
+    assert elsewhere.current_media_item["title"] == "Swirls"
+    assert second not in elsewhere._media_ids
+
+
+def test_catalog_broadcast_skips_sessions_not_showing_the_edit(media_db, monkeypatch):
+    monkeypatch.setattr(state_module, "carousel_sessions", {})
+    monkeypatch.setattr(CarouselState, "CAROUSEL_WINDOW", 2)
+    start, end = map(_carousel_session, ("start", "end"))
+    end.previous_item()
+    app = _FakeApp({"start": start, "end": end})
+    start_id = start._media_ids[0]
+    assert start_id not in end._media_ids
+
+    async def scenario():
+        task = asyncio.create_task(broadcast_catalog_changes(app, debounce=0))
+        await asyncio.sleep(0)
+        # Bulk imports are journaled too, and a new total reaches everyone
+        MediaService.import_stream([{"title": "Bulk", "url": "https://example.com/bulk.png"}])
+        await asyncio.sleep(0.1)
+        visited_by_import = sorted(app.visited)
+        app.visited.clear()
+        MediaService.update(start_id, "Renamed", "https://example.com/renamed.png", "image")
+        MediaService.update(start_id, "Renamed again", "https://example.com/renamed.png", "image")
+        await asyncio.sleep(0.1)
+        task.cancel()
+        return visited_by_import
+
+    assert asyncio.run(scenario()) == ["end", "start"]
+    assert start.media_count == end.media_count == 5
+    # Both edits land in one pass, and only the session showing the item is opened
+    assert app.visited == ["start"]
+    assert start.current_media_item["title"] == "Renamed again"
+
+
+async def _broadcast(app, edit):
+    """Run the broadcast task around one batch of catalog edits."""
+    task = asyncio.create_task(broadcast_catalog_changes(app, debounce=0))
+    await asyncio.sleep(0)
+    edit()
+    await asyncio.sleep(0.2)
+    task.cancel()
+
+
+def test_sync_index_adopts_client_position(media_db, monkeypatch):
+    state = _windowed_state(monkeypatch, window=6, margin=1)
+    state._clean()
+
+    assert state.sync_index(2) is None
+    assert state.current_index == 2
+    # Steps within the window only move the index; the window is not re-sent
+    assert "window_items_rx_state_" not in next(iter(state.get_delta().values()))
+
+
+def test_sync_index_past_window_edge_moves_client(media_db, monkeypatch):
+    state = _windowed_state(monkeypatch, window=3, margin=0)
+    state.load_media(True)
+    assert [item["title"] for item in state.window_items] == ["Panama Rose", "~OM~", "Swirls"]
+
+    position, prefetch = state.sync_index(3)
+
+    assert state.current_media_item["title"] == "Test_Audio"
+    script = position.args[0][1]._var_value
+    assert script.endswith(f"?.({state.current_index})")
+    assert prefetch.fn.__name__ == "prefetch_next"
+    assert state.window_items[state.current_index]["title"] == "Test_Audio"
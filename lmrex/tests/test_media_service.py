@@ -0,0 +1,269 @@
+import dataclasses
+
+import pytest
+
+from lmrex.models.media_model import (
+    DuplicateMediaError,
+    MediaCatalog,
+    MediaItem,
+    MediaService,
+    MediaType,
+    RENDERERS,
+    RenderDescriptor,
+)
+
+
+def _titles(items):
+    return [item["title"] for item in items]
+
+
+def test_list_page_walks_catalog_forward(media_db):
+    first, cursor = MediaService.list_page(limit=3)
+    assert _titles(first) == ["Panama Rose", "~OM~", "Swirls"]
+    assert cursor == MediaService.cursor_of(first[-1])
+
+    rest, cursor = MediaService.list_page(cursor, limit=3)
+    assert _titles(rest) == ["Test_Audio"]
+    assert cursor is None
+
+
+def test_list_page_backward_returns_items_in_ascending_order(media_db):
+    tail, cursor = MediaService.list_page(limit=2, backward=True)
+    assert _titles(tail) == ["Swirls", "Test_Audio"]
+    assert cursor == MediaService.cursor_of(tail[0])
+
+    head, cursor = MediaService.list_page(cursor, limit=2, backward=True)
+    assert _titles(head) == ["Panama Rose", "~OM~"]
+    assert cursor is None
+
+
+def test_list_page_filters_by_type(media_db):
+    images, cursor = MediaService.list_page(limit=10, type="IMAGE")
+    assert _titles(images) == ["Panama Rose", "~OM~"]
+    assert cursor is None
+    assert MediaService.count(type="image") == 2
+
+
+def test_add_appends_to_end_of_catalog(media_db):
+    item = MediaService.add(" New ", "https://example.com/new.png", "image")
+    assert item["title"] == "New"
+    assert MediaService.count() == 5
+
+    last, _ = MediaService.list_page(limit=1, backward=True)
+    assert last == [item]
+    assert MediaService.get(item["id"]) == item
+
+
+def test_update_and_remove(media_db):
+    first, _ = MediaService.list_page(limit=1)
+    media_id = first[0]["id"]
+
+    updated = MediaService.update(media_id, "Renamed", "https://example.com/a", "video")
+    assert updated["title"] == "Renamed"
+    assert updated["type"] == "video"
+
+    assert MediaService.remove(media_id) is True
+    assert MediaService.get(media_id) is None
+    assert MediaService.remove(media_id) is False
+    assert MediaService.count() == 3
+
+
+def test_add_rejects_invalid_type(media_db):
+    with pytest.raises(ValueError):
+        MediaService.add("Bad", "https://example.com", "hologram")
+    assert MediaService.count() == 4
+
+
+def test_malformed_cursor_starts_from_beginning(media_db):
+    items, _ = MediaService.list_page("not-a-cursor", limit=1)
+    assert _titles(items) == ["Panama Rose"]
+
+
+def test_create_media_item_returns_compact_record():
+    item = MediaService.create_media_item(" Clip ", " https://example.com/v ", "VIDEO")
+    assert item == MediaItem("Clip", "https://example.com/v", MediaType.VIDEO)
+    assert item.type is MediaType("video")
+    assert not hasattr(item, "__dict__")
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        item.title = "Other"
+
+
+def test_media_item_round_trips_frontend_dict():
+    data = {"title": "Swirls", "url": "https://player.vimeo.com/video/1", "type": "video"}
+    assert MediaItem.from_dict(data).to_dict() == data
+
+
+def test_catalog_mutations_are_keyed_by_id():
+    catalog = MediaCatalog(MediaService.get_default_media_items())
+    assert catalog.ids() == [1, 2, 3, 4]
+
+    new_id = MediaService.add_media(catalog, "Clip", "https://example.com/c", "video")
+    assert new_id == 5
+    assert MediaService.update_media_item(catalog, 2, "OM", "https://example.com/om", "image")
+    assert MediaService.remove_media_item(catalog, 1)
+    assert not MediaService.remove_media_item(catalog, 1)
+    assert not MediaService.update_media_item(catalog, 99, "x", "y", "image")
+
+    assert catalog.ids() == [2, 3, 4, 5]
+    assert catalog.get(2).title == "OM"
+    assert MediaService.get_media_count(catalog) == 4
+
+
+def test_catalog_changes_since_reports_only_changed_entries():
+    catalog = MediaCatalog(MediaService.get_default_media_items())
+    version = catalog.version
+
+    catalog.remove(1)
+    catalog.update(3, MediaItem("Renamed", "https://example.com/r", MediaType.VIDEO))
+
+    changes = catalog.changes_since(version)
+    assert set(changes) == {1, 3}
+    assert changes[1] is None
+    assert changes[3].title == "Renamed"
+    assert catalog.changes_since(catalog.version) == {}
+
+
+def test_catalog_changes_since_requires_resync_past_journal(monkeypatch):
+    monkeypatch.setattr(MediaCatalog, "JOURNAL_SIZE", 2)
+    catalog = MediaCatalog(MediaService.get_default_media_items())
+    assert catalog.changes_since(0) is None
+    assert set(catalog.changes_since(catalog.version - 2)) == {3, 4}
+
+
+def test_catalog_cache_evicts_least_recently_used():
+    catalog = MediaCatalog(capacity=2)
+    for media_id in (1, 2):
+        catalog.put(MediaItem(f"Item {media_id}", f"https://example.com/{media_id}", id=media_id))
+    catalog.get(1)
+    catalog.put(MediaItem("Item 3", "https://example.com/3", id=3))
+
+    assert catalog.ids() == [1, 3]
+    # Cache fills and evictions are not catalog changes
+    assert catalog.version == 0
+
+
+def test_catalog_notifies_listeners_of_changes_only():
+    catalog = MediaCatalog(capacity=10)
+    seen = []
+    unsubscribe = catalog.subscribe(seen.append)
+
+    item = MediaItem("Item", "https://example.com/1", id=1)
+    catalog.put(item)
+    catalog.put(item)
+    catalog.put(dataclasses.replace(item, title="Edited elsewhere"))
+    catalog.invalidate(7)
+    unsubscribe()
+    catalog.invalidate(1)
+
+    assert seen == [1, 2]
+    assert set(catalog.changes_since(0)) == {1, 7}
+
+
+def test_get_is_served_from_catalog_mirror(media_db):
+    first, _ = MediaService.list_page(limit=1)
+    media_id = first[0]["id"]
+    assert media_id in MediaService.catalog
+
+    MediaService.update(media_id, "Renamed", first[0]["url"], "image")
+    assert MediaService.catalog.get(media_id).title == "Renamed"
+
+    MediaService.remove(media_id)
+    assert media_id not in MediaService.catalog
+
+
+def test_search_matches_words_and_prefixes(media_db):
+    assert _titles(MediaService.search("panama")) == ["Panama Rose"]
+    assert _titles(MediaService.search("ros")) == ["Panama Rose"]
+    assert _titles(MediaService.search("rose panama")) == ["Panama Rose"]
+    assert MediaService.search("panama swirls") == []
+    assert MediaService.search("  ** ") == []
+
+
+def test_search_ranks_closer_matches_first(media_db):
+    MediaService.add("Rose garden at dusk with rose petals", "https://example.com/1", "image")
+    MediaService.add("Rose", "https://example.com/2", "image")
+    titles = _titles(MediaService.search("rose", limit=2))
+    assert titles[0] == "Rose"
+    assert len(titles) == 2
+
+
+def test_search_index_follows_add_update_remove(media_db):
+    item = MediaService.add("Northern Lights", "https://example.com/n", "video")
+    assert _titles(MediaService.search("northern")) == ["Northern Lights"]
+
+    MediaService.update(item["id"], "Aurora", item["url"], "video")
+    assert MediaService.search("northern") == []
+    assert _titles(MediaService.search("aurora")) == ["Aurora"]
+
+    MediaService.remove(item["id"])
+    assert MediaService.search("aurora") == []
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        ("https://player.vimeo.com/video/1127068081?", "https://player.vimeo.com/video/1127068081"),
+        ("https://vimeo.com/1127068081", "https://player.vimeo.com/video/1127068081"),
+        ("HTTPS://CDN.Example.com:443/a/b/?b=2&a=1#frag", "https://cdn.example.com/a/b?a=1&b=2"),
+        ("https://example.com/x?utm_source=ig&fbclid=1&id=3", "https://example.com/x?id=3"),
+        ("https://youtu.be/abc123?si=share", "https://www.youtube.com/watch?v=abc123"),
+        ("http://example.com:8080", "http://example.com:8080/"),
+        ("  ", ""),
+    ],
+)
+def test_canonicalize_url(url, expected):
+    assert MediaService.canonicalize_url(url) == expected
+
+
+def test_add_rejects_equivalent_urls(media_db):
+    assert MediaService.find_by_url("https://vimeo.com/1127068081") is not None
+
+    with pytest.raises(DuplicateMediaError):
+        MediaService.add("Swirls again", "https://vimeo.com/1127068081", "video")
+    assert MediaService.count() == 4
+
+
+def test_update_rejects_url_of_another_item(media_db):
+    first, second = MediaService.list_page(limit=2)[0]
+    with pytest.raises(DuplicateMediaError):
+        MediaService.update(second["id"], "Copy", first["url"] + "#x", "image")
+    assert MediaService.get(second["id"])["title"] == "~OM~"
+
+
+@pytest.mark.parametrize(
+    "url, media_type, expected",
+    [
+        ("https://example.com/a.jpg", "image", ("image", "https://example.com/a.jpg", "")),
+        (
+            "https://youtu.be/abc123",
+            "video",
+            ("iframe", "https://www.youtube.com/embed/abc123", "16 / 9"),
+        ),
+        (
+            "https://soundcloud.com/artist/track",
+            "audio",
+            (
+                "iframe",
+                "https://w.soundcloud.com/player/?url=https%3A%2F%2Fsoundcloud.com%2Fartist%2Ftrack",
+                "3 / 1",
+            ),
+        ),
+        ("https://example.com/a.mp3", "audio", ("audio", "https://example.com/a.mp3", "")),
+        ("https://example.com/post", "text", ("text", "https://example.com/post", "")),
+    ],
+)
+def test_render_descriptor_is_stored_with_item(media_db, url, media_type, expected):
+    added = MediaService.add("Item", url, media_type)
+    stored = MediaService.get(added["id"])
+    assert (stored["player"], stored["embed_url"], stored["aspect_ratio"]) == expected
+
+    # Rows read back carry the stored descriptor instead of rebuilding it
+    MediaService.catalog = MediaCatalog()
+    assert MediaService.get(added["id"])["embed_url"] == expected[1]
+
+
+def test_register_renderer_overrides_type(media_db, monkeypatch):
+    monkeypatch.setitem(RENDERERS, MediaType.TEXT, lambda url: RenderDescriptor("iframe", url))
+
+    added = MediaService.add("Doc", "https://example.com/doc", "text")
+    assert added["player"] == "iframe"
@@ -0,0 +1,78 @@
+import asyncio
+import types
+
+import reflex as rx
+from reflex.event import Event, get_hydrate_event
+from reflex.state import State as RootState
+from reflex.state import RouterData, StateUpdate
+
+from lmrex.middleware import page_hydrate as page_hydrate_module
+from lmrex.middleware.page_hydrate import ON_LOAD_EVENT, PageHydrateMiddleware, component_states
+from lmrex.state.state import CarouselState, LabelState, ModalState
+from lmrex.ui.gallery import gallery
+from lmrex.ui.index import index
+
+
+def _app():
+    pages = {
+        "Home": lambda: rx.heading(LabelState.label),
+        "Gallery": lambda: rx.box(rx.text(CarouselState.media_count), rx.text(ModalState.show_modal)),
+    }
+    return types.SimpleNamespace(
+        _unevaluated_pages={key: types.SimpleNamespace(component=page) for key, page in pages.items()},
+        overlay_component=None,
+    )
+
+
+def _visit(state, path):
+    state.router_data = {"pathname": path, "query": {}}
+    state.router = RouterData.from_router_data(state.router_data)
+
+
+def test_only_the_gallery_page_uses_carousel_and_modal_states():
+    assert {CarouselState, ModalState, RootState} <= component_states(gallery(), RootState)
+    assert not {CarouselState, ModalState} & component_states(index(), RootState)
+
+
+def test_hydrate_sends_only_the_current_pages_states(media_db):
+    app, middleware = _app(), PageHydrateMiddleware()
+    root = RootState(_reflex_internal_init=True)
+    root.get_substate(CarouselState.get_full_name().split(".")).load_media()
+    _visit(root, "/Home")
+
+    async def navigate():
+        hydrated = await middleware.preprocess(
+            app, root, Event(token="token", name=get_hydrate_event(root), payload={})
+        )
+        _visit(root, "/Gallery")
+        on_load = Event(token="token", name=ON_LOAD_EVENT, payload={})
+        loaded = await middleware.postprocess(app, root, on_load, StateUpdate(delta={}))
+        again = await middleware.postprocess(app, root, on_load, StateUpdate(delta={}))
+        return hydrated, loaded, again
+
+    hydrated, loaded, again = asyncio.run(navigate())
+
+    assert set(hydrated.delta) == {RootState.get_full_name(), LabelState.get_full_name()}
+    assert set(loaded.delta) == {CarouselState.get_full_name(), ModalState.get_full_name()}
+    assert loaded.delta[CarouselState.get_full_name()]["media_count_rx_state_"] == 4
+    # Returning to an already hydrated page adds nothing
+    assert again.delta == {}
+
+
+def test_unknown_routes_hydrate_the_whole_tree(monkeypatch):
+    full = StateUpdate(delta={"everything": {}})
+
+    async def hydrate_all(self, app, state, event):
+        return full
+
+    monkeypatch.setattr(page_hydrate_module.HydrateMiddleware, "preprocess", hydrate_all)
+    middleware = PageHydrateMiddleware()
+    root = RootState(_reflex_internal_init=True)
+    _visit(root, "/Nowhere")
+
+    update = asyncio.run(
+        middleware.preprocess(_app(), root, Event(token="token", name=get_hydrate_event(root), payload={}))
+    )
+
+    assert update is full
+    assert middleware.page_states["Nowhere"] is None
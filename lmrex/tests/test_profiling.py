@@ -0,0 +1,132 @@
+import asyncio
+import contextlib
+import random
+import types
+
+import pytest
+from starlette.applications import Starlette
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from lmrex.middleware import profiling as profiling_module
+from lmrex.middleware.profiling import (
+    HandlerProfiler,
+    HdrHistogram,
+    _profiled,
+    metrics_endpoint,
+    track_queue_wait,
+)
+from lmrex.state.state import CarouselState
+
+
+def test_hdr_histogram_quantiles_are_within_its_precision():
+    rng = random.Random(3)
+    values = sorted(rng.randint(0, 5_000_000) for _ in range(5000))
+    histogram = HdrHistogram(significant_bits=7)
+    for value in values:
+        histogram.record(value)
+
+    for fraction in (0.5, 0.9, 0.99):
+        exact = values[int(fraction * len(values)) - 1]
+        assert abs(histogram.quantile(fraction) - exact) <= exact / 64 + 1
+    assert histogram.quantile(1.0) == histogram.max == values[-1]
+    assert histogram.count == 5000
+    assert len(histogram._counts) < 1500
+
+
+def test_small_values_are_exact():
+    histogram = HdrHistogram(significant_bits=5)
+    for value in (0, 3, 31):
+        histogram.record(value)
+    assert [histogram.quantile(q) for q in (0.1, 0.5, 1.0)] == [0, 3, 31]
+
+
+def test_wrappers_record_every_handler_kind_and_reraise():
+    profiler = HandlerProfiler()
+
+    def sync(fail=False):
+        if fail:
+            raise ValueError("bad")
+        return 1
+
+    def gen():
+        yield 1
+        yield 2
+
+    async def coro():
+        return 3
+
+    async def agen():
+        yield 4
+
+    wrapped = {fn.__name__: _profiled(fn, fn.__name__, profiler) for fn in (sync, gen, coro, agen)}
+
+    async def drive():
+        assert await wrapped["coro"]() == 3
+        assert [x async for x in wrapped["agen"]()] == [4]
+
+    assert wrapped["sync"]() == 1
+    with pytest.raises(ValueError):
+        wrapped["sync"](fail=True)
+    assert list(wrapped["gen"]()) == [1, 2]
+    asyncio.run(drive())
+
+    assert profiler.profiles["sync"].wall_us.count == 2
+    assert dict(profiler.profiles["sync"].exceptions) == {"ValueError": 1}
+    assert all(profiler.profiles[name].wall_us.count == 1 for name in ("gen", "coro", "agen"))
+
+
+def test_state_handlers_are_profiled_without_changing_their_kind():
+    handler = CarouselState.event_handlers["prefetch_next"]
+    assert handler.fn.__profiled__
+    assert handler.is_background
+    assert CarouselState.event_handlers["setvar"].__class__.__name__ == "EventHandlerSetVar"
+
+
+def test_queue_wait_measures_time_waiting_for_the_state_lock(monkeypatch):
+    profiler = HandlerProfiler()
+    monkeypatch.setattr(profiling_module, "handler_profiler", profiler)
+    lock = asyncio.Lock()
+
+    class Manager:
+        @contextlib.asynccontextmanager
+        async def modify_state_with_links(self, token, **context):
+            async with lock:
+                yield token
+
+    app = types.SimpleNamespace(state_manager=Manager())
+    handle = _profiled(lambda: None, "CarouselState.handle", profiler)
+
+    async def event():
+        async with app.state_manager.modify_state_with_links("token"):
+            handle()
+            await asyncio.sleep(0.02)
+
+    async def scenario():
+        await track_queue_wait(app)
+        await track_queue_wait(app)  # installing twice keeps one timer
+        await asyncio.gather(event(), event())
+
+    asyncio.run(scenario())
+
+    waits = profiler.profiles["CarouselState.handle"].queue_wait_us
+    assert waits.count == 2
+    assert waits.max >= 15_000
+
+
+def test_metrics_endpoint_exports_prometheus_text(monkeypatch):
+    profiler = HandlerProfiler()
+    monkeypatch.setattr(profiling_module, "handler_profiler", profiler)
+    profiler.record("CarouselState.next_item", 1200, queue_wait_us=50)
+    profiler.record("CarouselState.next_item", 800, error=KeyError("x"))
+
+    client = TestClient(Starlette(routes=[Route("/metrics", metrics_endpoint)]))
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'lmrex_handler_duration_seconds{handler="CarouselState.next_item",quantile="0.99"} 0.001200' in body
+    assert 'lmrex_handler_duration_seconds_count{handler="CarouselState.next_item"} 2' in body
+    assert 'lmrex_handler_queue_wait_seconds_count{handler="CarouselState.next_item"} 1' in body
+    assert 'lmrex_handler_exceptions_total{handler="CarouselState.next_item",exception="KeyError"} 1' in body
@@ -0,0 +1,161 @@
+import asyncio
+import os
+
+import pytest
+import reflex_local_auth
+from reflex.state import State as RootState
+
+import lmrex.state.auth_state  # noqa: F401  installs the pooled handlers
+from lmrex.middleware import auth_logic, rate_limit
+from lmrex.middleware.rate_limit import (
+    Limit,
+    MemoryBuckets,
+    RateLimited,
+    RateLimiter,
+    RedisBuckets,
+    prometheus,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def fresh_limiters(monkeypatch):
+    for limiter in (rate_limit.login_limiter, rate_limit.registration_limiter):
+        monkeypatch.setattr(limiter, "backend", MemoryBuckets())
+        monkeypatch.setattr(limiter, "counts", type(limiter.counts)())
+
+
+def _substate(root, state_cls):
+    return root.get_substate(state_cls.get_full_name().split("."))
+
+
+def test_limit_parse():
+    limit = Limit.parse("5/300")
+    assert (limit.capacity, limit.period, limit.rate) == (5, 300.0, 5 / 300)
+
+
+def test_memory_bucket_refills_over_time():
+    clock = FakeClock()
+    buckets = MemoryBuckets(clock=clock)
+    limit = Limit(2, 10)
+
+    async def take():
+        return await buckets.take("k", limit)
+
+    assert [asyncio.run(take()) for _ in range(2)] == [0, 0]
+    assert asyncio.run(take()) == pytest.approx(5.0)
+    clock.now += 5
+    assert asyncio.run(take()) == 0
+    clock.now += 100
+    assert [asyncio.run(take()) for _ in range(2)] == [0, 0]
+
+
+def test_memory_buckets_drop_least_recently_used():
+    buckets = MemoryBuckets(max_keys=2)
+    for key in ("a", "b", "c"):
+        asyncio.run(buckets.take(key, Limit(1, 60)))
+    assert list(buckets._buckets) == ["b", "c"]
+
+
+def test_limiter_rejects_burst_per_bucket():
+    limiter = RateLimiter("login", {"ip": Limit(10, 60), "username": Limit(2, 60)}, backend=MemoryBuckets())
+
+    async def attempt(username):
+        await limiter.check(ip="1.2.3.4", username=username)
+
+    asyncio.run(attempt("ada"))
+    asyncio.run(attempt(" ADA "))
+    with pytest.raises(RateLimited) as rejected:
+        asyncio.run(attempt("ada"))
+    assert rejected.value.bucket == "username"
+    assert rejected.value.retry_after > 0
+    asyncio.run(attempt("grace"))
+    assert limiter.counts["allowed"] == 3
+    assert limiter.counts["rejected:username"] == 1
+
+
+def test_limiter_falls_back_to_memory_when_backend_fails():
+    class Down:
+        async def take(self, key, limit):
+            raise ConnectionError("redis down")
+
+    limiter = RateLimiter("registration", {"ip": Limit(1, 60)}, backend=Down())
+    asyncio.run(limiter.check(ip="1.2.3.4"))
+    with pytest.raises(RateLimited):
+        asyncio.run(limiter.check(ip="1.2.3.4"))
+    assert limiter.counts["backend_errors"] == 2
+
+
+def test_login_rejected_before_password_check(auth_db, fresh_limiters, monkeypatch):
+    async def no_verify(password, hashed):
+        raise AssertionError("rate-limited logins must not hash")
+
+    root = RootState(_reflex_internal_init=True)
+    login = _substate(root, reflex_local_auth.LoginState)
+    handler = type(login).event_handlers["on_submit"].fn
+    monkeypatch.setattr(rate_limit.login_limiter, "limits", {"ip": Limit(20, 60), "username": Limit(1, 300)})
+    asyncio.run(handler(login, {"username": "ada", "password": "wrong"}))
+    monkeypatch.setattr(auth_logic, "verify_password", no_verify)
+
+    asyncio.run(handler(login, {"username": "ada", "password": "wrong"}))
+
+    assert login.error_message.startswith("Too many attempts")
+    assert rate_limit.login_limiter.counts["rejected:username"] == 1
+
+
+def test_registration_rejected_before_hashing(auth_db, fresh_limiters, monkeypatch):
+    async def no_hash(password):
+        raise AssertionError("rate-limited registrations must not hash")
+
+    monkeypatch.setattr(rate_limit.registration_limiter, "limits", {"ip": Limit(1, 3600)})
+    asyncio.run(rate_limit.registration_limiter.check(ip=""))
+    monkeypatch.setattr(auth_logic, "hash_password", no_hash)
+    root = RootState(_reflex_internal_init=True)
+    registration = _substate(root, reflex_local_auth.RegistrationState)
+
+    form = {"username": "grace", "password": "hopper", "confirm_password": "hopper"}
+    asyncio.run(type(registration).event_handlers["handle_registration"].fn(registration, form))
+
+    assert registration.error_message.startswith("Too many attempts")
+    assert registration.new_user_id == -1
+
+
+def test_prometheus_lists_every_limiter_once():
+    login = RateLimiter("login", {"ip": Limit(1, 60), "username": Limit(1, 60)}, backend=MemoryBuckets())
+    registration = RateLimiter("registration", {"ip": Limit(1, 60)}, backend=MemoryBuckets())
+    asyncio.run(login.check(ip="a", username="u"))
+    with pytest.raises(RateLimited):
+        asyncio.run(login.check(ip="a", username="u"))
+
+    text = prometheus(login, registration)
+
+    assert text.count("# HELP lmrex_rate_limit_rejected_total") == 1
+    assert 'lmrex_rate_limit_allowed_total{limiter="login"} 1' in text
+    assert 'lmrex_rate_limit_rejected_total{limiter="login",bucket="ip"} 1' in text
+    assert 'lmrex_rate_limit_rejected_total{limiter="registration",bucket="ip"} 0' in text
+
+
+@pytest.mark.skipif(not os.getenv("REDIS_TEST_URL"), reason="set REDIS_TEST_URL to test against Redis")
+def test_redis_buckets_share_budget():
+    import redis.asyncio
+
+    async def scenario():
+        client = redis.asyncio.from_url(os.environ["REDIS_TEST_URL"])
+        buckets = RedisBuckets(client, prefix="lmrex:test:ratelimit:")
+        await client.delete("lmrex:test:ratelimit:k")
+        try:
+            return [await buckets.take("k", Limit(2, 60)) for _ in range(3)]
+        finally:
+            await client.delete("lmrex:test:ratelimit:k")
+            await client.aclose()
+
+    first, second, third = asyncio.run(scenario())
+    assert (first, second) == (0, 0)
+    assert third == pytest.approx(30, abs=1)
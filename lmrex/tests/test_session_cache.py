@@ -0,0 +1,54 @@
+from reflex.state import State as RootState
+from reflex_local_auth import LocalUser
+from sqlalchemy import event
+
+from lmrex.state.auth_state import AuthState
+from lmrex.state.session_cache import SessionUserCache, session_cache
+
+
+def test_entries_expire_and_stay_within_bounds():
+    now = [0.0]
+    cache = SessionUserCache(ttl=10, max_size=2, clock=lambda: now[0])
+    ada, bob = LocalUser(id=1, username="ada"), LocalUser(id=2, username="bob")
+
+    assert cache.get("a") is None
+    cache.put("a", ada)
+    cache.put("b", bob)
+    assert cache.get("a") is ada
+    cache.put("c", LocalUser(id=-1))
+    # "b" was the least recently used
+    assert cache.get("b") is None and len(cache) == 2
+    now[0] = 11
+    assert cache.get("a") is None
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (1, 3, 1)
+    assert stats["hit_rate"] == 0.25
+    assert 'lmrex_session_cache_lookups_total{result="hit"} 1' in cache.prometheus()
+
+
+def test_navigation_reuses_lookup_until_logout(auth_db):
+    queries = []
+    event.listen(auth_db, "before_cursor_execute", lambda *args: queries.append(args[2]))
+    root = RootState(_reflex_internal_init=True)
+    auth = root.get_substate(AuthState.get_full_name().split("."))
+    auth.auth_token = "tok"
+
+    def hydrate():
+        """Recompute every auth var, as the hydrate of each page load does."""
+        auth.parent_state.dict()
+        return auth.user_email
+
+    assert hydrate() == "ada"
+    lookups = len(queries)
+    assert lookups > 0
+    for _ in range(3):
+        assert hydrate() == "ada"
+    assert len(queries) == lookups
+    assert session_cache.stats()["hits"] == 3
+
+    auth.logout_and_redirect()
+
+    assert hydrate() == ""
+    assert session_cache.stats()["invalidations"] == 1
+    assert auth.is_logged_in is False
@@ -0,0 +1,73 @@
+import asyncio
+import datetime
+
+from reflex_local_auth import LocalUser
+from reflex_local_auth.auth_session import LocalAuthSession
+from sqlalchemy import inspect
+from sqlmodel import Session, select
+
+from lmrex.models.session_reaper import SessionReaper
+from lmrex.state.session_cache import session_cache
+
+NOW = datetime.datetime.now(datetime.timezone.utc)
+
+
+def _add_sessions(engine, count, expires_in):
+    with Session(engine) as session:
+        for i in range(count):
+            session.add(
+                LocalAuthSession(user_id=1, session_id=f"{expires_in.days}-{i}", expiration=NOW + expires_in)
+            )
+        session.commit()
+
+
+def _tokens(engine):
+    with Session(engine) as session:
+        return set(session.exec(select(LocalAuthSession.session_id)).all())
+
+
+def test_sweep_deletes_only_expired_sessions_in_batches(auth_db):
+    _add_sessions(auth_db, 7, datetime.timedelta(days=-2))
+    _add_sessions(auth_db, 2, datetime.timedelta(days=3))
+    session_cache.put("-2-0", LocalUser(id=1))
+    reaper = SessionReaper(batch_size=3, max_batches=2)
+
+    assert reaper.sweep(NOW) == 6
+    assert len(_tokens(auth_db)) == 4
+    assert session_cache.get("-2-0") is None
+
+    assert reaper.sweep(NOW) == 1
+    assert _tokens(auth_db) == {"tok", "3-0", "3-1"}
+    assert reaper.sweep(NOW) == 0
+
+    stats = reaper.stats()
+    assert (stats["rows"], stats["batches"], stats["sweeps"]) == (7, 4, 3)
+    assert "lmrex_session_reaper_rows_total 7" in reaper.prometheus()
+
+
+def test_expiration_index_exists(auth_db):
+    indexes = {index["name"]: index["column_names"] for index in inspect(auth_db).get_indexes("localauthsession")}
+    assert indexes["ix_localauthsession_expiration"] == ["expiration"]
+
+
+def test_failed_sweeps_are_counted_and_retried(auth_db, monkeypatch):
+    reaper = SessionReaper(interval=0)
+    calls = []
+
+    def flaky(now):
+        calls.append(now)
+        if len(calls) == 1:
+            raise RuntimeError("database is locked")
+        if len(calls) == 3:
+            raise asyncio.CancelledError
+        return 0
+
+    monkeypatch.setattr(reaper, "reap_batch", flaky)
+
+    try:
+        asyncio.run(reaper.run())
+    except asyncio.CancelledError:
+        pass
+
+    assert len(calls) == 3
+    assert dict(reaper.errors) == {"RuntimeError": 1}
@@ -0,0 +1,76 @@
+import pytest
+
+from lmrex.state.state import CarouselState, LabelState, ModalState
+
+MEDIA_VARS = {"current_media_item"}
+WINDOW_VARS = {"window_offset", "window_items"}
+NAVIGATION_VARS = {"current_index", "catalog_index", "adjacent_media_items", *MEDIA_VARS}
+
+
+def _delta_vars(state):
+    delta = next(iter(state.get_delta().values()), {})
+    state._clean()
+    return {name.removesuffix("_rx_state_") for name in delta}
+
+
+@pytest.mark.parametrize(
+    "handler, args, expected",
+    [
+        ("next_item", (), NAVIGATION_VARS),
+        ("previous_item", (), NAVIGATION_VARS),
+        ("media_added", (999,), set()),
+        ("clear_all_media", (), {*WINDOW_VARS, *NAVIGATION_VARS}),
+    ],
+)
+def test_handler_delta_only_contains_affected_vars(media_db, handler, args, expected):
+    """
+    Guard against computed vars leaking into unrelated deltas: each handler
+    should only re-send the vars derived from what it changed.
+    """
+    state = CarouselState(_reflex_internal_init=True)
+    state.load_media()
+    state.next_item()
+    state._clean()
+
+    getattr(state, handler)(*args)
+
+    assert _delta_vars(state) == expected
+
+
+@pytest.mark.parametrize(
+    "state_cls, handler, args, expected",
+    [
+        (ModalState, "toggle_modal", (), {"show_modal"}),
+        (ModalState, "close_modal", (), {"show_modal"}),
+        (ModalState, "change", (), {"show_dialog"}),
+        (LabelState, "change_label", (), {"label"}),
+        (LabelState, "handle_input_change", ("Hello",), {"label"}),
+    ],
+)
+def test_page_state_handlers_only_touch_their_own_vars(state_cls, handler, args, expected):
+    state = state_cls(_reflex_internal_init=True)
+    if state_cls is ModalState:
+        state.show_modal = True
+        state._clean()
+
+    getattr(state, handler)(*args)
+
+    assert _delta_vars(state) == expected
+
+
+def test_load_media_sends_carousel_vars(media_db):
+    state = CarouselState(_reflex_internal_init=True)
+    state.load_media()
+
+    assert _delta_vars(state) == {"media_count", *WINDOW_VARS, *NAVIGATION_VARS}
+
+
+def test_adding_item_off_screen_sends_only_count(media_db, monkeypatch):
+    monkeypatch.setattr(CarouselState, "CAROUSEL_WINDOW", 2)
+    state = CarouselState(_reflex_internal_init=True)
+    state.load_media()
+    state._clean()
+
+    state.add_media_item()
+
+    assert _delta_vars(state) == {"media_count"}
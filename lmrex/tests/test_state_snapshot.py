@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+from reflex.state import State as RootState
+
+from lmrex.state import snapshot as snapshot_module
+from lmrex.state.auth_state import ProtectedState
+from lmrex.state.snapshot import (
+    MAGIC,
+    SnapshotError,
+    SnapshotStateManager,
+    dump_snapshot,
+    load_snapshot,
+    packb,
+    unpackb,
+)
+from lmrex.state.state import CarouselState
+
+
+@pytest.mark.parametrize(
+    "value, encoded",
+    [
+        ({"a": 1}, b"\x81\xa1a\x01"),
+        ([1, -1, None, True], b"\x94\x01\xff\xc0\xc3"),
+        (300, b"\xcd\x01\x2c"),
+        (-33, b"\xd0\xdf"),
+        ("x" * 40, b"\xd9\x28" + b"x" * 40),
+    ],
+)
+def test_encoding_matches_msgpack(value, encoded):
+    assert packb(value) == encoded
+    assert unpackb(encoded) == value
+
+
+def test_round_trips_session_values():
+    values = [2**40, -(2**40), 0.25, "é" * 70000, b"\x00" * 300, list(range(20)), {"k": {"n": [None]}}]
+    assert unpackb(packb(values)) == values
+    with pytest.raises(SnapshotError):
+        packb({1, 2})
+    with pytest.raises(SnapshotError):
+        unpackb(packb("abc")[:-1])
+
+
+def test_snapshot_keeps_only_changed_vars_and_is_smaller_than_pickle(media_db):
+    state = CarouselState(_reflex_internal_init=True)
+    state.load_media()
+    state.next_item()
+
+    data = dump_snapshot(state)
+    version, name, values = unpackb(data[len(MAGIC):])
+    assert (version, name) == (1, CarouselState.get_full_name())
+    assert "_prefetching" not in values
+    assert values["current_index"] == 1
+    assert len(data) < len(state._serialize()) / 4
+
+    restored = load_snapshot(data, CarouselState)
+    assert restored._window == state._window
+    assert restored.current_index == 1
+    assert restored.current_media_item["title"] == state.current_media_item["title"]
+
+
+def test_snapshot_from_another_schema_version_is_dropped(media_db, monkeypatch):
+    state = ProtectedState(_reflex_internal_init=True)
+    state.protected_data = "hello"
+    data = dump_snapshot(state)
+
+    assert load_snapshot(data, ProtectedState).protected_data == "hello"
+    monkeypatch.setitem(snapshot_module.SNAPSHOT_SCHEMAS, ProtectedState.get_full_name(), 2)
+    assert load_snapshot(data, ProtectedState) is None
+
+
+def test_sessions_resume_from_snapshots_after_restart(media_db, tmp_path):
+    token = "client-token"
+    state_token = f"{token}_{CarouselState.get_full_name()}"
+
+    async def first_process():
+        manager = SnapshotStateManager(
+            state=RootState, snapshot_dir=str(tmp_path), _write_debounce_seconds=0
+        )
+        async with manager.modify_state(state_token) as root:
+            state = await root.get_state(CarouselState)
+            state.load_media()
+            state.next_item()
+            state.next_item()
+        await manager.close()
+        return manager
+
+    async def second_process():
+        manager = SnapshotStateManager(state=RootState, snapshot_dir=str(tmp_path))
+        root = await manager.get_state(state_token)
+        state = await root.get_state(CarouselState)
+        return manager, state
+
+    first = asyncio.run(first_process())
+    path = first.token_path(state_token)
+    assert path.read_bytes().startswith(MAGIC)
+    # Substates that were not touched are not written at all
+    assert len(list(tmp_path.iterdir())) == 1
+
+    manager, state = asyncio.run(second_process())
+    assert state.current_index == 2
+    assert manager.stats["snapshots_restored"] >= 1
+    # Remounting the restored carousel keeps its place
+    assert state.load_media() is None
+    assert state.current_index == 2
@@ -5,7 +5,6 @@ from lmrex.components.color_mode import color_mode
 from lmrex.components.footer import footer
 from lmrex.components.heading import header
 from lmrex.components.navbar import navbar
-from lmrex.state.state import State
 from lmrex.assets.loremtext import lorem_image
 
 
@@ -11,7 +11,7 @@ from lmrex.state.auth_state import ProtectedState
 def account_page() -> rx.Component:
     """
     Protected account page that shows user information
-    Requires authentication - redirects to login if not authenticated
+    Registered with auth_logic.require_login, which redirects to login if not authenticated
     """
 
     return rx.box(
@@ -192,7 +192,6 @@ def account_page() -> rx.Component:
             justify="start",
             min_height="80vh",
             padding="2rem",
-            on_mount=ProtectedState.on_load,
         ),
         width="100%",
     )
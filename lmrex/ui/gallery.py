@@ -6,7 +6,7 @@ from lmrex.components.media_modal import media_modal
 from lmrex.components.menu import menu
 from lmrex.components.heading import header
 from lmrex.components.navbar import navbar
-from lmrex.state.state import State
+from lmrex.state.state import CarouselState, ModalState
 from ..ui.responsive_utils import apply_responsive_styles
 from ..imports import rx
 
@@ -31,7 +31,7 @@ def gallery() -> rx.Component:
                     rx.button("Browse",
                         id="Add_Media",
                         label="Add Media",
-                        on_click=State.toggle_modal,
+                        on_click=ModalState.toggle_modal,
                         justify_content="left",
                     )
                 ),
@@ -40,8 +40,8 @@ def gallery() -> rx.Component:
                 rx.menu.content(menu()),
                 justify_content="right"
             ),
-            media_carousel(current_media_item=State.current_media_item),
-            # rx.button("Add Media", on_click=State.toggle_modal),
+            media_carousel(current_media_item=CarouselState.current_media_item, client_navigation=True),
+            # rx.button("Add Media", on_click=ModalState.toggle_modal),
             ),
             spacing="5",
             justify="start",
@@ -4,7 +4,7 @@ from lmrex.components.footer import footer
 from lmrex.components.heading import header
 from lmrex.components.input import input
 from lmrex.components.navbar import navbar
-from lmrex.state.state import State
+from lmrex.state.state import LabelState
 from ..imports import rx
 
 
@@ -26,7 +26,7 @@ def index() -> rx.Component:
                     input(rx.input),
                     rx.button(
                         "Lizzard",
-                        on_click=State.change_label,
+                        on_click=LabelState.change_label,
                         size="3",
                         style={
                             "background_color": "#667eea",
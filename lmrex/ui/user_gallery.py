@@ -13,23 +13,23 @@ def user_gallery() -> rx.Component:
             rx.form(
                 rx.input(
                     placeholder="Type of",
-                    value=state.State.media_type,
-                    # on_change=FormState.set_media_type,
+                    name="media_type",
                 ),
                 rx.input(
                     placeholder="Title",
-                    value=state.State.media_title,
-                    # on_change=FormState.set_media_title,
+                    name="media_title",
                 ),
                 rx.input(
                     placeholder="URL",
-                    value=state.State.media_url,
-                    # on_change=MediaFormState.set_media_url,
+                    name="media_url",
                 ),
                 rx.button(
                     "Submit",
-                    on_click=state.FormState.handle_submit,
+                    type="submit",
                 ),
+                # Uncontrolled inputs: one event per submit, cleared by the browser
+                on_submit=state.FormState.handle_submit,
+                reset_on_submit=True,
             ),
             rx.spacer(column=1),
         )
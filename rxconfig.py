@@ -116,6 +116,34 @@ elif DATABASE_URL.startswith("postgresql://"):
 else:
     print(f"Using database: {DATABASE_URL[:20]}...")
 
+# Directory for session snapshots (lmrex/state/snapshot.py); keep it on a
+# volume that outlives deploys so sessions resume after a restart
+STATE_SNAPSHOT_DIR = os.getenv("STATE_SNAPSHOT_DIR", "")
+
+# Generated image variants (lmrex/models/media_derivatives.py), served by the
+# backend under /derivatives; keep it on a volume that outlives deploys
+DERIVATIVE_DIR = os.getenv("DERIVATIVE_DIR", ".derivatives")
+
+# Per-process cache of session token -> user (lmrex/state/session_cache.py);
+# a logout in another worker is seen after at most SESSION_CACHE_TTL seconds
+SESSION_CACHE_TTL = float(os.getenv("SESSION_CACHE_TTL", "60"))
+SESSION_CACHE_SIZE = int(os.getenv("SESSION_CACHE_SIZE", "10000"))
+
+# Expired login sessions are deleted every SESSION_REAP_INTERVAL seconds
+# (0 disables the sweeper), SESSION_REAP_BATCH rows per transaction
+SESSION_REAP_INTERVAL = float(os.getenv("SESSION_REAP_INTERVAL", "600"))
+SESSION_REAP_BATCH = int(os.getenv("SESSION_REAP_BATCH", "500"))
+
+# bcrypt cost for new password hashes and threads hashing in parallel
+PASSWORD_HASH_ROUNDS = int(os.getenv("PASSWORD_HASH_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Login/registration attempts allowed as "<burst>/<seconds to refill>";
+# shared through Redis when REFLEX_REDIS_URL is set
+LOGIN_IP_RATE = os.getenv("LOGIN_IP_RATE", "20/60")
+LOGIN_USERNAME_RATE = os.getenv("LOGIN_USERNAME_RATE", "5/300")
+REGISTRATION_IP_RATE = os.getenv("REGISTRATION_IP_RATE", "5/3600")
+
 # Add production URLs to CORS if in production
 if IS_FLY and FLY_APP_NAME:
     cors_origins.extend([